@@ -0,0 +1,50 @@
+import argparse
+import json
+import sys
+
+
+def compare(old: dict, new: dict, threshold: float = 0.1) -> list:
+    """Returns (case, old ops/s, new ops/s, change, regression) rows for cases
+    in both reports; ``regression`` is set for slowdowns beyond ``threshold``."""
+    rows = []
+    for name, result in new["results"].items():
+        before = old["results"].get(name, {}).get("ops_per_sec")
+        after = result.get("ops_per_sec")
+        if not before or not after:
+            continue
+        change = after / before - 1
+        rows.append((name, before, after, change, change < -threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare two benchmark reports and flag regressions."
+    )
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown treated as a regression (default 0.1 = 10%%)",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.old) as file:
+        old = json.load(file)
+    with open(args.new) as file:
+        new = json.load(file)
+
+    regressions = 0
+    for name, before, after, change, regression in compare(old, new, args.threshold):
+        flag = "  REGRESSION" if regression else ""
+        regressions += regression
+        print(
+            f"{name:>20}: {before:>10.0f} -> {after:>10.0f} ops/s {change:+7.1%}{flag}"
+        )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+import os
+import random
+from typing import Iterator, List, Optional
+
+from preset_toolkit.proq3_preset import (
+    NUM_BANDS,
+    AnalyzerRange,
+    AnalyzerResolution,
+    AnalyzerSidechain,
+    AnalyzerSpeed,
+    AnalyzerTilt,
+    DisplayRange,
+    EQBand,
+    FabFilterPreset,
+    FabFilterPresetManager,
+    GlobalParams,
+    LinearPhaseMode,
+    ProcessMode,
+    ProQFilterType,
+    ProQLPHPSlope,
+    ProQStereoPlacement,
+)
+
+# Channel names of the largest SoundID Reference export (9.1.6)
+CHANNEL_NAMES = [
+    "L",
+    "R",
+    "C",
+    "LFE",
+    "Ls",
+    "Rs",
+    "Lrs",
+    "Rrs",
+    "Lw",
+    "Rw",
+    "Ltf",
+    "Rtf",
+    "Ltm",
+    "Rtm",
+    "Ltr",
+    "Rtr",
+]
+
+# Third-octave centres used by the exports
+EXPORT_FREQUENCIES = [
+    20,
+    25,
+    31.5,
+    40,
+    50,
+    63,
+    80,
+    100,
+    125,
+    160,
+    200,
+    250,
+    315,
+    400,
+    500,
+    630,
+    800,
+    1000,
+    1250,
+    1600,
+    2000,
+    2500,
+    3150,
+    4000,
+    5000,
+    6300,
+    8000,
+    10000,
+    12500,
+    16000,
+    20000,
+]
+
+
+def random_band(rng: random.Random) -> EQBand:
+    """Returns a band with every parameter in its valid range."""
+    return EQBand(
+        enabled=rng.random() < 0.5,
+        bypass=rng.random() < 0.1,
+        frequency=2 ** rng.uniform(3.33, 14.6),  # 10 Hz to 30 kHz
+        gain=rng.uniform(-30, 30),
+        dyn_range=rng.uniform(-30, 30),
+        dyn_range_enabled=float(rng.random() < 0.2),
+        dyn_range_th=rng.uniform(-60, 0),
+        q=10 ** rng.uniform(-1.6, 1.6),  # 0.025 to 40
+        filter_type=rng.choice(list(ProQFilterType)),
+        lp_hp_slope=rng.choice(list(ProQLPHPSlope)),
+        stereo_placement=rng.choice(list(ProQStereoPlacement)),
+    )
+
+
+def random_preset(rng: random.Random) -> FabFilterPreset:
+    """Returns a random preset that round-trips through the codec."""
+    return FabFilterPreset(
+        bands=[random_band(rng) for _ in range(NUM_BANDS)],
+        global_params=GlobalParams(
+            process_mode=rng.choice(list(ProcessMode)),
+            linear_mode_value=rng.choice(list(LinearPhaseMode)),
+            gain_scale=rng.uniform(-1, 2),
+            output_gain=rng.uniform(-1, 1),
+            output_pan=rng.uniform(-1, 1),
+            bypass=rng.random() < 0.1,
+            phase_invert=rng.random() < 0.1,
+            auto_gain=rng.random() < 0.5,
+            analyzer_pre=rng.random() < 0.5,
+            analyzer_post=rng.random() < 0.5,
+            analyzer_sidechain=rng.choice(list(AnalyzerSidechain)),
+            analyzer_range=rng.choice(list(AnalyzerRange)),
+            analyzer_res=rng.choice(list(AnalyzerResolution)),
+            analyzer_speed=rng.choice(list(AnalyzerSpeed)),
+            analyzer_tilt=rng.choice(list(AnalyzerTilt)),
+            show_collisions=rng.random() < 0.5,
+            spectrum_grab=rng.random() < 0.5,
+            display_range=rng.choice(list(DisplayRange)),
+            enable_midi=rng.random() < 0.5,
+        ),
+    )
+
+
+def random_presets(count: int, seed: int = 0) -> Iterator[bytes]:
+    """Yields the bytes of ``count`` random preset files."""
+    rng = random.Random(seed)
+    manager = FabFilterPresetManager()
+    for _ in range(count):
+        yield manager.encode(random_preset(rng))
+
+
+def write_presets(directory: str, count: int, seed: int = 0) -> List[str]:
+    """Writes random .ffp files to a directory and returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i, data in enumerate(random_presets(count, seed)):
+        path = os.path.join(directory, f"preset_{i:06d}.ffp")
+        with open(path, "wb") as file:
+            file.write(data)
+        paths.append(path)
+    return paths
+
+
+def soundid_export(
+    channels: Optional[List[str]] = None,
+    frequencies: Optional[List[float]] = None,
+    seed: int = 0,
+) -> str:
+    """Returns the text of a SoundID Reference export with random curves."""
+    rng = random.Random(seed)
+    channels = channels or CHANNEL_NAMES
+    frequencies = frequencies or EXPORT_FREQUENCIES
+    lines = [
+        "Preset name: Benchmark",
+        "Profile name: Benchmark",
+        "Target mode: Flat",
+        f"Audio setup: {len(channels)} channels",
+        "Time exported: 00:00:00 01/01/2024",
+        "",
+    ]
+    for name in channels:
+        lines += [
+            f"{name} channel calibration:",
+            f"Delay: {rng.uniform(0, 10):.3f} ms",
+            f"Gain: {rng.uniform(-6, 0):g} dB",
+            "",
+            "|Freq      |Gain      |",
+            "|:---------|:---------|",
+        ]
+        for freq in frequencies:
+            gain = f"{rng.uniform(-6, 6):.1f}"
+            lines.append(f"|{freq:<8g}Hz|{gain:<8}dB|")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_soundid_export(path: str, channels: Optional[List[str]] = None, **kwargs):
+    """Writes a random SoundID Reference export file."""
+    with open(path, "w") as file:
+        file.write(soundid_export(channels, **kwargs))
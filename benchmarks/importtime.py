@@ -0,0 +1,56 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+MODULES = [
+    "preset_toolkit",
+    "preset_toolkit.raw",
+    "preset_toolkit.proq3_preset",
+    "preset_toolkit.cli",
+]
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """Imports ``module`` in a fresh interpreter with ``-X importtime``.
+
+    Returns {module name: (self µs, cumulative µs)} for every module the
+    import loaded.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure the cold import time of preset_toolkit modules."
+    )
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="imports per module (default 5)"
+    )
+    args = parser.parse_args(argv)
+    for module in args.modules:
+        runs = [import_times(module) for _ in range(args.repeat)]
+        best = min(run[module][1] for run in runs)
+        loaded = len(runs[0])
+        print(f"{module:32} {best / 1000:8.2f} ms  {loaded:4d} modules")
+
+
+if __name__ == "__main__":
+    main()
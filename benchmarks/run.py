@@ -0,0 +1,282 @@
+import argparse
+import contextlib
+import gc
+import glob
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from preset_toolkit.proq3_preset import _HEADER, PRESET_SIZE, FabFilterPresetManager
+from preset_toolkit.soundid import SoundIdExport
+
+from .generators import CHANNEL_NAMES, write_presets, write_soundid_export
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Operations traced with tracemalloc per case; tracing is slow, so only a sample
+TRACE_SAMPLE = 1000
+
+
+def _peak_rss() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _preset_paths(data_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(data_dir, "presets", "*.ffp")))
+
+
+def _export_paths(data_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(data_dir, "soundid", "*.txt")))
+
+
+class Case:
+    """One benchmark: ``op`` is called once per item of ``items``."""
+
+    def __init__(self, op: Callable, items: list, item_bytes: int):
+        self.op = op
+        self.items = items
+        self.item_bytes = item_bytes
+
+
+def _case_read_preset(data_dir, out_dir, compact=False, lazy=False):
+    manager = FabFilterPresetManager()
+    return Case(
+        lambda path: manager.read_preset(path, compact=compact, lazy=lazy),
+        _preset_paths(data_dir),
+        PRESET_SIZE,
+    )
+
+
+def _decoded_presets(data_dir):
+    manager = FabFilterPresetManager()
+    return [manager.read_preset(path) for path in _preset_paths(data_dir)]
+
+
+def _case_write_preset(data_dir, out_dir):
+    manager = FabFilterPresetManager()
+    items = [
+        (os.path.join(out_dir, f"{i:06d}.ffp"), preset)
+        for i, preset in enumerate(_decoded_presets(data_dir))
+    ]
+    return Case(lambda item: manager.write_preset(*item), items, PRESET_SIZE)
+
+
+def _case_round_trip(data_dir, out_dir):
+    manager = FabFilterPresetManager()
+    items = [
+        (path, os.path.join(out_dir, f"{i:06d}.ffp"))
+        for i, path in enumerate(_preset_paths(data_dir))
+    ]
+
+    def op(item):
+        manager.write_preset(item[1], manager.read_preset(item[0]))
+
+    return Case(op, items, 2 * PRESET_SIZE)
+
+
+def _case_decode(data_dir, out_dir):
+    manager = FabFilterPresetManager()
+    items = []
+    for path in _preset_paths(data_dir):
+        with open(path, "rb") as file:
+            items.append(file.read())
+    return Case(manager.decode, items, PRESET_SIZE)
+
+
+def _case_encode(data_dir, out_dir):
+    manager = FabFilterPresetManager()
+    return Case(manager.encode, _decoded_presets(data_dir), PRESET_SIZE)
+
+
+def _case_read_bands(data_dir, out_dir):
+    manager = FabFilterPresetManager()
+    items = []
+    for path in _preset_paths(data_dir):
+        with open(path, "rb") as file:
+            items.append(io.BytesIO(file.read()))
+
+    def op(file):
+        file.seek(_HEADER.size)
+        return manager._read_bands(file)
+
+    return Case(op, items, PRESET_SIZE - _HEADER.size)
+
+
+def _case_print_preset(data_dir, out_dir):
+    return Case(FabFilterPresetManager.print_preset, _decoded_presets(data_dir), 0)
+
+
+def _case_soundid_parse(data_dir, out_dir):
+    paths = _export_paths(data_dir)
+
+    def op(path):
+        SoundIdExport(path).extract_calibration_data()
+
+    return Case(op, paths, os.path.getsize(paths[0]) if paths else 0)
+
+
+CASES: Dict[str, Callable[[str, str], Case]] = {
+    "read_preset": _case_read_preset,
+    "read_preset_compact": lambda d, o: _case_read_preset(d, o, compact=True),
+    "read_preset_lazy": lambda d, o: _case_read_preset(d, o, lazy=True),
+    "write_preset": _case_write_preset,
+    "round_trip": _case_round_trip,
+    "decode": _case_decode,
+    "encode": _case_encode,
+    "read_bands": _case_read_bands,
+    "print_preset": _case_print_preset,
+    "soundid_parse": _case_soundid_parse,
+}
+
+
+def run_case(name: str, data_dir: str, repeat: int = 1) -> dict:
+    """Runs one case in this process and returns its measurements."""
+    with tempfile.TemporaryDirectory() as out_dir:
+        case = CASES[name](data_dir, out_dir)
+        ops = len(case.items)
+        op = case.op
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            best = float("inf")
+            for _ in range(repeat):
+                gc.collect()
+                start = time.perf_counter()
+                for item in case.items:
+                    op(item)
+                best = min(best, time.perf_counter() - start)
+
+            sample = case.items[:TRACE_SAMPLE]
+            gc.collect()
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            results = [op(item) for item in sample]
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del results
+
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    seconds = best if ops else 0.0
+    return {
+        "ops": ops,
+        "seconds": seconds,
+        "ops_per_sec": ops / seconds if seconds else None,
+        "mb_per_sec": ops * case.item_bytes / seconds / 1e6 if seconds else None,
+        "peak_rss_bytes": _peak_rss(),
+        "traced_peak_bytes_per_op": peak / len(sample) if sample else None,
+        "retained_blocks_per_op": retained / len(sample) if sample else None,
+    }
+
+
+def generate(data_dir: str, count: int, exports: int, seed: int = 0):
+    """Writes the synthetic presets and SoundID exports used by the cases."""
+    write_presets(os.path.join(data_dir, "presets"), count, seed)
+    os.makedirs(os.path.join(data_dir, "soundid"), exist_ok=True)
+    for i in range(exports):
+        write_soundid_export(
+            os.path.join(data_dir, "soundid", f"export_{i:04d}.txt"),
+            CHANNEL_NAMES,
+            seed=seed + i,
+        )
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    data_dir: str,
+    cases: Optional[List[str]] = None,
+    repeat: int = 1,
+    isolate: bool = True,
+) -> dict:
+    """Runs the cases and returns the JSON report.
+
+    With ``isolate`` each case runs in a fresh process, so the peak RSS of one
+    case does not include the others.
+    """
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "presets": len(_preset_paths(data_dir)),
+            "exports": len(_export_paths(data_dir)),
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    for name in cases or list(CASES):
+        if isolate:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                result = executor.submit(run_case, name, data_dir, repeat).result()
+        else:
+            result = run_case(name, data_dir, repeat)
+        report["results"][name] = result
+        print(
+            f"{name:>20}: {result['ops_per_sec'] or 0:>10.0f} ops/s "
+            f"{result['mb_per_sec'] or 0:>8.1f} MB/s",
+            file=sys.stderr,
+        )
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the preset codec and SoundID parser."
+    )
+    parser.add_argument("--count", type=int, default=10000, help="presets to generate")
+    parser.add_argument("--exports", type=int, default=100, help="SoundID exports")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--data-dir", help="reuse or keep the generated data in this directory"
+    )
+    parser.add_argument("--case", action="append", choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=1, help="keep the best of N")
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("-o", "--output", help="write the JSON report to a file")
+    args = parser.parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        data_dir = args.data_dir
+        if data_dir is None:
+            data_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        if not _preset_paths(data_dir):
+            generate(data_dir, args.count, args.exports, args.seed)
+        report = run(data_dir, args.case, args.repeat, not args.in_process)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import gc
+import tracemalloc
+
+from preset_toolkit.proq3_preset import FabFilterPresetManager
+
+COUNT = 10000
+
+preset_manager = FabFilterPresetManager()
+
+# Compare the memory held per preset with and without compact mode
+for compact in (False, True):
+    gc.collect()
+    tracemalloc.start()
+    presets = [
+        preset_manager.read_preset(
+            "./tests/samples/default_preset.ffp", compact=compact
+        )
+        for _ in range(COUNT)
+    ]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del presets
+
+    print(f"compact={compact}: {size / COUNT:.0f} bytes per preset")
@@ -0,0 +1,52 @@
+import importlib
+
+# Nothing is imported up front: submodules, and the main classes below, are
+# loaded on first attribute access, so ``import preset_toolkit`` is free and
+# scripts only pay for what they use.
+_SUBMODULES = {
+    "aio",
+    "archive",
+    "bank",
+    "batch",
+    "cache",
+    "cli",
+    "compact",
+    "conversions",
+    "dedup",
+    "diff",
+    "export",
+    "fitting",
+    "instrumentation",
+    "lazy",
+    "morph",
+    "proq3_preset",
+    "query",
+    "raw",
+    "response",
+    "schema",
+    "soundid",
+    "validation",
+    "writer",
+}
+_EXPORTS = {
+    "EQBand": "proq3_preset",
+    "FabFilterPreset": "proq3_preset",
+    "FabFilterPresetManager": "proq3_preset",
+    "GlobalParams": "proq3_preset",
+    "PresetWriter": "writer",
+    "SoundIdExport": "soundid",
+}
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        value = globals()[name] = getattr(module, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES | set(_EXPORTS))
@@ -0,0 +1,112 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Iterable, Optional, Tuple
+
+from .proq3_preset import FabFilterPreset, FabFilterPresetManager
+
+
+class AsyncPresetIO:
+    """Reads and writes presets from asyncio code without blocking the loop.
+
+    Each call reads or writes the whole file in a worker thread; at most
+    ``max_concurrency`` calls are in flight at once, the rest wait on a
+    semaphore.
+    """
+
+    def __init__(
+        self,
+        manager: Optional[FabFilterPresetManager] = None,
+        max_concurrency: int = 64,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.manager = manager or FabFilterPresetManager()
+        self.max_concurrency = max_concurrency
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=min(32, max_concurrency),
+            thread_name_prefix="preset-io",
+        )
+        self._loop = None
+        self._semaphore = None
+
+    def _limit(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _run(self, function, *args):
+        async with self._limit():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, function, *args)
+
+    async def read_preset(self, file_path: str, **kwargs) -> Optional[FabFilterPreset]:
+        """Async counterpart of FabFilterPresetManager.read_preset."""
+        return await self._run(partial(self.manager.read_preset, file_path, **kwargs))
+
+    async def write_preset(self, file_path: str, preset: FabFilterPreset):
+        """Async counterpart of FabFilterPresetManager.write_preset."""
+        await self._run(self.manager.write_preset, file_path, preset)
+
+    async def iter_presets(
+        self, paths: Iterable[str]
+    ) -> AsyncIterator[Tuple[str, Optional[FabFilterPreset]]]:
+        """Yields (path, preset) pairs as reads complete.
+
+        Only ``max_concurrency`` reads are scheduled at a time, so very long
+        path lists are consumed lazily.
+        """
+        paths = iter(paths)
+        pending = {}
+
+        def schedule():
+            for path in paths:
+                task = asyncio.ensure_future(self.read_preset(path))
+                pending[task] = path
+                if len(pending) >= self.max_concurrency:
+                    return
+
+        schedule()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield pending.pop(task), task.result()
+                schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+_default_io: Optional[AsyncPresetIO] = None
+
+
+def _io() -> AsyncPresetIO:
+    global _default_io
+    if _default_io is None:
+        _default_io = AsyncPresetIO()
+    return _default_io
+
+
+async def aread_preset(file_path: str, **kwargs) -> Optional[FabFilterPreset]:
+    """Reads a preset with the shared AsyncPresetIO."""
+    return await _io().read_preset(file_path, **kwargs)
+
+
+async def awrite_preset(file_path: str, preset: FabFilterPreset):
+    """Writes a preset with the shared AsyncPresetIO."""
+    await _io().write_preset(file_path, preset)
+
+
+def aiter_presets(
+    paths: Iterable[str],
+) -> AsyncIterator[Tuple[str, Optional[FabFilterPreset]]]:
+    """Reads many presets with the shared AsyncPresetIO."""
+    return _io().iter_presets(paths)
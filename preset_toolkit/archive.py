@@ -0,0 +1,235 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+from .proq3_preset import PRESET_SIZE, FabFilterPreset, FabFilterPresetManager
+
+# Archive layout:
+#   header   magic, format version, record count, index offset
+#   records  PRESET_SIZE bytes each, exactly as written by write_preset
+#   index    per record: record offset, name length, utf-8 name
+# New records and a new index are always written past the current index and
+# the header is updated last, so an interrupted append leaves the previous
+# state readable. Space left behind by replaced or removed records is
+# reclaimed by compact().
+MAGIC = b"FFPA"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sIQQ")
+_INDEX_ENTRY = struct.Struct("<QH")
+
+
+class PresetArchive:
+    """A single file holding many Pro-Q 3 presets, read through mmap."""
+
+    def __init__(self, path: Union[str, os.PathLike], writable: bool = False):
+        self.path = str(path)
+        self.writable = writable
+        self._manager = FabFilterPresetManager()
+        self._file = open(self.path, "r+b" if writable else "rb")
+        self._mmap = None
+        self._load()
+
+    @classmethod
+    def create(cls, path: Union[str, os.PathLike]) -> "PresetArchive":
+        """Creates an empty archive, replacing any existing file."""
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, _HEADER.size))
+        return cls(path, writable=True)
+
+    def _load(self):
+        """Maps the file and reads the name index."""
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, index_offset = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a preset archive")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported archive version {version} in {self.path}")
+
+        self._offsets: List[int] = []
+        self._names: List[str] = []
+        position = index_offset
+        for _ in range(count):
+            offset, length = _INDEX_ENTRY.unpack_from(self._mmap, position)
+            position += _INDEX_ENTRY.size
+            self._offsets.append(offset)
+            self._names.append(self._mmap[position : position + length].decode())
+            position += length
+        self._positions: Dict[str, int] = {
+            name: k for k, name in enumerate(self._names)
+        }
+        self._end = position
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._positions
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self.get(k)
+
+    def __getitem__(self, key: Union[int, str]) -> FabFilterPreset:
+        return self.get(key)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    def _position(self, key: Union[int, str]) -> int:
+        if isinstance(key, str):
+            return self._positions[key]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("archive index out of range")
+        return key
+
+    def get(self, key: Union[int, str]) -> FabFilterPreset:
+        """Decodes the preset at a position or with a name."""
+        return self._manager.decode(self._mmap, self._offsets[self._position(key)])
+
+    def read_raw(self, key: Union[int, str]) -> bytes:
+        """Returns the preset bytes at a position or with a name."""
+        offset = self._offsets[self._position(key)]
+        return self._mmap[offset : offset + PRESET_SIZE]
+
+    def append(self, name: str, preset: FabFilterPreset):
+        """Adds a preset, replacing any preset with the same name."""
+        buffer = bytearray(PRESET_SIZE)
+        self._manager.encode_into(preset, buffer)
+        self.extend_raw([(name, buffer)])
+
+    def extend_raw(self, items: Iterable[Tuple[str, bytes]]):
+        """Adds encoded presets, replacing presets with the same names."""
+        if not self.writable:
+            raise IOError(f"{self.path} is opened read-only")
+        offsets = list(self._offsets)
+        names = list(self._names)
+        positions = dict(self._positions)
+
+        self._file.seek(self._end)
+        offset = self._end
+        for name, data in items:
+            if len(data) != PRESET_SIZE:
+                raise ValueError(
+                    f"Preset {name} is {len(data)} bytes, expected {PRESET_SIZE}"
+                )
+            self._file.write(data)
+            if name in positions:
+                offsets[positions[name]] = offset
+            else:
+                positions[name] = len(names)
+                offsets.append(offset)
+                names.append(name)
+            offset += PRESET_SIZE
+        self._write_index(offset, offsets, names)
+
+    def remove(self, name: str):
+        """Removes a preset from the index."""
+        if not self.writable:
+            raise IOError(f"{self.path} is opened read-only")
+        k = self._positions[name]
+        offsets = self._offsets[:k] + self._offsets[k + 1 :]
+        names = self._names[:k] + self._names[k + 1 :]
+        self._write_index(self._end, offsets, names)
+
+    def _write_index(self, index_offset: int, offsets: List[int], names: List[str]):
+        """Writes an index at index_offset, then points the header at it."""
+        self._file.seek(index_offset)
+        index = bytearray()
+        for offset, name in zip(offsets, names):
+            encoded = name.encode()
+            index += _INDEX_ENTRY.pack(offset, len(encoded))
+            index += encoded
+        self._file.write(index)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        self._file.seek(0)
+        self._file.write(
+            _HEADER.pack(MAGIC, FORMAT_VERSION, len(offsets), index_offset)
+        )
+        self._file.flush()
+        self._load()
+
+    def compact(self):
+        """Rewrites the archive without space left by replaced or removed presets."""
+        if not self.writable:
+            raise IOError(f"{self.path} is opened read-only")
+        temp_path = self.path + ".tmp"
+        compacted = PresetArchive.create(temp_path)
+        try:
+            compacted.extend_raw(
+                (name, self.read_raw(k)) for k, name in enumerate(self._names)
+            )
+        finally:
+            compacted.close()
+        self.close()
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "r+b")
+        self._load()
+
+    def to_bank(self):
+        """Gathers all presets into a PresetBank (requires NumPy)."""
+        import numpy as np
+
+        from .bank import RECORD_DTYPE, PresetBank
+
+        count = len(self._offsets)
+        offsets = np.asarray(self._offsets, dtype=np.int64)
+        if count and np.all(np.diff(offsets) == PRESET_SIZE):
+            # Records stored back to back: one copy of the whole block
+            view = np.frombuffer(
+                self._mmap, dtype=RECORD_DTYPE, count=count, offset=self._offsets[0]
+            )
+            records = view.copy()
+            del view  # the mmap cannot be closed while a view exists
+        else:
+            data = bytearray(count * PRESET_SIZE)
+            for i, offset in enumerate(self._offsets):
+                start = i * PRESET_SIZE
+                data[start : start + PRESET_SIZE] = self._mmap[
+                    offset : offset + PRESET_SIZE
+                ]
+            records = np.frombuffer(data, dtype=RECORD_DTYPE)
+        return PresetBank(records, names=self.names)
+
+
+def pack_directory(
+    directory: Union[str, os.PathLike],
+    archive_path: Union[str, os.PathLike],
+    pattern: str = "*.ffp",
+) -> PresetArchive:
+    """Packs every preset file under a directory into a new archive.
+
+    Presets are named after their path relative to the directory, without
+    the file extension.
+    """
+    directory = Path(directory)
+    archive = PresetArchive.create(archive_path)
+
+    def items():
+        for path in sorted(directory.rglob(pattern)):
+            name = path.relative_to(directory).with_suffix("").as_posix()
+            yield name, path.read_bytes()
+
+    archive.extend_raw(items())
+    return archive
@@ -0,0 +1,157 @@
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .conversions import freq_convert_array as freq_convert
+from .conversions import freq_inverse_convert_array as freq_inverse_convert
+from .conversions import q_convert_array as q_convert
+from .conversions import q_inverse_convert_array as q_inverse_convert
+from .proq3_preset import (
+    BAND_PARAMS,
+    GLOBAL_PARAMS,
+    NUM_BANDS,
+    PRESET_SIZE,
+    FabFilterPreset,
+    FabFilterPresetManager,
+)
+from .raw import BAND_NAMES, GLOBAL_NAMES
+
+# One preset file as a structured record, field for field with the binary layout
+RECORD_DTYPE = np.dtype(
+    [
+        ("fxID", "S4"),
+        ("version", "<i4"),
+        ("num_params", "<i4"),
+        ("bands", "<f4", (NUM_BANDS, BAND_PARAMS)),
+        ("global_params", "<f4", (GLOBAL_PARAMS,)),
+    ]
+)
+assert RECORD_DTYPE.itemsize == PRESET_SIZE
+
+# Position of each stored parameter along the last axis of the band/global
+# arrays, by its name in preset_toolkit.raw: band bypass is the "active"
+# column and enable_midi the "midi_disabled" one
+BAND_COLUMNS = {name: i for i, name in enumerate(BAND_NAMES)}
+GLOBAL_COLUMNS = {name: i for i, name in enumerate(GLOBAL_NAMES)}
+
+
+class PresetBank:
+    """A collection of Pro-Q 3 presets stored column-wise in NumPy arrays.
+
+    ``records`` holds the presets exactly as they are laid out on disk, so
+    ``bands`` (N, 24, 13) and ``global_params`` (N, 22) are views holding the
+    encoded parameter values: frequencies as log2, Q in the preset scale and
+    enums as floats. ``frequency`` and ``q`` give decoded copies.
+    """
+
+    def __init__(self, records: np.ndarray, names: Optional[Sequence[str]] = None):
+        if records.dtype != RECORD_DTYPE:
+            raise ValueError(f"Expected records of dtype {RECORD_DTYPE}")
+        if names is not None and len(names) != len(records):
+            raise ValueError("names must have one entry per record")
+        self.records = records
+        self.names = list(names) if names is not None else None
+
+    @classmethod
+    def empty(cls, count: int) -> "PresetBank":
+        """Creates a bank of default presets."""
+        return cls.from_presets([FabFilterPreset() for _ in range(count)])
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str]) -> "PresetBank":
+        """Loads preset files straight into the record array."""
+        paths = [str(path) for path in paths]
+        records = np.empty(len(paths), dtype=RECORD_DTYPE)
+        raw = records.view(np.uint8).reshape(len(paths), PRESET_SIZE)
+        for i, path in enumerate(paths):
+            with open(path, "rb", buffering=0) as file:
+                size = file.readinto(raw[i])
+            if size != PRESET_SIZE:
+                raise ValueError(
+                    f"Preset file {path} is {size} bytes, expected {PRESET_SIZE}"
+                )
+        return cls(records, names=paths)
+
+    @classmethod
+    def from_presets(
+        cls,
+        presets: Sequence[FabFilterPreset],
+        names: Optional[Sequence[str]] = None,
+    ) -> "PresetBank":
+        """Encodes a list of presets into a bank."""
+        manager = FabFilterPresetManager()
+        records = np.empty(len(presets), dtype=RECORD_DTYPE)
+        raw = records.view(np.uint8).reshape(len(presets), PRESET_SIZE)
+        for i, preset in enumerate(presets):
+            manager.encode_into(preset, raw[i])
+        return cls(records, names=names)
+
+    def to_presets(self) -> List[FabFilterPreset]:
+        """Decodes every record into a FabFilterPreset."""
+        manager = FabFilterPresetManager()
+        return [manager.decode(record) for record in self._raw()]
+
+    def to_files(self, paths: Sequence[str]):
+        """Writes every record to its own preset file."""
+        if len(paths) != len(self):
+            raise ValueError("paths must have one entry per record")
+        for path, record in zip(paths, self._raw()):
+            with open(path, "wb") as file:
+                file.write(record)
+
+    def _raw(self) -> np.ndarray:
+        """Returns the records as an (N, PRESET_SIZE) byte array."""
+        return self.records.view(np.uint8).reshape(len(self.records), PRESET_SIZE)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index) -> "PresetBank":
+        records = self.records[index]
+        if records.ndim == 0:
+            records = self.records[index : index + 1 or None]
+            index = slice(index, index + 1 or None)
+        names = None
+        if self.names is not None:
+            names = list(np.asarray(self.names, dtype=object)[index])
+        return PresetBank(records, names=names)
+
+    @property
+    def bands(self) -> np.ndarray:
+        return self.records["bands"]
+
+    @property
+    def global_params(self) -> np.ndarray:
+        return self.records["global_params"]
+
+    def band_column(self, name: str) -> np.ndarray:
+        """Returns an (N, 24) view of one stored band parameter."""
+        return self.bands[..., BAND_COLUMNS[name]]
+
+    def global_column(self, name: str) -> np.ndarray:
+        """Returns an (N,) view of one stored global parameter."""
+        return self.global_params[..., GLOBAL_COLUMNS[name]]
+
+    @property
+    def frequency(self) -> np.ndarray:
+        return freq_inverse_convert(self.band_column("frequency"))
+
+    @frequency.setter
+    def frequency(self, values):
+        self.band_column("frequency")[...] = freq_convert(values)
+
+    @property
+    def q(self) -> np.ndarray:
+        return q_inverse_convert(self.band_column("q"))
+
+    @q.setter
+    def q(self, values):
+        self.band_column("q")[...] = q_convert(values)
+
+    @property
+    def gain(self) -> np.ndarray:
+        return self.band_column("gain")
+
+    @gain.setter
+    def gain(self, values):
+        self.band_column("gain")[...] = values
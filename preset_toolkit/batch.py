@@ -0,0 +1,139 @@
+import glob
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .proq3_preset import _HEADER, PRESET_SIZE, FabFilterPreset, FabFilterPresetManager
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def _validate_chunk(payloads, policy: str):
+    """Validates the presets of a chunk in one pass and applies ``policy``:
+    invalid presets fail under ``strict``, are dropped under ``skip`` and
+    have their data replaced under ``repair``."""
+    import numpy as np
+
+    from .validation import repair, validate
+
+    rows = [i for i, (_, data, _) in enumerate(payloads) if data is not None]
+    if not rows:
+        return payloads
+    values = np.frombuffer(b"".join(payloads[i][1] for i in rows), dtype="<f4")
+    values = values.reshape(len(rows), -1)[:, _HEADER.size // 4 :]
+    report = validate(values)
+    if report.ok:
+        return payloads
+    if policy == "repair":
+        repaired = repair(values, report).astype("<f4")
+    payloads = list(payloads)
+    for row in np.nonzero(report.invalid)[0]:
+        i = rows[row]
+        path, data, _ = payloads[i]
+        if policy == "repair":
+            payloads[i] = (path, data[: _HEADER.size] + repaired[row].tobytes(), None)
+        elif policy == "skip":
+            payloads[i] = None
+        else:
+            issues = "; ".join(str(issue) for issue in report.preset_issues(row))
+            payloads[i] = (path, None, f"ValidationError: {issues}")
+    return [payload for payload in payloads if payload is not None]
+
+
+@dataclass
+class PresetResult:
+    """The outcome of reading one preset file in a batch."""
+
+    path: str
+    data: Optional[bytes] = None
+    preset: Optional[FabFilterPreset] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _read_chunk(paths: List[str]) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+    """Reads raw preset files in a worker process."""
+    payloads = []
+    for path in paths:
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            if len(data) != PRESET_SIZE:
+                raise ValueError(f"file is {len(data)} bytes, expected {PRESET_SIZE}")
+            payloads.append((path, data, None))
+        except Exception as e:
+            payloads.append((path, None, f"{type(e).__name__}: {e}"))
+    return payloads
+
+
+def _expand_paths(paths_or_glob: Union[str, Iterable[str]]) -> List[str]:
+    if isinstance(paths_or_glob, str):
+        return sorted(glob.glob(paths_or_glob, recursive=True))
+    return [str(path) for path in paths_or_glob]
+
+
+def read_presets(
+    paths_or_glob: Union[str, Iterable[str]],
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+    ordered: bool = False,
+    decode: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    validation: Optional[str] = None,
+) -> Iterator[PresetResult]:
+    """Reads many preset files, fanning the file I/O out over a process pool.
+
+    Workers send back the raw file contents, which are decoded here into
+    FabFilterPreset objects unless ``decode`` is False. Results are yielded
+    as chunks complete, or in input order when ``ordered`` is set. Failures
+    are reported through ``PresetResult.error`` instead of stopping the batch.
+    ``progress`` is called with (files done, total files) after every chunk.
+    ``workers=0`` reads in the calling process.
+
+    ``validation`` checks each chunk in one vectorized pass (see
+    preset_toolkit.validation): with "strict" invalid presets are failures,
+    with "repair" they are fixed and with "skip" they are left out.
+    """
+    if validation is not None:
+        from .validation import POLICIES
+
+        if validation not in POLICIES:
+            raise ValueError(f"Unknown validation policy {validation!r}")
+    paths = _expand_paths(paths_or_glob)
+    chunks = [paths[i : i + chunksize] for i in range(0, len(paths), chunksize)]
+    manager = FabFilterPresetManager()
+    total = len(paths)
+    done = 0
+
+    def results(payloads) -> Iterator[PresetResult]:
+        if validation is not None:
+            payloads = _validate_chunk(payloads, validation)
+        for path, data, error in payloads:
+            result = PresetResult(path=path, data=data, error=error)
+            if decode and data is not None:
+                try:
+                    result.preset = manager.decode(data)
+                except Exception as e:
+                    result.error = f"{type(e).__name__}: {e}"
+            yield result
+
+    if workers == 0:
+        for chunk in chunks:
+            payloads = _read_chunk(chunk)
+            done += len(payloads)
+            if progress is not None:
+                progress(done, total)
+            yield from results(payloads)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_read_chunk, chunk) for chunk in chunks]
+        for future in futures if ordered else as_completed(futures):
+            payloads = future.result()
+            done += len(payloads)
+            if progress is not None:
+                progress(done, total)
+            yield from results(payloads)
@@ -0,0 +1,219 @@
+import hashlib
+import os
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Optional, Tuple
+
+from .proq3_preset import FabFilterPreset
+
+# Disk entries: file size, modification time and content hash, then the file
+_DISK_HEADER = struct.Struct("<qq16s")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    revalidations: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class _Entry:
+    size: int
+    mtime_ns: int
+    digest: bytes
+    data: bytes
+    # Decoded on first load(); only kept in the memory tier
+    preset: Optional[FabFilterPreset] = None
+    decoded: bool = False
+
+
+class PresetCache:
+    """A two-tier cache of preset files for FabFilterPresetManager.
+
+    Entries are keyed by absolute path and are valid while the file size and
+    modification time are unchanged; if only the modification time changed,
+    the content hash is checked before the file is read again. The first
+    tier is an in-process LRU of ``maxsize`` files, the optional second tier
+    a ``directory`` of entries shared between processes.
+
+    Both tiers hold the raw file contents, so the disk tier never unpickles
+    anything; the memory tier also keeps the decoded preset. load() hands
+    out a copy of it, so callers can change their preset without affecting
+    the cache or each other.
+    """
+
+    def __init__(self, maxsize: int = 1024, directory: Optional[str] = None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _disk_path(self, key: str) -> str:
+        name = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, name + ".entry")
+
+    def _load_disk(self, key: str) -> Optional[_Entry]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as file:
+                contents = file.read()
+        except OSError:
+            return None
+        if len(contents) < _DISK_HEADER.size:
+            return None
+        size, mtime_ns, digest = _DISK_HEADER.unpack_from(contents)
+        data = contents[_DISK_HEADER.size :]
+        if len(data) != size or _digest(data) != digest:
+            return None  # truncated or corrupt
+        return _Entry(size, mtime_ns, digest, data)
+
+    def _store_disk(self, key: str, entry: _Entry):
+        if self.directory is None:
+            return
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(_DISK_HEADER.pack(entry.size, entry.mtime_ns, entry.digest))
+            file.write(entry.data)
+        os.replace(temp_path, path)
+
+    def _remember(self, key: str, entry: _Entry, stat: str):
+        with self._lock:
+            setattr(self.stats, stat, getattr(self.stats, stat) + 1)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def _lookup(self, file_path: str, instrumentation) -> _Entry:
+        key = os.path.abspath(file_path)
+        stat = os.stat(key)
+        signature: Tuple[int, int] = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.size, entry.mtime_ns) == signature:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return _served(entry, "hits", instrumentation)
+
+        if entry is None:
+            entry = self._load_disk(key)
+            if entry is not None and (entry.size, entry.mtime_ns) == signature:
+                self._remember(key, entry, "disk_hits")
+                return _served(entry, "disk_hits", instrumentation)
+
+        data = _read_file(key, instrumentation)
+        digest = _digest(data)
+        new = _Entry(stat.st_size, stat.st_mtime_ns, digest, data)
+        if entry is not None and entry.digest == digest:
+            # Touched but unchanged: keep the decoded preset
+            new.preset, new.decoded = entry.preset, entry.decoded
+            kind = "revalidations"
+        else:
+            kind = "misses"
+        self._remember(key, new, kind)
+        self._store_disk(key, new)
+        return _served(new, kind, instrumentation)
+
+    def read(self, file_path: str, instrumentation=None) -> bytes:
+        """Returns the contents of a preset file, reading it on a miss."""
+        return self._lookup(file_path, instrumentation).data
+
+    def load(
+        self,
+        file_path: str,
+        decode: Callable[[bytes], FabFilterPreset],
+        instrumentation=None,
+    ) -> FabFilterPreset:
+        """Returns a copy of the decoded preset for a file.
+
+        The file is read on a miss and decoded on the first load after it;
+        later hits only copy the preset. ``instrumentation`` receives the
+        stages and counters of the read, and a ``cache_<kind>`` counter.
+        """
+        entry = self._lookup(file_path, instrumentation)
+        if not entry.decoded:
+            entry.preset = decode(entry.data)
+            entry.decoded = True
+        return copy_preset(entry.preset)
+
+    def invalidate(self, file_path: Optional[str] = None):
+        """Drops one file from both tiers, or everything when no path is given."""
+        if file_path is None:
+            with self._lock:
+                self._entries.clear()
+            if self.directory is not None:
+                for name in os.listdir(self.directory):
+                    if name.endswith(".entry"):
+                        os.remove(os.path.join(self.directory, name))
+            return
+
+        key = os.path.abspath(file_path)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.directory is not None:
+            try:
+                os.remove(self._disk_path(key))
+            except FileNotFoundError:
+                pass
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _read_file(path: str, instrumentation) -> bytes:
+    if instrumentation is None:
+        with open(path, "rb") as file:
+            return file.read()
+    start = perf_counter()
+    with open(path, "rb") as file:
+        opened = perf_counter()
+        instrumentation.observe("open", opened - start)
+        data = file.read()
+    instrumentation.observe("read", perf_counter() - opened)
+    return data
+
+
+def _served(entry: _Entry, kind: str, instrumentation) -> _Entry:
+    if instrumentation is not None:
+        instrumentation.increment(f"cache_{kind}")
+        instrumentation.increment("presets_read")
+        instrumentation.increment("bytes_read", len(entry.data))
+    return entry
+
+
+def _clone(obj):
+    clone = object.__new__(type(obj))
+    clone.__dict__.update(obj.__dict__)
+    return clone
+
+
+def copy_preset(preset: Optional[FabFilterPreset]) -> Optional[FabFilterPreset]:
+    """Returns an independent copy of a decoded preset.
+
+    Band and global fields are immutable values (floats, bools and enums),
+    so copying each dataclass's attributes is a full copy, and much cheaper
+    than deepcopy or decoding again.
+    """
+    if preset is None:
+        return None
+    clone = _clone(preset)
+    clone.bands = [_clone(band) for band in preset.bands]
+    clone.global_params = _clone(preset.global_params)
+    return clone
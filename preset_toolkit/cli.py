@@ -0,0 +1,246 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Heavier modules (the preset codec, the writer, the fitting code and NumPy,
+# hashlib and concurrent.futures) are imported where they are used, so that
+# starting the command stays fast
+
+MANIFEST_NAME = ".preset-toolkit-manifest.json"
+
+
+@dataclass
+class ConversionResult:
+    """The outcome of converting one SoundID export."""
+
+    source: str
+    outputs: List[str] = field(default_factory=list)
+    rms_errors: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    digest: Optional[str] = None
+
+
+def _digest(path: str) -> str:
+    import hashlib
+
+    with open(path, "rb") as file:
+        return hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+
+
+def convert_export(source: str, output_base: str, settings: dict) -> ConversionResult:
+    """Fits and writes one preset per channel of a SoundID export.
+
+    Presets are written to ``<output_base>_<channel>.ffp``.
+    """
+    from .fitting import fit_export
+    from .soundid import SoundIdExport
+    from .writer import PresetWriter
+
+    result = ConversionResult(source)
+    try:
+        result.digest = _digest(source)
+        fits = fit_export(SoundIdExport(source), **settings)
+        if not fits:
+            raise ValueError("no channel calibrations found")
+        os.makedirs(os.path.dirname(output_base) or ".", exist_ok=True)
+        with PresetWriter(fsync=False) as writer:
+            for channel, fit in fits.items():
+                path = f"{output_base}_{channel}.ffp"
+                writer.write(path, fit.preset)
+                result.outputs.append(path)
+                result.rms_errors[channel] = fit.rms_error
+        if writer.summary.errors:
+            path, error = writer.summary.errors[0]
+            raise OSError(f"writing {path} failed: {error}")
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def _find_exports(inputs: List[str], pattern: str) -> List[Tuple[str, str]]:
+    """Returns (export path, path relative to its input) pairs."""
+    exports = []
+    for source in inputs:
+        if os.path.isdir(source):
+            for path in sorted(
+                glob.glob(os.path.join(source, "**", pattern), recursive=True)
+            ):
+                exports.append((path, os.path.relpath(path, source)))
+        else:
+            exports.append((source, os.path.basename(source)))
+    return exports
+
+
+def _load_manifest(path: str) -> dict:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _up_to_date(entry: Optional[dict], source: str, check: str, settings) -> bool:
+    if entry is None or entry.get("settings") != settings:
+        return False
+    if not all(os.path.exists(path) for path in entry.get("outputs", [])):
+        return False
+    stat = os.stat(source)
+    if check == "mtime":
+        return [stat.st_size, stat.st_mtime_ns] == [entry["size"], entry["mtime_ns"]]
+    return _digest(source) == entry["digest"]
+
+
+def convert(
+    inputs: List[str],
+    output_dir: str,
+    pattern: str = "*.txt",
+    workers: Optional[int] = None,
+    check: str = "mtime",
+    force: bool = False,
+    settings: Optional[dict] = None,
+    out=None,
+) -> int:
+    """Converts SoundID exports to Pro-Q 3 presets; returns the failure count.
+
+    Exports whose outputs are up to date, by file size and mtime or by
+    content hash (``check``), are skipped using a manifest kept in
+    ``output_dir``.
+    """
+    from .writer import write_atomic
+
+    settings = settings or {}
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {} if force else _load_manifest(manifest_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = []
+    skipped = 0
+    for source, relative in _find_exports(inputs, pattern):
+        key = os.path.abspath(source)
+        if not force and _up_to_date(manifest.get(key), source, check, settings):
+            skipped += 1
+            continue
+        output_base = os.path.join(output_dir, os.path.splitext(relative)[0])
+        jobs.append((key, source, output_base))
+
+    start = time.perf_counter()
+    results = []
+    if workers == 0 or len(jobs) <= 1:
+        results = [convert_export(source, base, settings) for _, source, base in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(convert_export, source, base, settings)
+                for _, source, base in jobs
+            ]
+            for future in as_completed(futures):
+                results.append(future.result())
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    presets = 0
+    for result in results:
+        if result.error is not None:
+            failed += 1
+            print(f"Failed to convert {result.source}: {result.error}", file=sys.stderr)
+            continue
+        presets += len(result.outputs)
+        stat = os.stat(result.source)
+        manifest[os.path.abspath(result.source)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": result.digest,
+            "settings": settings,
+            "outputs": result.outputs,
+        }
+    write_atomic(manifest_path, json.dumps(manifest, indent=1).encode())
+
+    converted = len(results) - failed
+    rate = converted / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Converted {converted} exports into {presets} presets in {elapsed:.2f} s "
+        f"({rate:.1f} exports/s), {skipped} up to date, {failed} failed",
+        file=out or sys.stdout,
+    )
+    return failed
+
+
+def _band_count(value: str) -> int:
+    from .raw import NUM_BANDS
+
+    count = int(value)
+    if not 1 <= count <= NUM_BANDS:
+        raise argparse.ArgumentTypeError(f"must be between 1 and {NUM_BANDS}")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="preset-toolkit",
+        description="Tools for FabFilter Pro-Q 3 presets and SoundID exports.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = commands.add_parser(
+        "convert",
+        help="convert SoundID Reference exports to Pro-Q 3 presets",
+        description="Fits one Pro-Q 3 preset per channel of each SoundID export.",
+    )
+    convert_parser.add_argument(
+        "inputs", nargs="+", help="export files or directories to search"
+    )
+    convert_parser.add_argument(
+        "-o", "--output", required=True, help="output directory"
+    )
+    convert_parser.add_argument(
+        "--pattern", default="*.txt", help="export file pattern (default *.txt)"
+    )
+    convert_parser.add_argument(
+        "-j", "--workers", type=int, help="worker processes (0 runs in-process)"
+    )
+    convert_parser.add_argument(
+        "--check",
+        choices=["mtime", "hash"],
+        default="mtime",
+        help="how to detect unchanged exports (default mtime)",
+    )
+    convert_parser.add_argument(
+        "-f", "--force", action="store_true", help="convert up-to-date exports too"
+    )
+    convert_parser.add_argument(
+        "--max-bands",
+        type=_band_count,
+        default=24,
+        help="most bands to use per preset, 1 to 24 (default 24)",
+    )
+    convert_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="stop adding bands once the largest error is below this many dB",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "convert":
+        failed = convert(
+            args.inputs,
+            args.output,
+            pattern=args.pattern,
+            workers=args.workers,
+            check=args.check,
+            force=args.force,
+            settings={"max_bands": args.max_bands, "tolerance": args.tolerance},
+        )
+        return 1 if failed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
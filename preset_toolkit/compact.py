@@ -0,0 +1,134 @@
+import struct
+import sys
+from array import array
+from typing import Sequence
+
+from .proq3_preset import (
+    NUM_BANDS,
+    NUM_PARAMS,
+    PRESET_SIZE,
+    SCHEMA,
+    _HEADER,
+    EQBand,
+    FabFilterPreset,
+    GlobalParams,
+)
+from .schema import Field, field_codec
+
+# Compact presets keep the encoded parameters in one array("f") and expose
+# them through EQBand/GlobalParams-like views that convert on access, with
+# the conversions of the preset schema. Values are stored as float32,
+# exactly as in the preset file.
+
+_GLOBALS_OFFSET = SCHEMA.num_bands * SCHEMA.band_params
+
+
+def _accessor(index: int, decode, encode) -> property:
+    def getter(self):
+        return decode(self._values[self._offset + index])
+
+    def setter(self, value):
+        self._values[self._offset + index] = encode(value)
+
+    return property(getter, setter)
+
+
+class _CompactView:
+    __slots__ = ("_values", "_offset")
+    _fields = ()
+
+    def __init__(self, values: array, offset: int):
+        self._values = values
+        self._offset = offset
+
+    def _astuple(self):
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other):
+        if isinstance(other, (_CompactView, self._dataclass)):
+            return self._astuple() == tuple(
+                getattr(other, name) for name in self._fields
+            )
+        return NotImplemented
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({values})"
+
+    def to_dataclass(self):
+        return self._dataclass(**dict(zip(self._fields, self._astuple())))
+
+
+def _view_class(name: str, dataclass_type, schema_fields: Sequence[Field]) -> type:
+    namespace = {
+        "__slots__": (),
+        "__doc__": f"A view over the encoded values of one {dataclass_type.__name__}.",
+        "_fields": tuple(f.name for f in schema_fields),
+        "_dataclass": dataclass_type,
+    }
+    for f in schema_fields:
+        namespace[f.name] = _accessor(f.offset, *field_codec(f))
+    return type(name, (_CompactView,), namespace)
+
+
+CompactEQBand = _view_class("CompactEQBand", EQBand, SCHEMA.band_fields)
+CompactGlobalParams = _view_class(
+    "CompactGlobalParams", GlobalParams, SCHEMA.global_fields
+)
+
+
+class CompactBands:
+    """The 24 bands of a compact preset, creating band views on access."""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: array):
+        self._values = values
+
+    def __len__(self) -> int:
+        return NUM_BANDS
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(NUM_BANDS))]
+        if index < 0:
+            index += NUM_BANDS
+        if not 0 <= index < NUM_BANDS:
+            raise IndexError("band index out of range")
+        return CompactEQBand(self._values, index * SCHEMA.band_params)
+
+    def __setitem__(self, index: int, band):
+        view = self[index]
+        for name in view._fields:
+            setattr(view, name, getattr(band, name))
+
+    def __iter__(self):
+        for i in range(NUM_BANDS):
+            yield CompactEQBand(self._values, i * SCHEMA.band_params)
+
+    def __eq__(self, other):
+        if isinstance(other, (CompactBands, list)):
+            return len(other) == NUM_BANDS and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def decode_compact(data, offset: int = 0) -> FabFilterPreset:
+    """Decodes a preset whose bands and global parameters share one array."""
+    fxID, version, num_params = _HEADER.unpack_from(data, offset)
+    start = offset + _HEADER.size
+    body = bytes(data[start : offset + PRESET_SIZE])
+    if len(body) != NUM_PARAMS * 4:
+        raise struct.error(f"unpack requires a buffer of {PRESET_SIZE} bytes")
+    values = array("f", body)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return FabFilterPreset(
+        fxID=fxID.decode("ascii"),
+        version=version,
+        num_params=num_params,
+        bands=CompactBands(values),
+        global_params=CompactGlobalParams(values, _GLOBALS_OFFSET),
+    )
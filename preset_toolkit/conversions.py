@@ -0,0 +1,188 @@
+import math
+import struct
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence
+
+# Band frequencies are stored as log2(Hz) and Q as log10(Q) * Q_SCALE + Q_OFFSET
+Q_SCALE = 0.312098175
+Q_OFFSET = 0.5
+
+# Ranges of the plugin's frequency and Q controls
+FREQUENCY_RANGE = (10.0, 30000.0)
+Q_RANGE = (0.025, 40.0)
+
+_log2 = math.log2
+_log10 = math.log10
+
+
+def freq_convert(value: float) -> float:
+    """Convert frequency to the format used in the preset file."""
+    return _log2(value)
+
+
+def freq_inverse_convert(value: float) -> float:
+    """Convert back from the format used in the preset file to frequency."""
+    return 2**value
+
+
+def q_convert(value: float) -> float:
+    """Convert Q value to the format used in the preset file."""
+    return _log10(value) * Q_SCALE + Q_OFFSET
+
+
+def q_inverse_convert(value: float) -> float:
+    """Convert back from the format used in the preset file to Q value."""
+    return 10 ** ((value - Q_OFFSET) / Q_SCALE)
+
+
+# Array versions, for NumPy arrays or anything np.asarray accepts
+
+
+def freq_convert_array(values):
+    """Vectorized freq_convert."""
+    import numpy as np
+
+    return np.log2(values)
+
+
+def freq_inverse_convert_array(values):
+    """Vectorized freq_inverse_convert."""
+    import numpy as np
+
+    return np.exp2(values)
+
+
+def q_convert_array(values):
+    """Vectorized q_convert."""
+    import numpy as np
+
+    return np.log10(values) * Q_SCALE + Q_OFFSET
+
+
+def q_inverse_convert_array(values):
+    """Vectorized q_inverse_convert."""
+    import numpy as np
+
+    return 10 ** ((np.asarray(values) - Q_OFFSET) / Q_SCALE)
+
+
+def _float32(value: float) -> float:
+    """Rounds to the nearest float32, as stored in the preset file."""
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+def significant_steps(low: float, high: float, digits: int) -> List[float]:
+    """Returns every value in [low, high] with at most ``digits`` significant
+    digits, like the plugin's numeric displays."""
+    values = []
+    exponent = math.floor(math.log10(low))
+    while 10**exponent <= high:
+        step = 10 ** (exponent - digits + 1)
+        decimals = max(0, digits - 1 - exponent)
+        for mantissa in range(10 ** (digits - 1), 10**digits):
+            value = round(mantissa * step, decimals)
+            if low <= value <= high:
+                values.append(value)
+        exponent += 1
+    return values
+
+
+class QuantizedTable:
+    """Conversions snapped to a grid of display values.
+
+    Values are encoded once per grid step; encoding looks the snapped value
+    up and decoding maps a stored float back to its display value, so
+    round-trips are exact and repeated conversions are dictionary lookups.
+    Snapping is done in the encoded domain, i.e. to the nearest step in
+    octaves for frequency.
+    """
+
+    def __init__(
+        self,
+        values: Sequence[float],
+        encode: Callable[[float], float],
+        encode_array: Optional[Callable] = None,
+    ):
+        self.values = list(values)
+        self.raw = [_float32(encode(value)) for value in self.values]
+        self._encode = encode
+        self._encode_array = encode_array
+        self._to_raw = dict(zip(self.values, self.raw))
+        self._from_raw = dict(zip(self.raw, self.values))
+        self._raw_array = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _nearest(self, raw: float) -> int:
+        raws = self.raw
+        i = bisect_left(raws, raw)
+        if i == 0:
+            return 0
+        if i == len(raws):
+            return i - 1
+        return i if raws[i] - raw < raw - raws[i - 1] else i - 1
+
+    def quantize(self, value: float) -> float:
+        """Returns the grid value closest to ``value``."""
+        if value in self._to_raw:
+            return value
+        return self.values[self._nearest(self._encode(value))]
+
+    def to_raw(self, value: float) -> float:
+        """Encodes the grid value closest to ``value``."""
+        raw = self._to_raw.get(value)
+        if raw is None:
+            raw = self.raw[self._nearest(self._encode(value))]
+        return raw
+
+    def from_raw(self, raw: float) -> float:
+        """Decodes a stored value to the closest grid value."""
+        value = self._from_raw.get(raw)
+        if value is None:
+            value = self.values[self._nearest(raw)]
+        return value
+
+    def _nearest_array(self, raw):
+        import numpy as np
+
+        raws = self._raw_array
+        if raws is None:
+            raws = self._raw_array = np.asarray(self.raw)
+        raw = np.asarray(raw, dtype=np.float64)
+        i = np.clip(np.searchsorted(raws, raw), 1, len(raws) - 1)
+        return np.where(raws[i] - raw < raw - raws[i - 1], i, i - 1)
+
+    def to_raw_array(self, values):
+        """Vectorized to_raw."""
+        import numpy as np
+
+        if self._encode_array is not None:
+            encoded = self._encode_array(values)
+        else:
+            encoded = np.vectorize(self._encode, otypes=[float])(values)
+        nearest = self._nearest_array(encoded)
+        return self._raw_array[nearest].astype(np.float32)
+
+    def from_raw_array(self, raw):
+        """Vectorized from_raw."""
+        import numpy as np
+
+        return np.asarray(self.values)[self._nearest_array(raw)]
+
+
+@lru_cache(maxsize=None)
+def frequency_table(digits: int = 4) -> QuantizedTable:
+    """Band frequencies with ``digits`` significant digits (1234 Hz, 12.35 kHz)."""
+    return QuantizedTable(
+        significant_steps(*FREQUENCY_RANGE, digits), freq_convert, freq_convert_array
+    )
+
+
+@lru_cache(maxsize=None)
+def q_table(digits: int = 3) -> QuantizedTable:
+    """Band Q values with ``digits`` significant digits."""
+    return QuantizedTable(
+        significant_steps(*Q_RANGE, digits), q_convert, q_convert_array
+    )
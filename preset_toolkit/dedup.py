@@ -0,0 +1,240 @@
+import hashlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .proq3_preset import (
+    BAND_PARAMS,
+    NUM_BANDS,
+    FabFilterPreset,
+    FabFilterPresetManager,
+)
+from .raw import BAND_NAMES, GLOBAL_NAMES
+
+# Canonical form of a preset: the encoded parameters of its enabled,
+# non-bypassed bands, sorted so band order does not matter, followed by the
+# global parameters that affect the sound. Every value is rounded to a fixed
+# step, so presets that only differ by float noise or by bands that are not
+# heard hash the same.
+_BAND_QUANTIZATION = {
+    "frequency": 1 / 1200,  # log2: one cent
+    "gain": 0.01,  # dB
+    "dyn_range": 0.01,
+    "dyn_range_th": 0.01,
+    "q": 0.001,  # preset scale
+    "unknown1": 0.001,
+    "unknown2": 0.001,
+}
+# Flags and enums are compared as they are
+_BAND_STEPS = np.array([_BAND_QUANTIZATION.get(name, 1) for name in BAND_NAMES])
+_SOUND_GLOBALS = (
+    "process_mode",
+    "linear_mode_value",
+    "gain_scale",
+    "output_gain",
+    "output_pan",
+    "bypass",
+    "phase_invert",
+    "auto_gain",
+)
+_GLOBAL_COLUMNS = [GLOBAL_NAMES.index(name) for name in _SOUND_GLOBALS]
+_GLOBAL_STEP = 0.001
+
+_ENABLED, _ACTIVE, _FREQUENCY, _GAIN, _Q, _FILTER_TYPE = (
+    BAND_NAMES.index(name)
+    for name in ("enabled", "active", "frequency", "gain", "q", "filter_type")
+)
+
+# Near-duplicate features per band slot: active, octave, gain/3 dB, Q and type
+_FEATURE_WEIGHTS = np.array([10.0, 1.0, 1 / 3, 3.0, 4.0])
+_FEATURE_COLUMNS = [_FREQUENCY, _GAIN, _Q, _FILTER_TYPE]
+
+_manager = FabFilterPresetManager()
+
+
+def _encoded(preset: FabFilterPreset) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the (24, 13) encoded bands and (22,) encoded globals."""
+    bands = np.array(_manager._encode_bands(preset.bands), dtype=np.float32)
+    params = np.array(
+        _manager._encode_global_params(preset.global_params), dtype=np.float32
+    )
+    return bands.reshape(NUM_BANDS, BAND_PARAMS).astype(np.float64), params
+
+
+def _active_bands(bands: np.ndarray) -> np.ndarray:
+    """Enabled, non-bypassed bands sorted by frequency, gain and filter type."""
+    bands = bands[(bands[:, _ENABLED] != 0) & (bands[:, _ACTIVE] != 0)]
+    return bands[
+        np.lexsort((bands[:, _FILTER_TYPE], bands[:, _GAIN], bands[:, _FREQUENCY]))
+    ]
+
+
+def canonical_key(preset: FabFilterPreset) -> bytes:
+    """Returns the quantized canonical form of a preset as bytes."""
+    bands, params = _encoded(preset)
+    bands = np.round(_active_bands(bands) / _BAND_STEPS).astype(np.int64)
+    params = np.round(params[_GLOBAL_COLUMNS] / _GLOBAL_STEP).astype(np.int64)
+    return np.int64(len(bands)).tobytes() + bands.tobytes() + params.tobytes()
+
+
+def preset_digest(preset: FabFilterPreset) -> str:
+    """Returns a content hash identifying a preset up to quantization."""
+    return hashlib.blake2b(canonical_key(preset), digest_size=16).hexdigest()
+
+
+def feature_vector(preset: FabFilterPreset) -> np.ndarray:
+    """Returns a fixed-length vector for nearest-neighbour search.
+
+    Enabled, non-bypassed bands fill the slots in frequency order, so Euclidean distance
+    is roughly in octaves, 3 dB gain steps and filter type changes.
+    """
+    bands, _ = _encoded(preset)
+    active = _active_bands(bands)
+    slots = np.zeros((NUM_BANDS, len(_FEATURE_WEIGHTS)))
+    slots[: len(active), 0] = 1
+    slots[: len(active), 1:] = active[:, _FEATURE_COLUMNS]
+    return (slots * _FEATURE_WEIGHTS).ravel()
+
+
+class PresetIndex:
+    """Finds exact and near duplicate presets.
+
+    Exact duplicates share a ``preset_digest``. Near duplicates are found
+    with locality-sensitive hashing: each of ``tables`` hash tables buckets
+    the feature vectors by ``projections`` random projections quantized to
+    ``bucket_width``, and candidates sharing a bucket with the query are
+    ranked by their true distance.
+    """
+
+    def __init__(
+        self,
+        tables: int = 8,
+        projections: int = 4,
+        bucket_width: float = 4.0,
+        seed: int = 0,
+    ):
+        self.tables = tables
+        self.projections = projections
+        self.bucket_width = bucket_width
+        self.seed = seed
+        dims = NUM_BANDS * len(_FEATURE_WEIGHTS)
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((tables, projections, dims))
+        self._offsets = rng.uniform(0, bucket_width, (tables, projections))
+
+        self.names: List[str] = []
+        self.digests: List[str] = []
+        self._vectors: List[np.ndarray] = []
+        self._by_digest: Dict[str, List[int]] = defaultdict(list)
+        self._buckets = [defaultdict(list) for _ in range(tables)]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _bucket_keys(self, vectors: np.ndarray) -> np.ndarray:
+        """Returns (N, tables, projections) bucket coordinates."""
+        projected = np.einsum("tpd,nd->ntp", self._planes, vectors)
+        return np.floor((projected + self._offsets) / self.bucket_width).astype(
+            np.int64
+        )
+
+    def _insert(self, name: str, digest: str, vector: np.ndarray, keys: np.ndarray):
+        row = len(self.names)
+        self.names.append(name)
+        self.digests.append(digest)
+        self._vectors.append(vector)
+        self._by_digest[digest].append(row)
+        for table, key in zip(self._buckets, keys):
+            table[key.tobytes()].append(row)
+
+    def add(self, name: str, preset: FabFilterPreset) -> str:
+        """Adds a preset and returns its digest."""
+        digest = preset_digest(preset)
+        vector = feature_vector(preset)
+        self._insert(name, digest, vector, self._bucket_keys(vector[None])[0])
+        return digest
+
+    def add_many(self, items: Iterable[Tuple[str, Optional[FabFilterPreset]]]):
+        """Adds (name, preset) pairs, skipping missing presets."""
+        for name, preset in items:
+            if preset is not None:
+                self.add(name, preset)
+
+    def duplicates(self, preset: FabFilterPreset) -> List[str]:
+        """Returns the names of presets identical to this one."""
+        return [
+            self.names[row] for row in self._by_digest.get(preset_digest(preset), [])
+        ]
+
+    def duplicate_groups(self) -> List[List[str]]:
+        """Returns every group of two or more identical presets."""
+        return [
+            [self.names[row] for row in rows]
+            for rows in self._by_digest.values()
+            if len(rows) > 1
+        ]
+
+    def nearest(
+        self,
+        preset: FabFilterPreset,
+        k: int = 5,
+        max_distance: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        """Returns up to k (name, distance) pairs of similar presets.
+
+        The search is approximate: only presets sharing an LSH bucket with
+        the query are considered.
+        """
+        vector = feature_vector(preset)
+        keys = self._bucket_keys(vector[None])[0]
+        candidates = set()
+        for table, key in zip(self._buckets, keys):
+            candidates.update(table.get(key.tobytes(), ()))
+        if not candidates:
+            return []
+
+        rows = np.fromiter(candidates, dtype=np.int64)
+        distances = np.linalg.norm(
+            np.stack([self._vectors[r] for r in rows]) - vector, axis=1
+        )
+        order = np.argsort(distances, kind="stable")[:k]
+        return [
+            (self.names[rows[i]], float(distances[i]))
+            for i in order
+            if max_distance is None or distances[i] <= max_distance
+        ]
+
+    def save(self, path: str):
+        """Saves the index to ``path`` in .npz format.
+
+        The file is written through a file object, so numpy does not add a
+        .npz suffix that load() would not find.
+        """
+        with open(path, "wb") as file:
+            np.savez(
+                file,
+                params=np.array(
+                    [self.tables, self.projections, self.bucket_width, self.seed]
+                ),
+                names=np.array(self.names, dtype=str),
+                digests=np.array(self.digests, dtype=str),
+                vectors=np.array(self._vectors).reshape(
+                    len(self._vectors), NUM_BANDS * len(_FEATURE_WEIGHTS)
+                ),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "PresetIndex":
+        """Loads an index saved with save()."""
+        with open(path, "rb") as file, np.load(file) as data:
+            tables, projections, bucket_width, seed = data["params"]
+            index = cls(int(tables), int(projections), float(bucket_width), int(seed))
+            vectors = data["vectors"]
+            names = data["names"].tolist()
+            digests = data["digests"].tolist()
+        for name, digest, vector, keys in zip(
+            names, digests, vectors, index._bucket_keys(vectors)
+        ):
+            index._insert(name, digest, vector, keys)
+        return index
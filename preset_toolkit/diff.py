@@ -0,0 +1,199 @@
+import struct
+from dataclasses import dataclass
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from .proq3_preset import (
+    BAND_PARAMS,
+    NUM_PARAMS,
+    PRESET_SIZE,
+    _HEADER,
+    FabFilterPreset,
+    FabFilterPresetManager,
+)
+from .raw import BAND_NAMES, GLOBAL_NAMES, GLOBALS_OFFSET
+
+# Binary delta: entry count, then (param index, old, new) per changed value
+_COUNT = struct.Struct("<H")
+_ENTRY_DTYPE = np.dtype([("index", "<u2"), ("old", "<f4"), ("new", "<f4")])
+
+_manager = FabFilterPresetManager()
+
+
+def param_name(index: int) -> str:
+    """Returns the path of an encoded parameter, e.g. ``bands[3].gain``.
+
+    Parameters are named as they are stored (see preset_toolkit.raw), so the
+    inverted flags read ``bands[i].active`` and ``global_params.midi_disabled``
+    rather than the dataclass fields ``bypass`` and ``enable_midi``.
+    """
+    if not 0 <= index < NUM_PARAMS:
+        raise IndexError(f"parameter index {index} out of range")
+    if index < GLOBALS_OFFSET:
+        band, column = divmod(index, BAND_PARAMS)
+        return f"bands[{band}].{BAND_NAMES[column]}"
+    return f"global_params.{GLOBAL_NAMES[index - GLOBALS_OFFSET]}"
+
+
+def param_index(name: str) -> int:
+    """Inverse of param_name."""
+    if name.startswith("global_params."):
+        return GLOBALS_OFFSET + GLOBAL_NAMES.index(name[len("global_params.") :])
+    if name.startswith("bands["):
+        band, _, field_name = name[len("bands[") :].partition("].")
+        return int(band) * BAND_PARAMS + BAND_NAMES.index(field_name)
+    raise ValueError(f"Unknown parameter {name!r}")
+
+
+def _values(preset) -> np.ndarray:
+    """Returns the 334 encoded parameters of a preset or preset file bytes."""
+    if isinstance(preset, FabFilterPreset):
+        preset = _manager.encode(preset)
+    return np.frombuffer(
+        preset, dtype="<f4", count=NUM_PARAMS, offset=_HEADER.size
+    ).copy()
+
+
+@dataclass(frozen=True)
+class ParamChange:
+    index: int
+    old: float
+    new: float
+
+    @property
+    def name(self) -> str:
+        return param_name(self.index)
+
+
+class PresetDelta:
+    """The encoded parameters that differ between two presets.
+
+    Values are compared and stored as the float32 values of the preset file,
+    so applying a delta reproduces the target file exactly. The header
+    (fxID, version, num_params) is not part of the delta.
+    """
+
+    def __init__(self, entries: np.ndarray):
+        if entries.dtype != _ENTRY_DTYPE:
+            entries = entries.astype(_ENTRY_DTYPE)
+        self.entries = entries
+
+    @classmethod
+    def from_changes(cls, changes: Iterable[Tuple[int, float, float]]):
+        """Builds a delta from (param index, old, new) tuples."""
+        entries = np.array([tuple(change) for change in changes], dtype=_ENTRY_DTYPE)
+        return cls(entries[np.argsort(entries["index"], kind="stable")])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __bool__(self) -> bool:
+        return len(self.entries) > 0
+
+    def __eq__(self, other):
+        if isinstance(other, PresetDelta):
+            return self.to_bytes() == other.to_bytes()
+        return NotImplemented
+
+    def __repr__(self):
+        changes = ", ".join(f"{c.name}: {c.old!r} -> {c.new!r}" for c in self.changes())
+        return f"PresetDelta({changes})"
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self.entries["index"]
+
+    def changes(self) -> List[ParamChange]:
+        """Returns the changed parameters with their field names."""
+        return [
+            ParamChange(int(index), float(old), float(new))
+            for index, old, new in self.entries.tolist()
+        ]
+
+    def reversed(self) -> "PresetDelta":
+        """Returns the delta going from the target back to the base."""
+        entries = self.entries.copy()
+        entries["old"], entries["new"] = self.entries["new"], self.entries["old"]
+        return PresetDelta(entries)
+
+    def to_bytes(self) -> bytes:
+        """Encodes the delta: a uint16 count, then 10 bytes per change."""
+        return _COUNT.pack(len(self.entries)) + self.entries.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, offset: int = 0) -> "PresetDelta":
+        """Decodes a delta written by to_bytes."""
+        (count,) = _COUNT.unpack_from(data, offset)
+        entries = np.frombuffer(
+            data, dtype=_ENTRY_DTYPE, count=count, offset=offset + _COUNT.size
+        )
+        if np.any(entries["index"] >= NUM_PARAMS):
+            raise ValueError("Delta refers to a parameter index out of range")
+        return cls(entries.copy())
+
+    @property
+    def nbytes(self) -> int:
+        return _COUNT.size + self.entries.nbytes
+
+
+def diff(base, target) -> PresetDelta:
+    """Returns the delta turning ``base`` into ``target``.
+
+    Both may be FabFilterPresets or the bytes of preset files.
+    """
+    old = _values(base)
+    new = _values(target)
+    # Compare bit patterns, so NaNs and signed zeros are handled exactly
+    changed = np.flatnonzero(old.view("<u4") != new.view("<u4"))
+    entries = np.empty(len(changed), dtype=_ENTRY_DTYPE)
+    entries["index"] = changed
+    entries["old"] = old[changed]
+    entries["new"] = new[changed]
+    return PresetDelta(entries)
+
+
+def _patch_values(values: np.ndarray, delta: PresetDelta, check: bool):
+    indices = delta.indices
+    if check:
+        current = values[indices].view("<u4")
+        mismatch = current != delta.entries["old"].view("<u4")
+        if np.any(mismatch):
+            row = int(np.argmax(mismatch))
+            index = int(indices[row])
+            raise ValueError(
+                f"Delta does not apply: {param_name(index)} is {values[index]!r}, "
+                f"expected {delta.entries['old'][row]!r}"
+            )
+    values[indices] = delta.entries["new"]
+
+
+def patch_bytes(data, deltas: Iterable[PresetDelta], check: bool = True) -> bytes:
+    """Applies deltas in order to the bytes of a preset file."""
+    buffer = bytearray(data[:PRESET_SIZE])
+    values = np.frombuffer(buffer, dtype="<f4", count=NUM_PARAMS, offset=_HEADER.size)
+    for delta in deltas:
+        _patch_values(values, delta, check)
+    return bytes(buffer)
+
+
+def apply_patch(
+    preset: FabFilterPreset, delta: PresetDelta, check: bool = True
+) -> FabFilterPreset:
+    """Returns a new preset with the delta applied.
+
+    With ``check`` a ValueError is raised if the preset does not hold the
+    delta's old values.
+    """
+    return _manager.decode(patch_bytes(_manager.encode(preset), [delta], check))
+
+
+def replay(
+    base: FabFilterPreset, deltas: Iterable[PresetDelta], check: bool = True
+) -> FabFilterPreset:
+    """Applies a chain of deltas to a base preset.
+
+    The chain is applied to the encoded values, so the preset is decoded
+    only once at the end.
+    """
+    return _manager.decode(patch_bytes(_manager.encode(base), deltas, check))
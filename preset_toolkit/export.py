@@ -0,0 +1,500 @@
+import csv
+import json
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import fields
+from enum import IntEnum
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .proq3_preset import (
+    NUM_BANDS,
+    EQBand,
+    FabFilterPreset,
+    GlobalParams,
+    ProQFilterType,
+    ProQLPHPSlope,
+    ProQStereoPlacement,
+)
+from .soundid import ChannelCalibration, EqBand
+
+# Exporters take presets, or (name, preset) pairs, and write them in chunks
+# of ``chunk_size`` so memory use does not grow with the number of presets.
+# Importers stream (name, preset) pairs back. Enums are written by name.
+
+CHUNK_SIZE = 1000
+
+_BAND_FIELDS = fields(EQBand)
+_GLOBAL_FIELDS = fields(GlobalParams)
+_HEADER_COLUMNS = ["name", "fxID", "version", "num_params"]
+
+PRESET_COLUMNS = (
+    _HEADER_COLUMNS
+    + [f"bands[{i}].{f.name}" for i in range(NUM_BANDS) for f in _BAND_FIELDS]
+    + [f"global_params.{f.name}" for f in _GLOBAL_FIELDS]
+)
+CALIBRATION_COLUMNS = ["channel", "delay", "gain", "freq", "band_gain"]
+
+PresetItem = Union[FabFilterPreset, Tuple[Optional[str], FabFilterPreset]]
+
+
+@contextmanager
+def _open(target, mode: str):
+    """Opens a path, or passes an already open file through."""
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, mode, newline="" if "b" not in mode else None) as file:
+            yield file
+    else:
+        yield target
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _named(items: Iterable[PresetItem]) -> Iterator[Tuple[Optional[str], object]]:
+    for item in items:
+        if isinstance(item, tuple):
+            yield item
+        else:
+            yield None, item
+
+
+def _dump(value):
+    if isinstance(value, IntEnum):
+        return value.name
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _dump_json(value):
+    if isinstance(value, IntEnum):
+        return value.name
+    return value
+
+
+def _load(field_type, value):
+    if isinstance(field_type, type) and issubclass(field_type, IntEnum):
+        if isinstance(value, str) and not value.lstrip("-").isdigit():
+            return field_type[value]
+        return field_type(int(value))
+    if field_type is bool:
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true")
+        return bool(value)
+    return float(value)
+
+
+def _dataclass_values(dataclass_fields, obj) -> list:
+    return [_dump(getattr(obj, f.name)) for f in dataclass_fields]
+
+
+def _dataclass_dict(dataclass_fields, obj) -> dict:
+    return {f.name: _dump_json(getattr(obj, f.name)) for f in dataclass_fields}
+
+
+def _build(dataclass_type, dataclass_fields, values):
+    return dataclass_type(
+        *(_load(f.type, value) for f, value in zip(dataclass_fields, values))
+    )
+
+
+def preset_row(preset, name: Optional[str] = None) -> list:
+    """Flattens a preset into the values of PRESET_COLUMNS."""
+    row = [name, preset.fxID, preset.version, preset.num_params]
+    for band in preset.bands:
+        row += _dataclass_values(_BAND_FIELDS, band)
+    row += _dataclass_values(_GLOBAL_FIELDS, preset.global_params)
+    return row
+
+
+def preset_from_row(row) -> Tuple[Optional[str], FabFilterPreset]:
+    """Inverse of preset_row; values may be strings."""
+    name, fxID, version, num_params = row[:4]
+    start = len(_HEADER_COLUMNS)
+    bands = []
+    for _ in range(NUM_BANDS):
+        stop = start + len(_BAND_FIELDS)
+        bands.append(_build(EQBand, _BAND_FIELDS, row[start:stop]))
+        start = stop
+    return name or None, FabFilterPreset(
+        fxID=fxID,
+        version=int(version),
+        num_params=int(num_params),
+        bands=bands,
+        global_params=_build(GlobalParams, _GLOBAL_FIELDS, row[start:]),
+    )
+
+
+def export_csv(items: Iterable[PresetItem], target, chunk_size: int = CHUNK_SIZE):
+    """Writes one row per preset with one column per parameter."""
+    count = 0
+    with _open(target, "w") as file:
+        writer = csv.writer(file)
+        writer.writerow(PRESET_COLUMNS)
+        for chunk in _chunks(_named(items), chunk_size):
+            writer.writerows(preset_row(preset, name) for name, preset in chunk)
+            count += len(chunk)
+    return count
+
+
+def import_csv(source) -> Iterator[Tuple[Optional[str], FabFilterPreset]]:
+    """Reads presets written by export_csv."""
+    with _open(source, "r") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        if header != PRESET_COLUMNS:
+            raise ValueError("Not a preset CSV export: unexpected columns")
+        for row in reader:
+            yield preset_from_row(row)
+
+
+def preset_to_dict(preset, name: Optional[str] = None) -> dict:
+    """Returns a JSON-serializable dict of a preset."""
+    return {
+        "name": name,
+        "fxID": preset.fxID,
+        "version": preset.version,
+        "num_params": preset.num_params,
+        "bands": [_dataclass_dict(_BAND_FIELDS, band) for band in preset.bands],
+        "global_params": _dataclass_dict(_GLOBAL_FIELDS, preset.global_params),
+    }
+
+
+def preset_from_dict(data: dict) -> Tuple[Optional[str], FabFilterPreset]:
+    """Inverse of preset_to_dict. Missing fields keep their defaults."""
+
+    def build(dataclass_type, dataclass_fields, values):
+        return dataclass_type(
+            **{
+                f.name: _load(f.type, values[f.name])
+                for f in dataclass_fields
+                if f.name in values
+            }
+        )
+
+    bands = [build(EQBand, _BAND_FIELDS, band) for band in data.get("bands", [])]
+    bands += [EQBand() for _ in range(NUM_BANDS - len(bands))]
+    preset = FabFilterPreset(
+        bands=bands,
+        global_params=build(
+            GlobalParams, _GLOBAL_FIELDS, data.get("global_params", {})
+        ),
+    )
+    for key in ("fxID", "version", "num_params"):
+        if key in data:
+            setattr(preset, key, data[key])
+    return data.get("name"), preset
+
+
+def export_ndjson(items: Iterable[PresetItem], target, chunk_size: int = CHUNK_SIZE):
+    """Writes one JSON object per line and preset."""
+    count = 0
+    with _open(target, "w") as file:
+        for chunk in _chunks(_named(items), chunk_size):
+            file.write(
+                "".join(
+                    json.dumps(preset_to_dict(preset, name)) + "\n"
+                    for name, preset in chunk
+                )
+            )
+            count += len(chunk)
+    return count
+
+
+def import_ndjson(source) -> Iterator[Tuple[Optional[str], FabFilterPreset]]:
+    """Reads presets written by export_ndjson."""
+    with _open(source, "r") as file:
+        for line in file:
+            if line.strip():
+                yield preset_from_dict(json.loads(line))
+
+
+# Equalizer APO configuration, which is also the filter format REW exports.
+# Band types without an APO equivalent are written as comments.
+_APO_TYPES = {
+    ProQFilterType.Bell: "PK",
+    ProQFilterType.LowShelf: "LSC",
+    ProQFilterType.HighShelf: "HSC",
+    ProQFilterType.LowCut: "HPQ",
+    ProQFilterType.HighCut: "LPQ",
+    ProQFilterType.Notch: "NO",
+    ProQFilterType.BandPass: "BP",
+}
+_APO_IMPORT_TYPES = {apo: filter_type for filter_type, apo in _APO_TYPES.items()}
+_APO_IMPORT_TYPES.update(
+    {
+        "HP": ProQFilterType.LowCut,
+        "LP": ProQFilterType.HighCut,
+        "PEQ": ProQFilterType.Bell,
+    }
+)
+_APO_GAIN_TYPES = {"PK", "LSC", "HSC"}
+_APO_CHANNELS = {
+    ProQStereoPlacement.Left: "L",
+    ProQStereoPlacement.Right: "R",
+    ProQStereoPlacement.Stereo: "all",
+}
+
+_APO_FILTER_RE = re.compile(
+    r"Filter\s*\d*:\s*(ON|OFF)\s+([A-Z]+)"
+    r"(?:\s+Fc\s+([-+\d.eE]+)\s*Hz)?"
+    r"(?:\s+Gain\s+([-+\d.eE]+)\s*dB)?"
+    r"(?:\s+Q\s+([-+\d.eE]+))?",
+    re.IGNORECASE,
+)
+_APO_PRESET_RE = re.compile(r"#\s*Preset:\s*(.*)")
+_APO_CHANNEL_RE = re.compile(r"Channel:\s*(.*)", re.IGNORECASE)
+
+
+def _number(value: float) -> str:
+    return f"{value:.7g}"
+
+
+def preset_to_apo(preset) -> List[str]:
+    """Returns the Equalizer APO/REW filter lines of a preset's enabled bands."""
+    lines = []
+    channel = "all"
+    number = 0
+    for band in preset.bands:
+        if not band.enabled:
+            continue
+        number += 1
+        filter_type = band.filter_type
+        apo = _APO_TYPES.get(filter_type)
+        cut = filter_type in (ProQFilterType.LowCut, ProQFilterType.HighCut)
+        if apo is None or (cut and band.lp_hp_slope != ProQLPHPSlope.Slope12dB_oct):
+            lines.append(
+                f"# Filter {number}: unsupported {filter_type.name} at "
+                f"{_number(band.frequency)} Hz"
+            )
+            continue
+        band_channel = _APO_CHANNELS[band.stereo_placement]
+        if band_channel != channel:
+            channel = band_channel
+            lines.append(f"Channel: {channel}")
+        line = f"Filter {number}: {'OFF' if band.bypass else 'ON'} {apo}"
+        line += f" Fc {_number(band.frequency)} Hz"
+        if apo in _APO_GAIN_TYPES:
+            line += f" Gain {_number(band.gain)} dB"
+        lines.append(line + f" Q {_number(band.q)}")
+    if channel != "all":
+        lines.append("Channel: all")
+    return lines
+
+
+def export_apo(items: Iterable[PresetItem], target, chunk_size: int = CHUNK_SIZE):
+    """Writes presets as Equalizer APO/REW filter text, one block per preset."""
+    count = 0
+    with _open(target, "w") as file:
+        for chunk in _chunks(_named(items), chunk_size):
+            blocks = []
+            for name, preset in chunk:
+                lines = [f"# Preset: {name or ''}"] + preset_to_apo(preset)
+                blocks.append("\n".join(lines) + "\n\n")
+            file.write("".join(blocks))
+            count += len(chunk)
+    return count
+
+
+def _apo_placement(channels: str) -> ProQStereoPlacement:
+    channels = set(channels.split())
+    if channels == {"L"}:
+        return ProQStereoPlacement.Left
+    if channels == {"R"}:
+        return ProQStereoPlacement.Right
+    return ProQStereoPlacement.Stereo
+
+
+def import_apo(source) -> Iterator[Tuple[Optional[str], FabFilterPreset]]:
+    """Reads Equalizer APO/REW filter text into presets.
+
+    Blocks starting with ``# Preset:`` become separate presets; a file
+    without them is read as a single preset. Filters beyond the 24 bands
+    of Pro-Q 3 raise a ValueError.
+    """
+    name = None
+    preset = None
+    slot = 0
+    placement = ProQStereoPlacement.Stereo
+    with _open(source, "r") as file:
+        for line in file:
+            line = line.strip()
+            match = _APO_PRESET_RE.match(line)
+            if match:
+                if preset is not None:
+                    yield name, preset
+                name, preset, slot = match.group(1) or None, FabFilterPreset(), 0
+                placement = ProQStereoPlacement.Stereo
+                continue
+            match = _APO_CHANNEL_RE.match(line)
+            if match:
+                placement = _apo_placement(match.group(1))
+                continue
+            match = _APO_FILTER_RE.match(line)
+            if not match or match.group(3) is None:
+                continue
+            state, apo, freq, gain, q = match.groups()
+            filter_type = _APO_IMPORT_TYPES.get(apo.upper())
+            if filter_type is None:
+                continue
+            if preset is None:
+                preset = FabFilterPreset()
+            if slot >= NUM_BANDS:
+                raise ValueError(f"More than {NUM_BANDS} filters in preset {name!r}")
+            band = preset.bands[slot]
+            band.enabled = True
+            band.bypass = state.upper() == "OFF"
+            band.filter_type = filter_type
+            band.frequency = float(freq)
+            band.gain = float(gain) if gain is not None else 0.0
+            band.q = float(q) if q is not None else 0.7071
+            band.stereo_placement = placement
+            slot += 1
+    if preset is not None:
+        yield name, preset
+
+
+# SoundID calibrations: long-format CSV rows, one JSON object per channel, or
+# APO Channel/Preamp/Delay/GraphicEQ blocks
+
+
+def export_calibrations_csv(
+    calibrations: Iterable[ChannelCalibration], target, chunk_size: int = CHUNK_SIZE
+):
+    """Writes one row per channel and calibration point."""
+    count = 0
+    with _open(target, "w") as file:
+        writer = csv.writer(file)
+        writer.writerow(CALIBRATION_COLUMNS)
+        for chunk in _chunks(calibrations, chunk_size):
+            for channel in chunk:
+                writer.writerows(
+                    [channel.name, channel.delay, channel.gain, band.freq, band.gain]
+                    for band in channel.bands
+                )
+            count += len(chunk)
+    return count
+
+
+def import_calibrations_csv(source) -> Iterator[ChannelCalibration]:
+    """Reads calibrations written by export_calibrations_csv."""
+    channel = None
+    with _open(source, "r") as file:
+        reader = csv.reader(file)
+        if next(reader) != CALIBRATION_COLUMNS:
+            raise ValueError("Not a calibration CSV export: unexpected columns")
+        for name, delay, gain, freq, band_gain in reader:
+            if channel is None or channel.name != name:
+                if channel is not None:
+                    yield channel
+                channel = ChannelCalibration(name, float(delay), float(gain))
+            channel.bands.append(EqBand(float(freq), float(band_gain)))
+    if channel is not None:
+        yield channel
+
+
+def export_calibrations_ndjson(
+    calibrations: Iterable[ChannelCalibration], target, chunk_size: int = CHUNK_SIZE
+):
+    """Writes one JSON object per line and channel."""
+    count = 0
+    with _open(target, "w") as file:
+        for chunk in _chunks(calibrations, chunk_size):
+            for channel in chunk:
+                data = {
+                    "channel": channel.name,
+                    "delay": channel.delay,
+                    "gain": channel.gain,
+                    "bands": [[band.freq, band.gain] for band in channel.bands],
+                }
+                file.write(json.dumps(data) + "\n")
+            count += len(chunk)
+    return count
+
+
+def import_calibrations_ndjson(source) -> Iterator[ChannelCalibration]:
+    """Reads calibrations written by export_calibrations_ndjson."""
+    with _open(source, "r") as file:
+        for line in file:
+            if line.strip():
+                data = json.loads(line)
+                yield ChannelCalibration(
+                    data["channel"],
+                    data["delay"],
+                    data["gain"],
+                    [EqBand(freq, gain) for freq, gain in data["bands"]],
+                )
+
+
+def calibration_to_apo(channel: ChannelCalibration) -> List[str]:
+    """Returns the Equalizer APO lines applying one channel calibration."""
+    points = "; ".join(
+        f"{_number(band.freq)} {_number(band.gain)}" for band in channel.bands
+    )
+    return [
+        f"Channel: {channel.name}",
+        f"Preamp: {_number(channel.gain)} dB",
+        f"Delay: {_number(channel.delay)} ms",
+        f"GraphicEQ: {points}",
+    ]
+
+
+def export_calibrations_apo(
+    calibrations: Iterable[ChannelCalibration], target, chunk_size: int = CHUNK_SIZE
+):
+    """Writes calibrations as Equalizer APO GraphicEQ configuration."""
+    count = 0
+    with _open(target, "w") as file:
+        for chunk in _chunks(calibrations, chunk_size):
+            file.write(
+                "".join(
+                    "\n".join(calibration_to_apo(channel)) + "\n\n" for channel in chunk
+                )
+            )
+            count += len(chunk)
+        file.write("Channel: all\n")
+    return count
+
+
+_APO_VALUE_RE = re.compile(r"(Preamp|Delay):\s*([-+\d.eE]+)", re.IGNORECASE)
+_APO_GRAPHIC_RE = re.compile(r"GraphicEQ:\s*(.*)", re.IGNORECASE)
+
+
+def import_calibrations_apo(source) -> Iterator[ChannelCalibration]:
+    """Reads calibrations written by export_calibrations_apo."""
+    channel = None
+    with _open(source, "r") as file:
+        for line in file:
+            line = line.strip()
+            match = _APO_CHANNEL_RE.match(line)
+            if match:
+                if channel is not None and channel.bands:
+                    yield channel
+                channel = ChannelCalibration(match.group(1).strip())
+                continue
+            if channel is None:
+                continue
+            match = _APO_VALUE_RE.match(line)
+            if match:
+                value = float(match.group(2))
+                if match.group(1).lower() == "preamp":
+                    channel.gain = value
+                else:
+                    channel.delay = value
+                continue
+            match = _APO_GRAPHIC_RE.match(line)
+            if match:
+                for point in match.group(1).split(";"):
+                    if point.strip():
+                        freq, gain = point.split()
+                        channel.bands.append(EqBand(float(freq), float(gain)))
+    if channel is not None and channel.bands:
+        yield channel
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from .proq3_preset import NUM_BANDS, FabFilterPreset, ProQFilterType
+from .response import biquad_coefficients, biquad_response, magnitude_db
+from .soundid import EqBand, SoundIdExport
+
+# Candidate filters tried by the greedy search at every grid frequency
+_BELL_QS = (0.5, 1.0, 2.0, 4.0, 8.0)
+_SHELF_Q = 0.7
+_REFERENCE_GAIN = 6.0
+_MAX_GAIN = 30.0
+
+
+@dataclass
+class FitResult:
+    """A preset fitted to a target curve and how far it is from it."""
+
+    preset: FabFilterPreset
+    freqs: np.ndarray
+    target: np.ndarray
+    response: np.ndarray
+
+    @property
+    def error(self) -> np.ndarray:
+        return self.response - self.target
+
+    @property
+    def rms_error(self) -> float:
+        return float(np.sqrt(np.mean(self.error**2)))
+
+    @property
+    def max_error(self) -> float:
+        return float(np.max(np.abs(self.error)))
+
+
+def _grid(low: float, high: float, points: int) -> np.ndarray:
+    return np.geomspace(low, high, points)
+
+
+@lru_cache(maxsize=16)
+def _candidates(
+    low: float, high: float, points: int, sample_rate: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Builds the candidate filters and their responses per dB of gain."""
+    grid = _grid(low, high, points)
+    types = [ProQFilterType.Bell] * (len(_BELL_QS) * points)
+    freqs = list(np.repeat(grid, len(_BELL_QS)))
+    qs = list(np.tile(_BELL_QS, points))
+    for shelf_type in (ProQFilterType.LowShelf, ProQFilterType.HighShelf):
+        types += [shelf_type] * points
+        freqs += list(grid)
+        qs += [_SHELF_Q] * points
+
+    types = np.array(types)
+    freqs = np.array(freqs)
+    qs = np.array(qs)
+    shapes = (
+        magnitude_db(
+            biquad_response(
+                biquad_coefficients(types, freqs, _REFERENCE_GAIN, qs, sample_rate),
+                grid,
+                sample_rate,
+            )
+        )
+        / _REFERENCE_GAIN
+    )
+    return types, freqs, qs, shapes
+
+
+def _bands_response(types, freqs, gains, qs, grid, sample_rate) -> np.ndarray:
+    """Returns the dB response of each band, shape (bands, F)."""
+    coefficients = biquad_coefficients(types, freqs, gains, qs, sample_rate)
+    return magnitude_db(biquad_response(coefficients, grid, sample_rate))
+
+
+def fit_curve(
+    freqs: Sequence[float],
+    gains: Sequence[float],
+    max_bands: int = NUM_BANDS,
+    tolerance: float = 0.25,
+    points: int = 96,
+    sample_rate: float = 48000,
+    refine_iterations: int = 3,
+) -> FitResult:
+    """Fits Bell and Shelf bands to a target curve given in dB.
+
+    Bands are picked greedily from a fixed dictionary of candidate filters on
+    a log-frequency grid, each time taking the candidate that best explains
+    the remaining error, until the largest absolute error is within
+    ``tolerance`` dB or ``max_bands`` are used. The gains are then refined
+    by least squares. ``max_bands`` must be between 1 and the number of
+    bands in a preset.
+    """
+    if not 1 <= max_bands <= NUM_BANDS:
+        raise ValueError(f"max_bands must be between 1 and {NUM_BANDS}: {max_bands}")
+    freqs = np.asarray(freqs, dtype=np.float64)
+    order = np.argsort(freqs)
+    freqs = freqs[order]
+    gains = np.asarray(gains, dtype=np.float64)[order]
+
+    low, high = float(freqs[0]), float(freqs[-1])
+    grid = _grid(low, high, points)
+    target = np.interp(np.log2(grid), np.log2(freqs), gains)
+    types, cand_freqs, cand_qs, shapes = _candidates(low, high, points, sample_rate)
+    norms = np.einsum("cf,cf->c", shapes, shapes)
+
+    chosen = []
+    band_gains = []
+    per_band = []
+    response = np.zeros_like(target)
+    for _ in range(4 * max_bands):
+        residual = target - response
+        if np.max(np.abs(residual)) <= tolerance:
+            break
+        projections = shapes @ residual
+        best = int(np.argmax(projections**2 / norms))
+        gain = projections[best] / norms[best]
+        if abs(gain) < 1e-3:
+            break
+        if best in chosen:
+            # Picking a used candidate again adds to its gain
+            i = chosen.index(best)
+            band_gains[i] += gain
+        elif len(chosen) < max_bands:
+            i = len(chosen)
+            chosen.append(best)
+            band_gains.append(gain)
+            per_band.append(None)
+        else:
+            break
+        band_gains[i] = float(np.clip(band_gains[i], -_MAX_GAIN, _MAX_GAIN))
+        per_band[i] = _bands_response(
+            types[best],
+            cand_freqs[best],
+            band_gains[i],
+            cand_qs[best],
+            grid,
+            sample_rate,
+        )
+        response = np.sum(per_band, axis=0)
+
+    for _ in range(refine_iterations if chosen else 0):
+        # Each band's response scaled back to 1 dB of gain, solved jointly
+        gains = np.asarray(band_gains)
+        unit = np.asarray(per_band) / np.where(gains == 0, 1, gains)[:, None]
+        band_gains = list(
+            np.clip(
+                np.linalg.lstsq(unit.T, target, rcond=None)[0], -_MAX_GAIN, _MAX_GAIN
+            )
+        )
+        per_band = _bands_response(
+            types[chosen],
+            cand_freqs[chosen],
+            band_gains,
+            cand_qs[chosen],
+            grid,
+            sample_rate,
+        )
+        response = per_band.sum(axis=0)
+
+    preset = FabFilterPreset()
+    for band, k, gain in zip(preset.bands, chosen, band_gains):
+        band.enabled = True
+        band.filter_type = ProQFilterType(int(types[k]))
+        band.frequency = float(cand_freqs[k])
+        band.gain = float(gain)
+        band.q = float(cand_qs[k])
+
+    return FitResult(preset=preset, freqs=grid, target=target, response=response)
+
+
+def fit_eq_bands(bands: Sequence[EqBand], **kwargs) -> FitResult:
+    """Fits a preset to a list of SoundID EqBand points."""
+    return fit_curve(
+        [band.freq for band in bands], [band.gain for band in bands], **kwargs
+    )
+
+
+def fit_export(export: SoundIdExport, **kwargs) -> Dict[str, FitResult]:
+    """Fits one preset per channel of a SoundID export."""
+    return {
+        channel.name: fit_eq_bands(channel.bands, **kwargs)
+        for channel in export.iter_channels()
+        if channel.bands
+    }
@@ -0,0 +1,167 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Stages timed by an instrumented FabFilterPresetManager
+STAGES = (
+    "open",
+    "read",
+    "decode_header",
+    "decode_bands",
+    "decode_globals",
+    "construct",
+    "encode",
+    "write",
+)
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+@dataclass
+class ErrorEvent:
+    event: str
+    path: Optional[str]
+    error_type: str
+    message: str
+
+
+class Instrumentation:
+    """Receives timings, counters and errors from a FabFilterPresetManager.
+
+    Pass an instance as ``FabFilterPresetManager(instrumentation=...)``. The
+    base class ignores everything; subclasses override what they need.
+    Without instrumentation the manager skips the timing code entirely and
+    prints errors as before.
+    """
+
+    def observe(self, stage: str, seconds: float):
+        """Records the duration of one stage."""
+
+    def increment(self, counter: str, value: int = 1):
+        """Adds to a counter such as ``presets_read`` or ``bytes_written``."""
+
+    def error(self, event: str, path: Optional[str], exception: BaseException):
+        """Records a failure such as ``read_error`` or ``write_error``."""
+
+
+class Recorder(Instrumentation):
+    """Instrumentation that aggregates stages, counters and errors in memory."""
+
+    def __init__(self, max_errors: int = 1000):
+        self.max_errors = max_errors
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.error_counts: Dict[str, int] = {}
+        self.errors: List[ErrorEvent] = []
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.calls += 1
+            stats.seconds += seconds
+            if seconds > stats.max_seconds:
+                stats.max_seconds = seconds
+
+    def increment(self, counter: str, value: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def error(self, event: str, path: Optional[str], exception: BaseException):
+        with self._lock:
+            self.error_counts[event] = self.error_counts.get(event, 0) + 1
+            if len(self.errors) < self.max_errors:
+                self.errors.append(
+                    ErrorEvent(event, path, type(exception).__name__, str(exception))
+                )
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.error_counts.clear()
+            self.errors.clear()
+
+
+class LoggingInstrumentation(Recorder):
+    """Logs errors as structured records and stage timings at DEBUG level.
+
+    Records carry ``preset_event``, ``preset_path`` and ``preset_stage``
+    attributes for log formatters and handlers.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.logger = logger or logging.getLogger("preset_toolkit")
+
+    def observe(self, stage: str, seconds: float):
+        super().observe(stage, seconds)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "%s took %.1f us",
+                stage,
+                seconds * 1e6,
+                extra={"preset_stage": stage, "preset_seconds": seconds},
+            )
+
+    def error(self, event: str, path: Optional[str], exception: BaseException):
+        super().error(event, path, exception)
+        self.logger.error(
+            "%s for %s: %s",
+            event,
+            path,
+            exception,
+            extra={"preset_event": event, "preset_path": path},
+        )
+
+
+class PrometheusInstrumentation(Recorder):
+    """Exposes the recorded metrics in the Prometheus text format."""
+
+    def __init__(self, namespace: str = "preset_toolkit", **kwargs):
+        super().__init__(**kwargs)
+        self.namespace = namespace
+
+    def exposition(self) -> str:
+        """Returns the metrics as a Prometheus text exposition."""
+        ns = self.namespace
+        with self._lock:
+            stages = sorted(self.stages.items())
+            counters = sorted(self.counters.items())
+            errors = sorted(self.error_counts.items())
+
+        lines = [
+            f"# HELP {ns}_stage_seconds_total Time spent in each stage.",
+            f"# TYPE {ns}_stage_seconds_total counter",
+        ]
+        lines += [
+            f'{ns}_stage_seconds_total{{stage="{stage}"}} {stats.seconds!r}'
+            for stage, stats in stages
+        ]
+        lines += [
+            f"# HELP {ns}_stage_calls_total Number of times each stage ran.",
+            f"# TYPE {ns}_stage_calls_total counter",
+        ]
+        lines += [
+            f'{ns}_stage_calls_total{{stage="{stage}"}} {stats.calls}'
+            for stage, stats in stages
+        ]
+        for counter, value in counters:
+            lines += [
+                f"# TYPE {ns}_{counter}_total counter",
+                f"{ns}_{counter}_total {value}",
+            ]
+        lines += [
+            f"# HELP {ns}_errors_total Errors by event.",
+            f"# TYPE {ns}_errors_total counter",
+        ]
+        lines += [f'{ns}_errors_total{{event="{event}"}} {n}' for event, n in errors]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,147 @@
+import struct
+from typing import List, Optional
+
+from .proq3_preset import (
+    NUM_BANDS,
+    PRESET_SIZE,
+    SCHEMA,
+    _HEADER,
+    EQBand,
+    FabFilterPreset,
+    FabFilterPresetManager,
+    GlobalParams,
+)
+
+# Lazy presets keep the preset file bytes and decode each band, and the global
+# parameters, the first time they are accessed. Encoding starts from the
+# original bytes and only re-encodes what was accessed or assigned.
+
+_BAND = struct.Struct(f"<{SCHEMA.band_params}f")
+_BANDS = struct.Struct(f"<{SCHEMA.num_bands * SCHEMA.band_params}f")
+_GLOBALS = struct.Struct(f"<{SCHEMA.global_params}f")
+_GLOBALS_START = _HEADER.size + _BANDS.size
+
+
+class LazyBands:
+    """The 24 bands of a lazy preset, each decoded on first access."""
+
+    __slots__ = ("_data", "_bands")
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._bands: List[Optional[EQBand]] = [None] * NUM_BANDS
+
+    def __len__(self) -> int:
+        return NUM_BANDS
+
+    def _band(self, index: int) -> EQBand:
+        band = self._bands[index]
+        if band is None:
+            values = _BAND.unpack_from(self._data, _HEADER.size + index * _BAND.size)
+            band = self._bands[index] = SCHEMA.decode_bands(values, 0, 1)[0]
+        return band
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._band(i) for i in range(*index.indices(NUM_BANDS))]
+        if index < 0:
+            index += NUM_BANDS
+        if not 0 <= index < NUM_BANDS:
+            raise IndexError("band index out of range")
+        return self._band(index)
+
+    def __setitem__(self, index: int, band: EQBand):
+        if not -NUM_BANDS <= index < NUM_BANDS:
+            raise IndexError("band index out of range")
+        self._bands[index] = band
+
+    def __iter__(self):
+        for i in range(NUM_BANDS):
+            yield self._band(i)
+
+    def __eq__(self, other):
+        if isinstance(other, (LazyBands, list)):
+            return len(other) == NUM_BANDS and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def decoded(self) -> List[int]:
+        """Returns the indices of the bands decoded or assigned so far."""
+        return [i for i, band in enumerate(self._bands) if band is not None]
+
+
+class LazyPreset(FabFilterPreset):
+    """A FabFilterPreset that decodes bands and global parameters on access.
+
+    Only the header is decoded up front. Decoded bands and global parameters
+    are kept, so changes made to them are written back by the manager.
+    """
+
+    def __init__(self, data, offset: int = 0):
+        data = bytes(data[offset : offset + PRESET_SIZE])
+        if len(data) != PRESET_SIZE:
+            raise struct.error(f"unpack requires a buffer of {PRESET_SIZE} bytes")
+        fxID, version, num_params = _HEADER.unpack_from(data)
+        self.fxID = fxID.decode("ascii")
+        self.version = version
+        self.num_params = num_params
+        self._data = data
+        self._bands = LazyBands(data)
+        self._global_params: Optional[GlobalParams] = None
+
+    @property
+    def bands(self):
+        return self._bands
+
+    @bands.setter
+    def bands(self, bands):
+        self._bands = bands
+
+    @property
+    def global_params(self) -> GlobalParams:
+        if self._global_params is None:
+            values = _GLOBALS.unpack_from(self._data, _GLOBALS_START)
+            self._global_params = SCHEMA.decode_global_params(values)
+        return self._global_params
+
+    @global_params.setter
+    def global_params(self, params: GlobalParams):
+        self._global_params = params
+
+    def __eq__(self, other):
+        if isinstance(other, FabFilterPreset):
+            return (
+                self.fxID == other.fxID
+                and self.version == other.version
+                and self.num_params == other.num_params
+                and self.bands == other.bands
+                and self.global_params == other.global_params
+            )
+        return NotImplemented
+
+    def _encode_into(self, manager: FabFilterPresetManager, buffer, offset: int):
+        """Writes the original bytes, then re-encodes what may have changed."""
+        memoryview(buffer)[offset : offset + PRESET_SIZE] = self._data
+        _HEADER.pack_into(
+            buffer, offset, self.fxID.encode("ascii"), self.version, self.num_params
+        )
+        bands = self._bands
+        if isinstance(bands, LazyBands) and bands._data is self._data:
+            for i in bands.decoded():
+                _BAND.pack_into(
+                    buffer,
+                    offset + _HEADER.size + i * _BAND.size,
+                    *manager._flatten_bands([bands._bands[i]]),
+                )
+        else:
+            _BANDS.pack_into(
+                buffer, offset + _HEADER.size, *manager._encode_bands(bands)
+            )
+        if self._global_params is not None:
+            _GLOBALS.pack_into(
+                buffer,
+                offset + _GLOBALS_START,
+                *manager._encode_global_params(self._global_params),
+            )
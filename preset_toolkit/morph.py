@@ -0,0 +1,209 @@
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .bank import BAND_COLUMNS, GLOBAL_COLUMNS, RECORD_DTYPE, PresetBank
+
+# Morphing works on the encoded parameters, where interpolating linearly is
+# already perceptually sensible: frequency is stored as log2(Hz), Q on a log
+# scale and gains in dB. Fields not listed here (switches and enums) are
+# taken from one of the sources instead of being interpolated.
+BAND_CONTINUOUS = ("frequency", "q", "dyn_range_th")
+# Band levels fade to 0 dB towards the sources where the band is disabled
+BAND_LEVELS = ("gain", "dyn_range")
+GLOBAL_CONTINUOUS = ("gain_scale", "output_gain", "output_pan")
+
+BAND_DISCRETE = tuple(
+    name
+    for name in BAND_COLUMNS
+    if name not in BAND_CONTINUOUS and name not in BAND_LEVELS
+)
+GLOBAL_DISCRETE = tuple(
+    name for name in GLOBAL_COLUMNS if name not in GLOBAL_CONTINUOUS
+)
+
+# Default position at which interpolate switches a discrete field to the end
+# preset
+DEFAULT_THRESHOLD = 0.5
+
+_BAND_CONTINUOUS = [BAND_COLUMNS[name] for name in BAND_CONTINUOUS]
+_BAND_LEVELS = [BAND_COLUMNS[name] for name in BAND_LEVELS]
+_GLOBAL_CONTINUOUS = [GLOBAL_COLUMNS[name] for name in GLOBAL_CONTINUOUS]
+_ENABLED = BAND_COLUMNS["enabled"]
+
+
+def _mix(sources: np.ndarray, weights: np.ndarray, band_choice, global_choice):
+    """Morphs M groups of S source records into M x K records.
+
+    ``weights`` is (M, K, S); ``band_choice`` and ``global_choice`` give the
+    source index of each discrete band and global field, broadcastable to
+    (M, K, F). Each band's continuous fields are averaged over the sources
+    where it is enabled, so a band missing from one source does not sweep
+    in from that source's leftover frequency.
+    """
+    bands = sources["bands"]  # (M, S, 24, 13)
+    global_params = sources["global_params"]  # (M, S, 22)
+    groups, variants = weights.shape[:2]
+    weights = weights / weights.sum(axis=-1, keepdims=True)
+
+    out = np.empty((groups, variants), dtype=RECORD_DTYPE)
+    out["fxID"] = sources["fxID"][:, :1]
+    out["version"] = sources["version"][:, :1]
+    out["num_params"] = sources["num_params"][:, :1]
+
+    enabled = (bands[..., _ENABLED] != 0).astype(np.float64)  # (M, S, 24)
+    band_weights = weights[..., None] * enabled[:, None]  # (M, K, S, 24)
+    total = band_weights.sum(axis=2, keepdims=True)
+    # Extrapolating gives the enabled sources a negative total weight, which
+    # still normalizes to weights over those sources only
+    weighted = total != 0
+    normalized = np.where(
+        weighted, band_weights / np.where(weighted, total, 1), weights[..., None]
+    )
+    out_bands = out["bands"]
+    out_bands[..., _BAND_CONTINUOUS] = np.einsum(
+        "mksb,msbc->mkbc", normalized, bands[..., _BAND_CONTINUOUS]
+    )
+    # Bands disabled in every source keep their stored levels
+    level_weights = np.where(weighted, band_weights, weights[..., None])
+    out_bands[..., _BAND_LEVELS] = np.einsum(
+        "mksb,msbc->mkbc", level_weights, bands[..., _BAND_LEVELS]
+    )
+    out["global_params"][..., _GLOBAL_CONTINUOUS] = np.einsum(
+        "mks,msc->mkc", weights, global_params[..., _GLOBAL_CONTINUOUS]
+    )
+
+    for names, columns, values, target, choice in (
+        (BAND_DISCRETE, BAND_COLUMNS, bands, out_bands, band_choice),
+        (
+            GLOBAL_DISCRETE,
+            GLOBAL_COLUMNS,
+            global_params,
+            out["global_params"],
+            global_choice,
+        ),
+    ):
+        indices = [columns[name] for name in names]
+        chosen = values[:, 0][..., indices][:, None]
+        for source in range(1, values.shape[1]):
+            mask = np.asarray(choice) == source
+            if values.ndim == 4:  # bands: the choice is the same for every band
+                mask = mask[..., None, :]
+            chosen = np.where(mask, values[:, source][..., indices][:, None], chosen)
+        target[..., indices] = chosen
+    return out
+
+
+def _thresholds(thresholds: Optional[Dict[str, float]], names: Sequence[str]):
+    thresholds = thresholds or {}
+    unknown = set(thresholds).difference(BAND_DISCRETE, GLOBAL_DISCRETE)
+    if unknown:
+        raise ValueError(
+            f"No discrete fields named {sorted(unknown)}; thresholds apply to "
+            f"{BAND_DISCRETE + GLOBAL_DISCRETE}"
+        )
+    return np.array([thresholds.get(name, DEFAULT_THRESHOLD) for name in names])
+
+
+def _interpolate_records(start, end, positions, thresholds):
+    groups = max(len(start), len(end))
+    sources = np.empty((groups, 2), dtype=RECORD_DTYPE)
+    sources[:, 0] = start
+    sources[:, 1] = end
+    weights = np.broadcast_to(
+        np.stack([1 - positions, positions], axis=-1), (groups, len(positions), 2)
+    )
+    # Discrete fields switch to the end preset once the position reaches
+    # their threshold
+    band_choice = positions[:, None] >= _thresholds(thresholds, BAND_DISCRETE)
+    global_choice = positions[:, None] >= _thresholds(thresholds, GLOBAL_DISCRETE)
+    return _mix(sources, weights, band_choice, global_choice).reshape(-1)
+
+
+def _check_pairs(start: PresetBank, end: PresetBank):
+    if len(start) != len(end) and 1 not in (len(start), len(end)):
+        raise ValueError(
+            f"Cannot pair {len(start)} start presets with {len(end)} end presets"
+        )
+
+
+def interpolate(
+    start: PresetBank,
+    end: PresetBank,
+    positions: Sequence[float],
+    thresholds: Optional[Dict[str, float]] = None,
+) -> PresetBank:
+    """Interpolates M preset pairs at K positions into M x K presets.
+
+    ``positions`` run from 0 (the start preset) to 1 (the end preset); values
+    outside extrapolate the continuous fields. The variants of each pair are
+    consecutive. A single start or end preset is paired with every preset of
+    the other bank. Discrete fields switch to the end preset at their entry
+    in ``thresholds``, by default halfway; they are named like the bank
+    columns, so band bypass is "active" and enable_midi "midi_disabled".
+    """
+    _check_pairs(start, end)
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1)
+    return PresetBank(
+        _interpolate_records(start.records, end.records, positions, thresholds)
+    )
+
+
+def blend(sources: PresetBank, weights) -> PresetBank:
+    """Blends the presets of ``sources`` into one preset per row of ``weights``.
+
+    ``weights`` is (K, S) for S source presets and is normalized per row.
+    Discrete fields are taken from the source with the largest weight.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim == 1:
+        weights = weights[None]
+    if weights.shape[1] != len(sources):
+        raise ValueError(
+            f"Expected {len(sources)} weights per variant, got {weights.shape[1]}"
+        )
+    if np.any(weights < 0) or np.any(weights.sum(axis=1) <= 0):
+        raise ValueError("Weights must be non-negative with a positive sum")
+    choice = np.argmax(weights, axis=1)[None, :, None]
+    return PresetBank(
+        _mix(sources.records[None], weights[None], choice, choice).reshape(-1)
+    )
+
+
+def write_interpolations(
+    start: PresetBank,
+    end: PresetBank,
+    positions: Sequence[float],
+    directory: str,
+    thresholds: Optional[Dict[str, float]] = None,
+    name: str = "{pair:04d}_{step:03d}.ffp",
+    chunk_size: int = 1000,
+) -> List[str]:
+    """Streams interpolate's variants to preset files and returns their paths.
+
+    Pairs are morphed ``chunk_size`` at a time and each record's bytes are
+    written directly, so memory stays bounded for large variant sets.
+    ``name`` is formatted with the pair and step index.
+    """
+    _check_pairs(start, end)
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1)
+    pairs = max(len(start), len(end))
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for first in range(0, pairs, chunk_size):
+        chunk = slice(first, min(first + chunk_size, pairs))
+        records = _interpolate_records(
+            start.records if len(start) == 1 else start.records[chunk],
+            end.records if len(end) == 1 else end.records[chunk],
+            positions,
+            thresholds,
+        )
+        records = records.reshape(-1, len(positions))
+        for pair, row in enumerate(records, first):
+            for step, record in enumerate(row):
+                path = os.path.join(directory, name.format(pair=pair, step=step))
+                with open(path, "wb") as file:
+                    file.write(record.tobytes())
+                paths.append(path)
+    return paths
@@ -1,9 +1,35 @@
 import struct
-import math
+import threading
+from time import perf_counter
 from enum import IntEnum
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import List, Optional
 
+from .conversions import freq_convert, q_convert, q_inverse_convert
+from .raw import (
+    BAND_NAMES,
+    BAND_PARAMS,
+    BODY,
+    GLOBAL_NAMES,
+    GLOBAL_PARAMS,
+    HEADER,
+    NUM_BANDS,
+    NUM_PARAMS,
+    PRESET_SIZE,
+)
+from .schema import (
+    Field,
+    Schema,
+    SchemaError,
+    read_schema,
+    register,
+    schema_for,
+)
+
+# The binary layout is defined in preset_toolkit.raw
+_HEADER = HEADER
+_BODY = BODY
+
 
 class ProQFilterType(IntEnum):
     Bell = 0
@@ -136,185 +162,343 @@ class FabFilterPreset:
     bands: List[EQBand] = field(default_factory=lambda: [EQBand() for _ in range(24)])
     global_params: GlobalParams = field(default_factory=lambda: GlobalParams())
 
+    def response(self, freqs, sample_rate: float = 48000):
+        """Returns the complex frequency response of the preset (requires NumPy)."""
+        from .response import batch_response
+
+        return batch_response([self], freqs, sample_rate)[0]
+
+
+def _band(name: str, transform: str = "float", enum=None, stored=None) -> Field:
+    """A band field, positioned by its stored name in preset_toolkit.raw."""
+    return Field(name, BAND_NAMES.index(stored or name), transform, enum)
+
+
+def _global(name: str, transform: str = "float", enum=None, stored=None) -> Field:
+    """A global field, positioned by its stored name in preset_toolkit.raw."""
+    return Field(name, GLOBAL_NAMES.index(stored or name), transform, enum)
+
+
+# Parameter layout of Pro-Q 3 presets, per band and after the bands
+BAND_FIELDS = [
+    _band("enabled", "bool"),
+    _band("bypass", "inverted", stored="active"),
+    _band("frequency", "log2"),
+    _band("gain"),
+    _band("dyn_range"),
+    _band("dyn_range_enabled"),
+    _band("dyn_range_th"),
+    _band("q", "q"),
+    _band("filter_type", "enum", ProQFilterType),
+    _band("lp_hp_slope", "enum", ProQLPHPSlope),
+    _band("stereo_placement", "enum", ProQStereoPlacement),
+    _band("unknown1"),
+    _band("unknown2"),
+]
+GLOBAL_FIELDS = [
+    _global("process_mode", "enum", ProcessMode),
+    _global("linear_mode_value", "enum", LinearPhaseMode),
+    _global("gain_scale"),
+    _global("output_gain"),
+    _global("output_pan"),
+    _global("unknown1"),
+    _global("bypass", "bool"),
+    _global("phase_invert", "bool"),
+    _global("auto_gain", "bool"),
+    _global("analyzer_pre", "bool"),
+    _global("analyzer_post", "bool"),
+    _global("analyzer_sidechain", "enum", AnalyzerSidechain),
+    _global("analyzer_range", "enum", AnalyzerRange),
+    _global("analyzer_res", "enum", AnalyzerResolution),
+    _global("analyzer_speed", "enum", AnalyzerSpeed),
+    _global("analyzer_tilt", "enum", AnalyzerTilt),
+    _global("unknown2"),
+    _global("show_collisions", "bool"),
+    _global("spectrum_grab", "bool"),
+    _global("display_range", "enum", DisplayRange),
+    _global("enable_midi", "not", stored="midi_disabled"),
+    _global("unknown3"),
+]
+SCHEMA = Schema(
+    4,
+    NUM_BANDS,
+    BAND_PARAMS,
+    BAND_FIELDS,
+    GLOBAL_FIELDS,
+    FabFilterPreset,
+    EQBand,
+    GlobalParams,
+)
+assert SCHEMA.num_params == NUM_PARAMS and SCHEMA.size == PRESET_SIZE
+# Presets of other versions are read with this layout too, if their
+# parameter count matches
+register(SCHEMA, default=True)
+
 
 class FabFilterPresetManager:
     """Manages the reading, writing, and converting of FabFilter Presets."""
 
-    @staticmethod
-    def freq_convert(value: float) -> float:
-        """Convert frequency to the format used in the preset file."""
-        return math.log10(value) / math.log10(2)
-
-    @staticmethod
-    def q_convert(value: float) -> float:
-        """Convert Q value to the format used in the preset file."""
-        return math.log10(value) * 0.312098175 + 0.5
-
-    @staticmethod
-    def q_inverse_convert(value: float) -> float:
-        """Convert back from the format used in the preset file to Q value."""
-        return 10 ** ((value - 0.5) / 0.312098175)
-
-    @staticmethod
-    def _read_float(file) -> float:
-        """Read a float from a binary file."""
-        return struct.unpack("<f", file.read(4))[0]
+    def __init__(self, cache=None, instrumentation=None, validation=None):
+        """Creates a manager, optionally reading through a PresetCache.
+
+        ``instrumentation`` (see preset_toolkit.instrumentation) receives stage
+        timings, counters and errors, which are otherwise printed.
+        ``validation`` is a policy of preset_toolkit.validation ("strict",
+        "repair" or "skip") checking every decoded preset; it needs NumPy.
+        """
+        self.cache = cache
+        self.instrumentation = instrumentation
+        self.validation = validation
+        # Holds the buffer write_preset reuses in each thread
+        self._local = threading.local()
+
+    # The conversions live in preset_toolkit.conversions
+    freq_convert = staticmethod(freq_convert)
+    q_convert = staticmethod(q_convert)
+    q_inverse_convert = staticmethod(q_inverse_convert)
 
     @staticmethod
-    def _write_float(file, value: float):
-        """Write a float to a binary file."""
-        file.write(struct.pack("<f", value))
+    def _read_values(file, count: int):
+        return struct.unpack(f"<{count}f", file.read(4 * count))
 
     def _read_bands(self, file) -> List[EQBand]:
         """Reads EQ bands from the file."""
-        bands = []
-        for _ in range(24):  # Fixed number of bands
-            enabled = bool(int(self._read_float(file)))
-            bypass = not bool(self._read_float(file))
-            frequency = 2 ** self._read_float(file)
-            gain = self._read_float(file)
-            dyn_range = self._read_float(file)
-            dyn_range_enabled = self._read_float(file)
-            dyn_range_th = self._read_float(file)
-            q = self.q_inverse_convert(self._read_float(file))
-            filter_type = ProQFilterType(int(self._read_float(file)))
-            lp_hp_slope = ProQLPHPSlope(int(self._read_float(file)))
-            stereo_placement = ProQStereoPlacement(int(self._read_float(file)))
-            unknown1 = self._read_float(file)
-            unknown2 = self._read_float(file)
-
-            bands.append(
-                EQBand(
-                    enabled=enabled,
-                    bypass=bypass,
-                    frequency=frequency,
-                    gain=gain,
-                    dyn_range=dyn_range,
-                    dyn_range_enabled=dyn_range_enabled,
-                    dyn_range_th=dyn_range_th,
-                    q=q,
-                    filter_type=filter_type,
-                    lp_hp_slope=lp_hp_slope,
-                    stereo_placement=stereo_placement,
-                    unknown1=unknown1,
-                    unknown2=unknown2,
-                )
-            )
-        return bands
+        return self._decode_bands(self._read_values(file, NUM_BANDS * BAND_PARAMS))
 
     def _write_bands(self, file, bands: List[EQBand]):
         """Writes EQ bands to the file."""
-        idx = 0
-        for band in bands:
-            try:
-                self._write_float(file, float(band.enabled))
-                self._write_float(file, float(not band.bypass))
-                self._write_float(file, self.freq_convert(band.frequency))
-                self._write_float(file, band.gain)
-                self._write_float(file, band.dyn_range)
-                self._write_float(file, band.dyn_range_enabled)
-                self._write_float(file, band.dyn_range_th)
-                self._write_float(file, self.q_convert(band.q))
-                self._write_float(file, float(band.filter_type))
-                self._write_float(file, float(band.lp_hp_slope))
-                self._write_float(file, float(band.stereo_placement))
-                self._write_float(file, band.unknown1)
-                self._write_float(file, band.unknown2)
-            except Exception as e:
-                print(f"Error writing band {idx} to file: {e}")
-            idx += 1
+        values = self._flatten_bands(bands)
+        file.write(struct.pack(f"<{len(values)}f", *values))
 
     def _read_global_params(self, file) -> GlobalParams:
         """Reads global parameters from the file."""
-        return GlobalParams(
-            process_mode=ProcessMode(int(self._read_float(file))),
-            linear_mode_value=LinearPhaseMode(int(self._read_float(file))),
-            gain_scale=self._read_float(file),
-            output_gain=self._read_float(file),
-            output_pan=self._read_float(file),
-            unknown1=self._read_float(file),
-            bypass=bool(int(self._read_float(file))),
-            phase_invert=bool(int(self._read_float(file))),
-            auto_gain=bool(int(self._read_float(file))),
-            analyzer_pre=bool(int(self._read_float(file))),
-            analyzer_post=bool(int(self._read_float(file))),
-            analyzer_sidechain=AnalyzerSidechain(self._read_float(file)),
-            analyzer_range=AnalyzerRange(int(self._read_float(file))),
-            analyzer_res=AnalyzerResolution(int(self._read_float(file))),
-            analyzer_speed=AnalyzerSpeed(int(self._read_float(file))),
-            analyzer_tilt=AnalyzerTilt(int(self._read_float(file))),
-            unknown2=self._read_float(file),
-            show_collisions=bool(int(self._read_float(file))),
-            spectrum_grab=bool(int(self._read_float(file))),
-            display_range=DisplayRange(int(self._read_float(file))),
-            enable_midi=not bool(int(self._read_float(file))),
-            unknown3=self._read_float(file),
-        )
+        return self._decode_global_params(self._read_values(file, GLOBAL_PARAMS))
 
     def _write_global_params(self, file, params: GlobalParams):
         """Writes global parameters to the file."""
-        self._write_float(file, float(params.process_mode))
-        self._write_float(file, float(params.linear_mode_value))
-        self._write_float(file, params.gain_scale)
-        self._write_float(file, params.output_gain)
-        self._write_float(file, params.output_pan)
-        self._write_float(file, params.unknown1)
-        self._write_float(file, float(params.bypass))
-        self._write_float(file, float(params.phase_invert))
-        self._write_float(file, float(params.auto_gain))
-        self._write_float(file, float(params.analyzer_pre))
-        self._write_float(file, float(params.analyzer_post))
-        self._write_float(file, float(params.analyzer_sidechain))
-        self._write_float(file, float(params.analyzer_range))
-        self._write_float(file, float(params.analyzer_res))
-        self._write_float(file, float(params.analyzer_speed))
-        self._write_float(file, float(params.analyzer_tilt))
-        self._write_float(file, params.unknown2)
-        self._write_float(file, float(params.show_collisions))
-        self._write_float(file, float(params.spectrum_grab))
-        self._write_float(file, float(params.display_range))
-        self._write_float(file, float(not params.enable_midi))
-        self._write_float(file, params.unknown3)
-
-    def read_preset(self, file_path: str) -> Optional[FabFilterPreset]:
-        """Reads a FabFilter preset from a file."""
+        file.write(
+            struct.pack(f"<{GLOBAL_PARAMS}f", *self._encode_global_params(params))
+        )
+
+    # The codec functions are generated from the schema tables below
+
+    def _decode_bands(self, values) -> List[EQBand]:
+        """Builds EQ bands from the decoded parameter values."""
+        return SCHEMA.decode_bands(values, 0, len(values) // BAND_PARAMS)
+
+    def _encode_bands(self, bands: List[EQBand]) -> List[float]:
+        """Flattens EQ bands into parameter values."""
+        if len(bands) != NUM_BANDS:
+            raise ValueError(f"Expected {NUM_BANDS} bands, got {len(bands)}")
+        return SCHEMA.encode_bands(bands)
+
+    def _flatten_bands(self, bands) -> List[float]:
+        """_encode_bands for any number of bands."""
+        return SCHEMA.encode_bands(bands)
+
+    @staticmethod
+    def _decode_global_params(values) -> GlobalParams:
+        """Builds global parameters from the decoded parameter values."""
+        return SCHEMA.decode_global_params(values)
+
+    @staticmethod
+    def _encode_global_params(params: GlobalParams) -> List[float]:
+        """Flattens global parameters into parameter values."""
+        return SCHEMA.encode_global_params(params)
+
+    def decode(
+        self, data, offset: int = 0, compact: bool = False, lazy: bool = False
+    ) -> Optional[FabFilterPreset]:
+        """Decodes a preset from a buffer holding a whole preset file.
+
+        ``data`` may be bytes, a bytearray, a memoryview or an mmap; it is read
+        in place starting at ``offset``. See read_preset for ``compact`` and
+        ``lazy``. With a ``validation`` policy invalid presets raise a
+        ValidationError, are repaired, or are skipped by returning None.
+        Headers that do not match a known layout raise a SchemaError.
+        """
+        schema = read_schema(data, offset)
+        if schema is not SCHEMA and (compact or lazy or self.validation):
+            raise SchemaError(
+                f"Compact, lazy and validated decoding need the version "
+                f"{SCHEMA.version} layout"
+            )
+        if self.validation is not None:
+            checked = self._validate(data, offset)
+            if checked is None:
+                return None
+            data, offset = checked
+        if compact:
+            from .compact import decode_compact
+
+            return decode_compact(data, offset)
+        if lazy:
+            from .lazy import LazyPreset
+
+            return LazyPreset(data, offset)
+        if self.instrumentation is not None:
+            return self._decode_instrumented(data, offset, schema)
+        return schema.decode(data, offset)
+
+    def _validate(self, data, offset: int):
+        from .validation import check_preset
+
+        checked = check_preset(data, offset, self.validation)
+        if self.instrumentation is not None:
+            if checked is None:
+                self.instrumentation.increment("presets_skipped")
+            elif checked[0] is not data:
+                self.instrumentation.increment("presets_repaired")
+        return checked
+
+    def _decode_instrumented(self, data, offset: int, schema) -> FabFilterPreset:
+        """decode, reporting the time spent in each stage."""
+        observe = self.instrumentation.observe
+        start = perf_counter()
+        fxID, version, num_params = _HEADER.unpack_from(data, offset)
+        values = schema.body.unpack_from(data, offset + _HEADER.size)
+        header_done = perf_counter()
+        observe("decode_header", header_done - start)
+        bands = schema.decode_bands(values)
+        bands_done = perf_counter()
+        observe("decode_bands", bands_done - header_done)
+        global_params = schema.decode_global_params(
+            values, schema.num_bands * schema.band_params
+        )
+        globals_done = perf_counter()
+        observe("decode_globals", globals_done - bands_done)
+        preset = FabFilterPreset(
+            fxID=fxID.decode("ascii"),
+            version=version,
+            num_params=num_params,
+            bands=bands,
+            global_params=global_params,
+        )
+        observe("construct", perf_counter() - globals_done)
+        return preset
+
+    def encode_into(self, preset: FabFilterPreset, buffer, offset: int = 0):
+        """Encodes a preset into a writable buffer at the given offset.
+
+        The buffer needs PRESET_SIZE bytes from ``offset``.
+        """
+        if type(preset) is not FabFilterPreset and hasattr(preset, "_encode_into"):
+            # Lazy presets only re-encode the parts that were decoded
+            preset._encode_into(self, buffer, offset)
+            return
+        schema_for(preset.version, preset.num_params).encode_into(
+            preset, buffer, offset
+        )
+
+    def encode(self, preset: FabFilterPreset) -> bytes:
+        """Encodes a preset into the bytes of a preset file."""
+        buffer = bytearray(schema_for(preset.version, preset.num_params).size)
+        self.encode_into(preset, buffer)
+        return bytes(buffer)
+
+    def read_preset(
+        self, file_path: str, compact: bool = False, lazy: bool = False
+    ) -> Optional[FabFilterPreset]:
+        """Reads a FabFilter preset from a file.
+
+        With ``compact`` the bands and global parameters are views over a
+        single float array (see preset_toolkit.compact), which uses much less
+        memory when holding many presets. With ``lazy`` only the header is
+        decoded; bands and global parameters are decoded on first access (see
+        preset_toolkit.lazy), which is much faster when few fields are used.
+        """
         try:
+            if self.cache is not None:
+                return self._read_cached(file_path, compact, lazy)
+            if self.instrumentation is not None:
+                return self._read_instrumented(file_path, compact, lazy)
             with open(file_path, "rb") as file:
-                fxID = file.read(4).decode("ascii")
-                version = struct.unpack("<i", file.read(4))[0]
-                num_params = struct.unpack("<i", file.read(4))[0]
-                bands = self._read_bands(file)
-                global_params = self._read_global_params(file)
-
-                return FabFilterPreset(
-                    fxID=fxID,
-                    version=version,
-                    num_params=num_params,
-                    bands=bands,
-                    global_params=global_params,
-                )
-
-        except (FileNotFoundError, IOError, struct.error) as e:
-            print(f"Error reading preset file {file_path}: {e}")
+                return self.decode(file.read(), compact=compact, lazy=lazy)
+
+        except (FileNotFoundError, IOError, struct.error, SchemaError) as e:
+            self._report_error(
+                "read_error",
+                file_path,
+                e,
+                f"Error reading preset file {file_path}: {e}",
+            )
             return None
 
+    def _read_cached(
+        self, file_path: str, compact: bool, lazy: bool
+    ) -> FabFilterPreset:
+        # The cache keeps decoded regular presets; compact and lazy presets
+        # are cheap to build from the cached bytes
+        if compact or lazy:
+            data = self.cache.read(file_path, self.instrumentation)
+            return self.decode(data, compact=compact, lazy=lazy)
+        return self.cache.load(file_path, self.decode, self.instrumentation)
+
+    def _read_instrumented(
+        self, file_path: str, compact: bool, lazy: bool
+    ) -> FabFilterPreset:
+        instrumentation = self.instrumentation
+        start = perf_counter()
+        with open(file_path, "rb") as file:
+            opened = perf_counter()
+            instrumentation.observe("open", opened - start)
+            data = file.read()
+        instrumentation.observe("read", perf_counter() - opened)
+        preset = self.decode(data, compact=compact, lazy=lazy)
+        instrumentation.increment("presets_read")
+        instrumentation.increment("bytes_read", len(data))
+        return preset
+
     def write_preset(self, file_path: str, preset: FabFilterPreset):
         """Writes a FabFilter preset to a file."""
         try:
+            size = schema_for(preset.version, preset.num_params).size
+            buffer = getattr(self._local, "buffer", None)
+            if buffer is None or len(buffer) != size:
+                buffer = self._local.buffer = bytearray(size)
+            if self.instrumentation is not None:
+                self._write_instrumented(file_path, preset, buffer)
+                return
+            self.encode_into(preset, buffer)
             with open(file_path, "wb") as file:
-                file.write(preset.fxID.encode("ascii"))
-                file.write(struct.pack("<i", preset.version))
-                file.write(struct.pack("<i", preset.num_params))
-
-                self._write_bands(file, preset.bands)
-                self._write_global_params(file, preset.global_params)
+                file.write(buffer)
 
                 print(f"Preset successfully written to {file_path}")
 
         except IOError as e:
-            print(f"Error writing preset file {file_path}: {e}")
+            self._report_error(
+                "write_error",
+                file_path,
+                e,
+                f"Error writing preset file {file_path}: {e}",
+            )
         except Exception as e:
-            print(f"Unexpected error writing preset file {file_path}: {e}")
+            self._report_error(
+                "write_error",
+                file_path,
+                e,
+                f"Unexpected error writing preset file {file_path}: {e}",
+            )
+
+    def _write_instrumented(self, file_path: str, preset: FabFilterPreset, buffer):
+        instrumentation = self.instrumentation
+        start = perf_counter()
+        self.encode_into(preset, buffer)
+        encoded = perf_counter()
+        instrumentation.observe("encode", encoded - start)
+        with open(file_path, "wb") as file:
+            opened = perf_counter()
+            instrumentation.observe("open", opened - encoded)
+            file.write(buffer)
+        instrumentation.observe("write", perf_counter() - opened)
+        instrumentation.increment("presets_written")
+        instrumentation.increment("bytes_written", len(buffer))
+
+    def _report_error(self, event: str, file_path: str, error, message: str):
+        if self.instrumentation is None:
+            print(message)
+        else:
+            self.instrumentation.error(event, file_path, error)
 
     @staticmethod
     def print_preset(preset: FabFilterPreset):
@@ -332,7 +516,8 @@ class FabFilterPresetManager:
             idx += 1
 
         print("\nGlobal Parameters:")
-        for attr, value in preset.global_params.__dict__.items():
+        for attr in (f.name for f in fields(GlobalParams)):
+            value = getattr(preset.global_params, attr)
             # Special handling for enum attributes
             if isinstance(value, IntEnum):
                 print(
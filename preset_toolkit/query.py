@@ -0,0 +1,419 @@
+import operator
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .bank import PresetBank, freq_convert, q_convert
+from .proq3_preset import SCHEMA
+from .raw import BAND_NAMES, GLOBAL_NAMES
+
+# Predicates compare the encoded columns of a PresetBank, so query values are
+# encoded the same way first. The encodings are monotonic, which keeps range
+# comparisons valid; fields stored inverted flip the comparison instead.
+_BAND_ENCODERS = {"frequency": freq_convert, "q": q_convert}
+_INVERTED_BAND = {"bypass"}
+_INVERTED_GLOBAL = {"enable_midi"}
+# Queries name dataclass fields; the bank columns use the stored names
+_BAND_FIELDS = {f.name: BAND_NAMES[f.offset] for f in SCHEMA.band_fields}
+_GLOBAL_FIELDS = {f.name: GLOBAL_NAMES[f.offset] for f in SCHEMA.global_fields}
+
+_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_FLIPPED = {"==": "==", "!=": "!=", "<": ">", "<=": ">=", ">": "<", ">=": "<="}
+
+
+def _encode(value, encoder, inverted: bool) -> np.float32:
+    if inverted:
+        value = not value
+    if encoder is not None:
+        value = encoder(value)
+    return np.float32(float(value))
+
+
+class _Comparable:
+    """Builds comparison predicates from the comparison operators."""
+
+    def _compare(self, op: str, value):
+        raise NotImplementedError
+
+    def __eq__(self, value):
+        return self._compare("==", value)
+
+    def __ne__(self, value):
+        return self._compare("!=", value)
+
+    def __lt__(self, value):
+        return self._compare("<", value)
+
+    def __le__(self, value):
+        return self._compare("<=", value)
+
+    def __gt__(self, value):
+        return self._compare(">", value)
+
+    def __ge__(self, value):
+        return self._compare(">=", value)
+
+    __hash__ = object.__hash__
+
+    def between(self, low, high):
+        """Inclusive range predicate."""
+        return (self >= low) & (self <= high)
+
+
+class Predicate:
+    """A condition on whole presets, evaluating to an (N,) boolean mask."""
+
+    def evaluate(self, query: "PresetQuery") -> np.ndarray:
+        raise NotImplementedError
+
+    def mask(self, bank: PresetBank) -> np.ndarray:
+        """Evaluates the predicate over a bank without indexes."""
+        return self.evaluate(PresetQuery(bank))
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return _Combined(operator.and_, self, other)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return _Combined(operator.or_, self, other)
+
+    def __invert__(self) -> "Predicate":
+        return _Not(self)
+
+
+class _Combined(Predicate):
+    def __init__(self, op, left: Predicate, right: Predicate):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def evaluate(self, query):
+        return self.op(self.left.evaluate(query), self.right.evaluate(query))
+
+
+class _Not(Predicate):
+    def __init__(self, predicate: Predicate):
+        self.predicate = predicate
+
+    def evaluate(self, query):
+        return ~self.predicate.evaluate(query)
+
+
+class GlobalField(_Comparable, Predicate):
+    """A GlobalParams field; on its own it is true where the field is set."""
+
+    def __init__(self, name: str):
+        if name not in _GLOBAL_FIELDS:
+            raise AttributeError(f"GlobalParams has no field {name!r}")
+        self.name = name
+
+    def _compare(self, op, value):
+        return _GlobalCompare(self.name, op, value)
+
+    def evaluate(self, query):
+        return self._compare("==", True).evaluate(query)
+
+
+class _GlobalCompare(Predicate):
+    def __init__(self, name: str, op: str, value):
+        inverted = name in _INVERTED_GLOBAL
+        self.name = name
+        self.column = _GLOBAL_FIELDS[name]
+        self.op = _FLIPPED[op] if inverted else op
+        self.value = _encode(value, None, inverted)
+
+    def evaluate(self, query):
+        return _OPS[self.op](query.bank.global_column(self.column), self.value)
+
+
+class BandPredicate:
+    """A condition on single bands, evaluating to an (N, 24) boolean mask.
+
+    Combine band conditions with ``&``, ``|`` and ``~``, then turn them into
+    a preset condition with any_band or all_bands.
+    """
+
+    def band_mask(self, query: "PresetQuery") -> np.ndarray:
+        raise NotImplementedError
+
+    def pair_mask(self, query: "PresetQuery", rows, slots) -> np.ndarray:
+        """Evaluates the condition for the given (preset, band) pairs only."""
+        raise NotImplementedError
+
+    def terms(self) -> List["BandPredicate"]:
+        """The conditions this one is a conjunction of."""
+        return [self]
+
+    def __and__(self, other: "BandPredicate") -> "BandPredicate":
+        return _BandCombined(operator.and_, self, other)
+
+    def __or__(self, other: "BandPredicate") -> "BandPredicate":
+        return _BandCombined(operator.or_, self, other)
+
+    def __invert__(self) -> "BandPredicate":
+        return _BandNot(self)
+
+
+class _BandCombined(BandPredicate):
+    def __init__(self, op, left: BandPredicate, right: BandPredicate):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def band_mask(self, query):
+        return self.op(self.left.band_mask(query), self.right.band_mask(query))
+
+    def pair_mask(self, query, rows, slots):
+        return self.op(
+            self.left.pair_mask(query, rows, slots),
+            self.right.pair_mask(query, rows, slots),
+        )
+
+    def terms(self):
+        if self.op is operator.and_:
+            return self.left.terms() + self.right.terms()
+        return [self]
+
+
+class _BandNot(BandPredicate):
+    def __init__(self, predicate: BandPredicate):
+        self.predicate = predicate
+
+    def band_mask(self, query):
+        return ~self.predicate.band_mask(query)
+
+    def pair_mask(self, query, rows, slots):
+        return ~self.predicate.pair_mask(query, rows, slots)
+
+
+class _BandCompare(BandPredicate):
+    def __init__(self, name: str, op: str, value):
+        inverted = name in _INVERTED_BAND
+        self.name = name
+        self.column = _BAND_FIELDS[name]
+        self.op = _FLIPPED[op] if inverted else op
+        self.value = _encode(value, _BAND_ENCODERS.get(name), inverted)
+
+    def band_mask(self, query):
+        return _OPS[self.op](query.bank.band_column(self.column), self.value)
+
+    def pair_mask(self, query, rows, slots):
+        column = query.bank.band_column(self.column)
+        return _OPS[self.op](column[rows, slots], self.value)
+
+
+class BandField(_Comparable, BandPredicate):
+    """An EQBand field; on its own it is true where the field is set."""
+
+    def __init__(self, name: str):
+        if name not in _BAND_FIELDS:
+            raise AttributeError(f"EQBand has no field {name!r}")
+        self.name = name
+
+    def _compare(self, op, value):
+        return _BandCompare(self.name, op, value)
+
+    def band_mask(self, query):
+        return self._compare("==", True).band_mask(query)
+
+    def pair_mask(self, query, rows, slots):
+        return self._compare("==", True).pair_mask(query, rows, slots)
+
+    def terms(self):
+        return [self._compare("==", True)]
+
+
+class _AnyBand(Predicate):
+    def __init__(self, predicate: BandPredicate):
+        self.predicate = predicate
+
+    def evaluate(self, query):
+        terms = self.predicate.terms()
+        for index in query.indexes.values():
+            candidates = index.candidates(terms)
+            if candidates is None:
+                continue
+            rows, slots, remaining = candidates
+            for term in remaining:
+                keep = term.pair_mask(query, rows, slots)
+                rows, slots = rows[keep], slots[keep]
+            mask = np.zeros(len(query.bank), dtype=bool)
+            mask[rows] = True
+            return mask
+        return self.predicate.band_mask(query).any(axis=1)
+
+
+class _AllBands(Predicate):
+    def __init__(self, predicate: BandPredicate):
+        self.predicate = predicate
+
+    def evaluate(self, query):
+        return self.predicate.band_mask(query).all(axis=1)
+
+
+class _BandCount(_Comparable):
+    def __init__(self, predicate: BandPredicate):
+        self.predicate = predicate
+
+    def _compare(self, op, value):
+        return _CountCompare(self.predicate, op, value)
+
+
+class _CountCompare(Predicate):
+    def __init__(self, predicate: BandPredicate, op: str, value: int):
+        self.predicate = predicate
+        self.op = op
+        self.value = value
+
+    def evaluate(self, query):
+        counts = self.predicate.band_mask(query).sum(axis=1)
+        return _OPS[self.op](counts, self.value)
+
+
+def any_band(predicate: BandPredicate) -> Predicate:
+    """True for presets with at least one band matching the condition."""
+    return _AnyBand(predicate)
+
+
+def all_bands(predicate: BandPredicate) -> Predicate:
+    """True for presets whose 24 bands all match the condition."""
+    return _AllBands(predicate)
+
+
+def band_count(predicate: BandPredicate) -> _BandCount:
+    """The number of matching bands, to compare with an int."""
+    return _BandCount(predicate)
+
+
+class _Fields:
+    def __init__(self, field_type):
+        self._field_type = field_type
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._field_type(name)
+
+
+# Query roots: band.frequency < 200, global_params.process_mode == ...
+band = _Fields(BandField)
+global_params = _Fields(GlobalField)
+
+
+class SortedIndex:
+    """A band column sorted over every band slot, or only enabled bands.
+
+    Range conditions on the column are answered with a binary search, and the
+    other conditions are only evaluated for the bands in range.
+    """
+
+    def __init__(self, bank: PresetBank, name: str, enabled_only: bool = False):
+        if name not in _BAND_FIELDS or name in _INVERTED_BAND:
+            raise ValueError(f"Cannot index band field {name!r}")
+        self.name = name
+        self.enabled_only = enabled_only
+        column = bank.band_column(_BAND_FIELDS[name])
+        if enabled_only:
+            rows, slots = np.nonzero(bank.band_column("enabled") != 0)
+        else:
+            rows, slots = np.indices(column.shape).reshape(2, -1)
+        values = column[rows, slots]
+        order = np.argsort(values, kind="stable")
+        self.values = values[order]
+        self.rows = rows[order]
+        self.slots = slots[order].astype(np.int8)
+
+    def range(
+        self,
+        low: Optional[float] = None,
+        high: Optional[float] = None,
+        low_inclusive: bool = True,
+        high_inclusive: bool = True,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the (rows, slots) of bands with encoded values in range."""
+        start, stop = 0, len(self.values)
+        if low is not None:
+            side = "left" if low_inclusive else "right"
+            start = np.searchsorted(self.values, np.float32(low), side=side)
+        if high is not None:
+            side = "right" if high_inclusive else "left"
+            stop = np.searchsorted(self.values, np.float32(high), side=side)
+        stop = max(start, stop)
+        return self.rows[start:stop], self.slots[start:stop]
+
+    def candidates(self, terms: List[BandPredicate]):
+        """Returns (rows, slots, remaining terms) if the index applies."""
+        low = high = None
+        low_inclusive = high_inclusive = True
+        used = []
+        enabled = not self.enabled_only
+        for term in terms:
+            if not isinstance(term, _BandCompare):
+                continue
+            if (
+                term.name == "enabled"
+                and term.op == "=="
+                and term.value == 1
+                and self.enabled_only
+            ):
+                enabled = True
+                used.append(term)
+            elif term.name == self.name and term.op in ("<", "<=", "==", ">", ">="):
+                value = term.value
+                inclusive = term.op in ("<=", "==", ">=")
+                if term.op in (">", ">=", "=="):
+                    if low is None or value > low:
+                        low, low_inclusive = value, inclusive
+                    elif value == low:
+                        low_inclusive = low_inclusive and inclusive
+                if term.op in ("<", "<=", "=="):
+                    if high is None or value < high:
+                        high, high_inclusive = value, inclusive
+                    elif value == high:
+                        high_inclusive = high_inclusive and inclusive
+                used.append(term)
+        if not enabled or (low is None and high is None):
+            return None
+        rows, slots = self.range(low, high, low_inclusive, high_inclusive)
+        return rows, slots, [term for term in terms if term not in used]
+
+
+class PresetQuery:
+    """Runs predicates over a PresetBank, using sorted indexes if present.
+
+    Indexes are a snapshot of the bank: call refresh() after editing it.
+    """
+
+    def __init__(self, bank: PresetBank):
+        self.bank = bank
+        self.indexes: Dict[Tuple[str, bool], SortedIndex] = {}
+
+    def create_index(self, name: str, enabled_only: bool = True) -> SortedIndex:
+        """Indexes a band column for range queries."""
+        index = SortedIndex(self.bank, name, enabled_only)
+        self.indexes[name, enabled_only] = index
+        return index
+
+    def refresh(self):
+        """Rebuilds the indexes after the bank changed."""
+        for name, enabled_only in list(self.indexes):
+            self.create_index(name, enabled_only)
+
+    def mask(self, predicate: Predicate) -> np.ndarray:
+        return predicate.evaluate(self)
+
+    def count(self, predicate: Predicate) -> int:
+        return int(np.count_nonzero(self.mask(predicate)))
+
+    def indices(self, predicate: Predicate) -> np.ndarray:
+        return np.flatnonzero(self.mask(predicate))
+
+    def select(self, predicate: Predicate) -> PresetBank:
+        """Returns the matching presets as a new bank."""
+        return self.bank[self.indices(predicate)]
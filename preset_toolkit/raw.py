@@ -0,0 +1,107 @@
+import struct
+
+# Binary layout of a Pro-Q 3 preset: a 12-byte header followed by 24 bands of
+# 13 parameters and 22 global parameters, all little-endian float32.
+#
+# This module only depends on struct, so it imports in well under a
+# millisecond; it works on the stored values, without the enums and
+# dataclasses of preset_toolkit.proq3_preset. Frequencies are stored as log2
+# and Q on the preset scale (see preset_toolkit.conversions), band bypass as
+# an "active" flag and enable_midi inverted.
+NUM_BANDS = 24
+BAND_PARAMS = 13
+GLOBAL_PARAMS = 22
+NUM_PARAMS = NUM_BANDS * BAND_PARAMS + GLOBAL_PARAMS
+GLOBALS_OFFSET = NUM_BANDS * BAND_PARAMS
+
+HEADER = struct.Struct("<4sii")
+BODY = struct.Struct(f"<{NUM_PARAMS}f")
+PRESET_SIZE = HEADER.size + BODY.size
+
+# Stored parameter names, in order within a band and after the bands
+BAND_NAMES = (
+    "enabled",
+    "active",
+    "frequency",
+    "gain",
+    "dyn_range",
+    "dyn_range_enabled",
+    "dyn_range_th",
+    "q",
+    "filter_type",
+    "lp_hp_slope",
+    "stereo_placement",
+    "unknown1",
+    "unknown2",
+)
+GLOBAL_NAMES = (
+    "process_mode",
+    "linear_mode_value",
+    "gain_scale",
+    "output_gain",
+    "output_pan",
+    "unknown1",
+    "bypass",
+    "phase_invert",
+    "auto_gain",
+    "analyzer_pre",
+    "analyzer_post",
+    "analyzer_sidechain",
+    "analyzer_range",
+    "analyzer_res",
+    "analyzer_speed",
+    "analyzer_tilt",
+    "unknown2",
+    "show_collisions",
+    "spectrum_grab",
+    "display_range",
+    "midi_disabled",
+    "unknown3",
+)
+
+
+def band_index(band: int, name: str) -> int:
+    """Returns the position of a band parameter in the stored values."""
+    return band * BAND_PARAMS + BAND_NAMES.index(name)
+
+
+def global_index(name: str) -> int:
+    """Returns the position of a global parameter in the stored values."""
+    return GLOBALS_OFFSET + GLOBAL_NAMES.index(name)
+
+
+def unpack(data, offset: int = 0) -> tuple:
+    """Returns (fxID, version, num_params, values) of a preset file buffer.
+
+    ``fxID`` is bytes and ``values`` a tuple of the 334 stored floats.
+    """
+    fxID, version, num_params = HEADER.unpack_from(data, offset)
+    return fxID, version, num_params, BODY.unpack_from(data, offset + HEADER.size)
+
+
+def pack_into(buffer, offset: int, fxID: bytes, version: int, num_params: int, values):
+    """Writes a preset file into a buffer of PRESET_SIZE bytes from ``offset``."""
+    HEADER.pack_into(buffer, offset, fxID, version, num_params)
+    BODY.pack_into(buffer, offset + HEADER.size, *values)
+
+
+def pack(fxID: bytes, version: int, num_params: int, values) -> bytes:
+    """Returns the bytes of a preset file."""
+    buffer = bytearray(PRESET_SIZE)
+    pack_into(buffer, 0, fxID, version, num_params, values)
+    return bytes(buffer)
+
+
+def read(path: str) -> tuple:
+    """unpack for a preset file on disk."""
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) != PRESET_SIZE:
+        raise ValueError(f"{path} is {len(data)} bytes, expected {PRESET_SIZE}")
+    return unpack(data)
+
+
+def write(path: str, fxID: bytes, version: int, num_params: int, values):
+    """pack to a preset file on disk."""
+    with open(path, "wb") as file:
+        file.write(pack(fxID, version, num_params, values))
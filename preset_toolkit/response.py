@@ -0,0 +1,348 @@
+import hashlib
+from collections import OrderedDict
+from typing import Sequence, Union
+
+import numpy as np
+
+from .bank import PresetBank
+from .proq3_preset import (
+    NUM_BANDS,
+    FabFilterPreset,
+    ProQFilterType,
+    ProQLPHPSlope,
+)
+
+# Biquad coefficients follow the RBJ Audio EQ Cookbook. They approximate the
+# plugin's own analog-matched filters closely below a quarter of the sample
+# rate, which covers the SoundID calibration range. Tilt Shelf is modelled as
+# a pair of opposite half-gain shelves and Flat Tilt as a very wide one.
+
+# Every band is evaluated as a cascade of this many biquad sections; unused
+# sections are left as pass-through.
+MAX_SECTIONS = 4
+
+_IDENTITY = np.array([1.0, 0.0, 0.0, 0.0, 0.0])
+
+# Butterworth section Qs, relative to a single 12 dB/oct section
+_CUT_QS = {
+    ProQLPHPSlope.Slope24dB_oct: (0.5412, 1.3066),
+    ProQLPHPSlope.Slope48dB_oct: (0.5098, 0.6013, 0.9000, 2.5629),
+}
+_FLAT_TILT_Q = 0.25
+
+
+def _normalize(b0, b1, b2, a0, a1, a2):
+    return np.stack([b0 / a0, b1 / a0, b2 / a0, a1 / a0, a2 / a0], axis=-1)
+
+
+def _peaking(cos_w0, alpha, a):
+    return _normalize(
+        1 + alpha * a,
+        -2 * cos_w0,
+        1 - alpha * a,
+        1 + alpha / a,
+        -2 * cos_w0,
+        1 - alpha / a,
+    )
+
+
+def _shelf(cos_w0, alpha, a, sign):
+    """Low shelf for sign=1, high shelf for sign=-1."""
+    sqrt_a_alpha = 2 * np.sqrt(a) * alpha
+    ap1 = a + 1
+    am1 = a - 1
+    return _normalize(
+        a * (ap1 - sign * am1 * cos_w0 + sqrt_a_alpha),
+        sign * 2 * a * (am1 - sign * ap1 * cos_w0),
+        a * (ap1 - sign * am1 * cos_w0 - sqrt_a_alpha),
+        ap1 + sign * am1 * cos_w0 + sqrt_a_alpha,
+        -sign * 2 * (am1 + sign * ap1 * cos_w0),
+        ap1 + sign * am1 * cos_w0 - sqrt_a_alpha,
+    )
+
+
+def _pass(cos_w0, alpha, sign):
+    """Low pass for sign=1, high pass for sign=-1."""
+    edge = (1 - sign * cos_w0) / 2
+    return _normalize(edge, sign * 2 * edge, edge, 1 + alpha, -2 * cos_w0, 1 - alpha)
+
+
+def _first_order_pass(w0, sign):
+    """First order low pass for sign=1, high pass for sign=-1."""
+    k = np.tan(w0 / 2)
+    zero = np.zeros_like(k)
+    b = np.where(sign > 0, k, 1)
+    return _normalize(b, sign * b, zero, 1 + k, k - 1, zero)
+
+
+def band_sections(
+    filter_type,
+    lp_hp_slope,
+    frequency,
+    gain,
+    q,
+    sample_rate: float = 48000,
+):
+    """Computes biquad sections for arrays of band parameters.
+
+    All arguments broadcast against each other. The result has shape
+    (..., MAX_SECTIONS, 5) holding normalized (b0, b1, b2, a1, a2).
+    """
+    filter_type, lp_hp_slope, frequency, gain, q = np.broadcast_arrays(
+        np.asarray(filter_type),
+        np.asarray(lp_hp_slope),
+        np.asarray(frequency, dtype=np.float64),
+        np.asarray(gain, dtype=np.float64),
+        np.asarray(q, dtype=np.float64),
+    )
+    shape = filter_type.shape
+    filter_type = filter_type.ravel()
+    lp_hp_slope = lp_hp_slope.ravel()
+    frequency = np.clip(frequency.ravel(), 1.0, sample_rate * 0.49)
+    gain = gain.ravel()
+    q = q.ravel()
+    sections = np.broadcast_to(_IDENTITY, (filter_type.size, MAX_SECTIONS, 5)).copy()
+
+    # Each filter kind is computed only for the bands that use it
+    for kind in np.unique(filter_type):
+        rows = np.flatnonzero(filter_type == kind)
+        w0 = 2 * np.pi * frequency[rows] / sample_rate
+        cos_w0 = np.cos(w0)
+        sin_w0 = np.sin(w0)
+        alpha = sin_w0 / (2 * q[rows])
+        a = 10 ** (gain[rows] / 40)
+        ones = np.ones_like(w0)
+
+        if kind == ProQFilterType.Bell:
+            sections[rows, 0] = _peaking(cos_w0, alpha, a)
+        elif kind == ProQFilterType.LowShelf:
+            sections[rows, 0] = _shelf(cos_w0, alpha, a, 1)
+        elif kind == ProQFilterType.HighShelf:
+            sections[rows, 0] = _shelf(cos_w0, alpha, a, -1)
+        elif kind in (ProQFilterType.TiltShelf, ProQFilterType.FlatTilt):
+            if kind == ProQFilterType.FlatTilt:
+                alpha = sin_w0 / (2 * _FLAT_TILT_Q)
+            half = np.sqrt(a)
+            sections[rows, 0] = _shelf(cos_w0, alpha, 1 / half, 1)
+            sections[rows, 1] = _shelf(cos_w0, alpha, half, -1)
+        elif kind == ProQFilterType.Notch:
+            sections[rows, 0] = _normalize(
+                ones, -2 * cos_w0, ones, 1 + alpha, -2 * cos_w0, 1 - alpha
+            )
+        elif kind == ProQFilterType.BandPass:
+            sections[rows, 0] = _normalize(
+                alpha, 0 * ones, -alpha, 1 + alpha, -2 * cos_w0, 1 - alpha
+            )
+        elif kind in (ProQFilterType.HighCut, ProQFilterType.LowCut):
+            sign = 1 if kind == ProQFilterType.HighCut else -1
+            slope = lp_hp_slope[rows]
+            first_order = slope == ProQLPHPSlope.Slope6dB_oct
+            sections[rows[first_order], 0] = _first_order_pass(w0, sign)[first_order]
+            second_order = slope == ProQLPHPSlope.Slope12dB_oct
+            sections[rows[second_order], 0] = _pass(cos_w0, alpha, sign)[second_order]
+            for cut_slope, section_qs in _CUT_QS.items():
+                cascade = slope == cut_slope
+                for section, section_q in enumerate(section_qs):
+                    # The band Q scales the resonance of the cascade
+                    section_alpha = sin_w0 / (2 * section_q * q[rows] / 0.7071)
+                    sections[rows[cascade], section] = _pass(
+                        cos_w0, section_alpha, sign
+                    )[cascade]
+
+    return sections.reshape(shape + (MAX_SECTIONS, 5))
+
+
+def biquad_coefficients(filter_type, frequency, gain, q, sample_rate: float = 48000):
+    """Computes the first biquad section for arrays of band parameters.
+
+    This is exact for Bell, Shelf, Notch and 12 dB/oct cut bands; the
+    result has a trailing axis of length 5.
+    """
+    return band_sections(
+        filter_type, ProQLPHPSlope.Slope12dB_oct, frequency, gain, q, sample_rate
+    )[..., 0, :]
+
+
+def biquad_response(coefficients, freqs, sample_rate: float = 48000):
+    """Evaluates the complex response of biquads at the given frequencies.
+
+    ``coefficients`` has shape (..., 5); the result has shape (..., F).
+    """
+    coefficients = np.asarray(coefficients)[..., None, :]
+    z1 = np.exp(-2j * np.pi * np.asarray(freqs, dtype=np.float64) / sample_rate)
+    z2 = z1 * z1
+    numerator = (
+        coefficients[..., 0] + coefficients[..., 1] * z1 + coefficients[..., 2] * z2
+    )
+    denominator = 1 + coefficients[..., 3] * z1 + coefficients[..., 4] * z2
+    return numerator / denominator
+
+
+def magnitude_db(response):
+    """Converts a complex response to a magnitude in dB."""
+    return 20 * np.log10(np.maximum(np.abs(response), 1e-12))
+
+
+def _band_parameters(presets) -> np.ndarray:
+    """Returns (N, 24, 6) band parameters, all zero for inactive bands.
+
+    The parameters are filter type, slope, frequency, gain, Q and active.
+    """
+    if isinstance(presets, PresetBank):
+        params = np.stack(
+            [
+                presets.band_column("filter_type"),
+                presets.band_column("lp_hp_slope"),
+                presets.frequency,
+                presets.band_column("gain"),
+                presets.q,
+                (presets.band_column("enabled") != 0)
+                & (presets.band_column("active") != 0),
+            ],
+            axis=-1,
+        ).astype(np.float64)
+    else:
+        params = np.array(
+            [
+                [
+                    (
+                        band.filter_type,
+                        band.lp_hp_slope,
+                        band.frequency,
+                        band.gain,
+                        band.q,
+                        band.enabled and not band.bypass,
+                    )
+                    for band in preset.bands
+                ]
+                for preset in presets
+            ],
+            dtype=np.float64,
+        ).reshape(len(presets), NUM_BANDS, 6)
+    params[params[..., 5] == 0] = 0
+    return params
+
+
+def _compute(params: np.ndarray, freqs: np.ndarray, sample_rate: float) -> np.ndarray:
+    """Multiplies out every active section of every band, shape (N, F)."""
+    result = np.ones((len(params), len(freqs)), dtype=np.complex128)
+    presets, bands = np.nonzero(params[..., 5])
+    if not len(presets):
+        return result
+
+    active = params[presets, bands]
+    sections = band_sections(
+        active[:, 0].astype(int),
+        active[:, 1].astype(int),
+        active[:, 2],
+        active[:, 3],
+        active[:, 4],
+        sample_rate,
+    )
+    # Only sections that are not pass-through are evaluated
+    band_rows, section_rows = np.nonzero(np.any(sections != _IDENTITY, axis=-1))
+    if not len(band_rows):
+        return result
+    owners = presets[band_rows]
+    responses = biquad_response(sections[band_rows, section_rows], freqs, sample_rate)
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    result[owners[starts]] = np.multiply.reduceat(responses, starts, axis=0)
+    return result
+
+
+class ResponseCache:
+    """An LRU cache of preset responses keyed by a hash of the band parameters.
+
+    ``hits`` and ``misses`` count the lookups made through get().
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return response
+
+    def put(self, key, response: np.ndarray):
+        response.setflags(write=False)
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+default_cache = ResponseCache()
+
+# Upper bound on complex values evaluated at once, to keep memory bounded
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def batch_response(
+    presets: Union[Sequence[FabFilterPreset], PresetBank],
+    freqs,
+    sample_rate: float = 48000,
+    cache: ResponseCache = default_cache,
+) -> np.ndarray:
+    """Computes the complex response of many presets, shape (N, F).
+
+    Only enabled, non-bypassed bands contribute. ``presets`` is a sequence
+    of FabFilterPreset or a PresetBank. Use ``magnitude_db`` and
+    ``np.angle`` on the result for magnitude and phase. Pass ``cache=None``
+    to skip caching.
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    params = _band_parameters(presets)
+    result = np.empty((len(params), len(freqs)), dtype=np.complex128)
+
+    if cache is None:
+        keys = [None] * len(params)
+        missing = np.arange(len(params))
+    else:
+        context = hashlib.blake2b(freqs.tobytes(), digest_size=16)
+        context.update(np.float64(sample_rate).tobytes())
+        keys = []
+        missing = []
+        duplicates = []
+        pending = {}
+        for i, row in enumerate(params):
+            digest = context.copy()
+            digest.update(row.tobytes())
+            key = digest.digest()
+            keys.append(key)
+            cached = cache.get(key)
+            if cached is not None:
+                result[i] = cached
+            elif key in pending:
+                duplicates.append((i, pending[key]))
+            else:
+                pending[key] = i
+                missing.append(i)
+        missing = np.asarray(missing, dtype=np.int64)
+
+    chunk = max(1, _CHUNK_ELEMENTS // (NUM_BANDS * MAX_SECTIONS * max(len(freqs), 1)))
+    for start in range(0, len(missing), chunk):
+        rows = missing[start : start + chunk]
+        computed = _compute(params[rows], freqs, sample_rate)
+        result[rows] = computed
+        if cache is not None:
+            for i, response in zip(rows, computed):
+                cache.put(keys[i], response.copy())
+
+    if cache is not None:
+        for i, source in duplicates:
+            result[i] = result[source]
+    return result
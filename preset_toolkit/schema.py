@@ -0,0 +1,254 @@
+import struct
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from .conversions import freq_convert, q_convert, q_inverse_convert
+from .raw import HEADER
+
+# How stored floats map to field values: (decode, encode) expression
+# templates, where {} is the stored value or the field value. "not" truncates
+# the stored flag like "bool" does; "inverted" treats any nonzero value as set,
+# which is how the band active flag has always been read
+TRANSFORMS = {
+    "float": ("{}", "{}"),
+    "bool": ("bool(int({}))", "float({})"),
+    "not": ("not bool(int({}))", "float(not {})"),
+    "inverted": ("not bool({})", "float(not {})"),
+    "log2": ("2 ** {}", "_freq_convert({})"),
+    "q": ("_q_inverse_convert({})", "_q_convert({})"),
+    "enum": ("{enum}(int({}))", "float({})"),
+}
+_CONVERSIONS = {
+    "_freq_convert": freq_convert,
+    "_q_convert": q_convert,
+    "_q_inverse_convert": q_inverse_convert,
+}
+
+
+class SchemaError(ValueError):
+    """Raised for presets whose header does not match a known layout."""
+
+
+@dataclass(frozen=True)
+class Field:
+    """One stored parameter: the dataclass field it maps to, its position in
+    the band or global block, and how it is converted."""
+
+    name: str
+    offset: int
+    transform: str = "float"
+    enum: Optional[type] = None
+
+
+def field_codec(field: Field) -> Tuple[Callable, Callable]:
+    """Returns (decode, encode) functions converting one stored value, for
+    code that works on single fields rather than whole presets."""
+    decode, encode = TRANSFORMS[field.transform]
+    namespace = dict(_CONVERSIONS)
+    enum = None
+    if field.enum is not None:
+        enum = field.enum.__name__
+        namespace[enum] = field.enum
+    return (
+        eval(f"lambda value: {decode.format('value', enum=enum)}", namespace),
+        eval(f"lambda value: {encode.format('value')}", namespace),
+    )
+
+
+class Schema:
+    """The parameter layout of one preset version.
+
+    Presets hold ``num_bands`` blocks of ``band_params`` floats described by
+    ``band_fields``, followed by the ``global_fields``. Positions without a
+    field are written as 0.0 and ignored when reading; dataclass fields
+    without a position keep their defaults.
+
+    The codec functions (decode, encode_into, decode_bands, encode_bands,
+    decode_global_params and encode_global_params) are generated from the
+    table when the schema is created, so reading and writing cannot drift
+    apart and decoding does no per-field lookups. Stored values that cannot
+    be converted (not valid for an enum, not finite, or overflowing a
+    frequency or Q) raise a SchemaError.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        num_bands: int,
+        band_params: int,
+        band_fields: Sequence[Field],
+        global_fields: Sequence[Field],
+        preset_type: type,
+        band_type: type,
+        global_type: type,
+    ):
+        self.version = version
+        self.num_bands = num_bands
+        self.band_params = band_params
+        self.band_fields = tuple(band_fields)
+        self.global_fields = tuple(global_fields)
+        self.global_params = max(f.offset for f in self.global_fields) + 1
+        self.num_params = num_bands * band_params + self.global_params
+        self.body = struct.Struct(f"<{self.num_params}f")
+        self.size = HEADER.size + self.body.size
+        self._check(band_fields, band_params, band_type)
+        self._check(global_fields, self.global_params, global_type)
+        self.source = self._generate(preset_type, band_type, global_type)
+        namespace = {
+            "_HEADER": HEADER,
+            "_BODY": self.body,
+            "_SchemaError": SchemaError,
+            **_CONVERSIONS,
+            preset_type.__name__: preset_type,
+            band_type.__name__: band_type,
+            global_type.__name__: global_type,
+        }
+        for f in self.band_fields + self.global_fields:
+            if f.enum is not None:
+                namespace[f.enum.__name__] = f.enum
+        exec(compile(self.source, f"<Pro-Q schema v{version}>", "exec"), namespace)
+        self.decode = namespace["decode"]
+        self.encode_into = namespace["encode_into"]
+        self.decode_bands = namespace["decode_bands"]
+        self.encode_bands = namespace["encode_bands"]
+        self.decode_global_params = namespace["decode_global_params"]
+        self.encode_global_params = namespace["encode_global_params"]
+
+    def __repr__(self) -> str:
+        return f"<Schema version={self.version} num_params={self.num_params}>"
+
+    @staticmethod
+    def _check(table: Sequence[Field], size: int, target: type):
+        names = {f.name for f in fields(target)}
+        offsets = set()
+        for f in table:
+            if f.name not in names:
+                raise SchemaError(f"{target.__name__} has no field {f.name!r}")
+            if f.transform not in TRANSFORMS:
+                raise SchemaError(f"Unknown transform {f.transform!r} for {f.name}")
+            if (f.transform == "enum") != (f.enum is not None):
+                raise SchemaError(f"{f.name}: enum fields need the enum transform")
+            if not 0 <= f.offset < size or f.offset in offsets:
+                raise SchemaError(f"{f.name}: bad or duplicate offset {f.offset}")
+            offsets.add(f.offset)
+
+    @staticmethod
+    def _decode_args(table: Sequence[Field], index: str) -> str:
+        args = []
+        for f in table:
+            value = f"v[{index} + {f.offset}]" if f.offset else f"v[{index}]"
+            decode = TRANSFORMS[f.transform][0]
+            enum = f.enum.__name__ if f.enum is not None else None
+            args.append(f"{f.name}={decode.format(value, enum=enum)}")
+        return ", ".join(args)
+
+    @staticmethod
+    def _encode_values(table: Sequence[Field], size: int, obj: str) -> str:
+        by_offset = {f.offset: f for f in table}
+        values = []
+        for offset in range(size):
+            f = by_offset.get(offset)
+            if f is None:
+                values.append("0.0")
+            else:
+                values.append(TRANSFORMS[f.transform][1].format(f"{obj}.{f.name}"))
+        return ", ".join(values)
+
+    def _generate(self, preset_type: type, band_type: type, global_type: type) -> str:
+        bands_size = self.num_bands * self.band_params
+        preset = preset_type.__name__
+        band = band_type.__name__
+        global_ = global_type.__name__
+        band_args = self._decode_args(self.band_fields, "i")
+        global_args = self._decode_args(self.global_fields, "start")
+        band_values = self._encode_values(self.band_fields, self.band_params, "b")
+        global_values = self._encode_values(self.global_fields, self.global_params, "p")
+        return f"""\
+def decode_bands(v, start=0, count={self.num_bands}):
+    try:
+        return [
+            {band}({band_args})
+            for i in range(start, start + count * {self.band_params}, {self.band_params})
+        ]
+    except (ValueError, OverflowError) as e:
+        raise _SchemaError(f"Invalid band parameter: {{e}}") from None
+
+
+def decode_global_params(v, start=0):
+    try:
+        return {global_}({global_args})
+    except (ValueError, OverflowError) as e:
+        raise _SchemaError(f"Invalid global parameter: {{e}}") from None
+
+
+def encode_bands(bands):
+    values = []
+    for b in bands:
+        values += ({band_values},)
+    return values
+
+
+def encode_global_params(p):
+    return [{global_values}]
+
+
+def decode(data, offset=0):
+    fxID, version, num_params = _HEADER.unpack_from(data, offset)
+    v = _BODY.unpack_from(data, offset + {HEADER.size})
+    return {preset}(
+        fxID=fxID.decode("ascii"),
+        version=version,
+        num_params=num_params,
+        bands=decode_bands(v),
+        global_params=decode_global_params(v, {bands_size}),
+    )
+
+
+def encode_into(preset, buffer, offset=0):
+    bands = preset.bands
+    if len(bands) != {self.num_bands}:
+        raise ValueError(f"Expected {self.num_bands} bands, got {{len(bands)}}")
+    _HEADER.pack_into(
+        buffer, offset, preset.fxID.encode("ascii"), preset.version, preset.num_params
+    )
+    _BODY.pack_into(
+        buffer,
+        offset + {HEADER.size},
+        *encode_bands(bands),
+        *encode_global_params(preset.global_params),
+    )
+"""
+
+
+_schemas: Dict[int, Schema] = {}
+_default: Optional[Schema] = None
+
+
+def register(schema: Schema, default: bool = False):
+    """Registers the layout for ``schema.version``.
+
+    Presets of unregistered versions are read with the default schema.
+    """
+    global _default
+    _schemas[schema.version] = schema
+    if default or _default is None:
+        _default = schema
+
+
+def schema_for(version: int, num_params: int) -> Schema:
+    """Returns the schema for a preset header, checking its parameter count."""
+    schema = _schemas.get(version, _default)
+    if schema is None:
+        raise SchemaError("No preset schema registered")
+    if num_params != schema.num_params:
+        raise SchemaError(
+            f"Preset version {version} declares {num_params} parameters, "
+            f"expected {schema.num_params}"
+        )
+    return schema
+
+
+def read_schema(data, offset: int = 0) -> Schema:
+    """Returns the schema for the preset file in ``data`` at ``offset``."""
+    _, version, num_params = HEADER.unpack_from(data, offset)
+    return schema_for(version, num_params)
@@ -1,5 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import re
+from typing import Dict, Iterable, Iterator, Optional
+
+_CHANNEL_RE = re.compile(r"(\S.*?) channel calibration:")
+_DELAY_RE = re.compile(r"Delay:\s*([-+\d.eE]+)\s*ms")
+_GAIN_RE = re.compile(r"Gain:\s*([-+\d.eE]+)\s*dB")
+_BAND_RE = re.compile(r"\|([\d.]+)\s+Hz\|([-+\d.eE]+)\s+dB\|")
 
 
 @dataclass
@@ -8,44 +14,83 @@ class EqBand:
     gain: float
 
 
+@dataclass
+class ChannelCalibration:
+    name: str
+    delay: float = 0.0
+    gain: float = 0.0
+    bands: list[EqBand] = field(default_factory=list)
+
+
+def iter_calibrations(lines: Iterable[str]) -> Iterator[ChannelCalibration]:
+    """Parses channel calibrations from export lines in a single pass.
+
+    Each channel is yielded as soon as its band table ends.
+    """
+    channel = None
+    for line in lines:
+        line = line.strip()
+        if channel is not None:
+            match = _BAND_RE.match(line)
+            if match:
+                channel.bands.append(
+                    EqBand(float(match.group(1)), float(match.group(2)))
+                )
+                continue
+            if channel.bands:
+                yield channel
+                channel = None
+            elif line.startswith("Delay:"):
+                match = _DELAY_RE.match(line)
+                if match:
+                    channel.delay = float(match.group(1))
+                continue
+            elif line.startswith("Gain:"):
+                match = _GAIN_RE.match(line)
+                if match:
+                    channel.gain = float(match.group(1))
+                continue
+
+        match = _CHANNEL_RE.match(line)
+        if match:
+            if channel is not None:
+                yield channel
+            channel = ChannelCalibration(match.group(1))
+
+    if channel is not None:
+        yield channel
+
+
 class SoundIdExport:
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.l_bands = None
         self.r_bands = None
+        self.channels: Optional[Dict[str, ChannelCalibration]] = None
 
     def parse_eq_bands(self, data: str) -> list[EqBand]:
         bands = []
         for line in data.strip().split("\n")[2:]:  # Skip the header lines
-            match = re.match(r"\|(\d+)\s+Hz\|([-\d.]+)\s+dB\|", line)
+            match = _BAND_RE.match(line)
             if match:
                 freq = float(match.group(1))
                 gain = float(match.group(2))
                 bands.append(EqBand(freq, gain))
         return bands
 
-    def extract_calibration_data(self):
+    def iter_channels(self) -> Iterator[ChannelCalibration]:
+        """Streams the channel calibrations of the export file."""
         with open(self.file_path, "r") as file:
-            content = file.read()
-
-        # Extract L channel and R channel EQ data using regex
-        l_channel_data = re.search(
-            r"L channel calibration:\s*Delay:.*?Gain:.*?\n\n\|Freq\s+\|Gain\s+.*?\n(\|.*?\n)+",
-            content,
-            re.DOTALL,
-        )
-        r_channel_data = re.search(
-            r"R channel calibration:\s*Delay:.*?Gain:.*?\n\n\|Freq\s+\|Gain\s+.*?\n(\|.*?\n)+",
-            content,
-            re.DOTALL,
-        )
-
-        if l_channel_data and r_channel_data:
-            l_channel_data_str = l_channel_data.group(0)
-            r_channel_data_str = r_channel_data.group(0)
-
-            self.l_bands = self.parse_eq_bands(l_channel_data_str)
-            self.r_bands = self.parse_eq_bands(r_channel_data_str)
+            yield from iter_calibrations(file)
+
+    def extract_calibration_data(self):
+        self.channels = {channel.name: channel for channel in self.iter_channels()}
+
+        l_channel = self.channels.get("L")
+        r_channel = self.channels.get("R")
+        if l_channel and l_channel.bands and r_channel and r_channel.bands:
+            self.l_bands = l_channel.bands
+            self.r_bands = r_channel.bands
         else:
             raise ValueError("Could not find the required EQ band data in the file.")
 
@@ -0,0 +1,278 @@
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .conversions import FREQUENCY_RANGE, Q_RANGE, freq_convert, q_convert
+from .diff import param_name
+from .raw import BAND_NAMES, GLOBAL_NAMES
+from .proq3_preset import (
+    _BODY,
+    _HEADER,
+    BAND_PARAMS,
+    NUM_BANDS,
+    NUM_PARAMS,
+    AnalyzerRange,
+    AnalyzerResolution,
+    AnalyzerSidechain,
+    AnalyzerSpeed,
+    AnalyzerTilt,
+    DisplayRange,
+    FabFilterPreset,
+    FabFilterPresetManager,
+    GlobalParams,
+    LinearPhaseMode,
+    ProcessMode,
+    ProQFilterType,
+    ProQLPHPSlope,
+    ProQStereoPlacement,
+)
+
+POLICIES = ("strict", "repair", "skip")
+
+_BOOL = frozenset((0, 1))
+
+# Valid encoded values per stored parameter (named as in preset_toolkit.raw):
+# a (low, high) range or a frozenset of allowed values. Parameters not listed
+# only have to be finite.
+BAND_RULES = {
+    "enabled": _BOOL,
+    "active": _BOOL,
+    "frequency": (freq_convert(FREQUENCY_RANGE[0]), freq_convert(FREQUENCY_RANGE[1])),
+    "gain": (-30.0, 30.0),
+    "dyn_range": (-30.0, 30.0),
+    "dyn_range_enabled": _BOOL,
+    "q": (q_convert(Q_RANGE[0]), q_convert(Q_RANGE[1])),
+    "filter_type": frozenset(ProQFilterType),
+    "lp_hp_slope": frozenset(ProQLPHPSlope),
+    "stereo_placement": frozenset(ProQStereoPlacement),
+}
+GLOBAL_RULES = {
+    "process_mode": frozenset(ProcessMode),
+    "linear_mode_value": frozenset(LinearPhaseMode),
+    "gain_scale": (-1.0, 2.0),
+    "output_gain": (-36.0, 36.0),
+    "output_pan": (-1.0, 1.0),
+    "bypass": _BOOL,
+    "phase_invert": _BOOL,
+    "auto_gain": _BOOL,
+    "analyzer_pre": _BOOL,
+    "analyzer_post": _BOOL,
+    "analyzer_sidechain": frozenset(AnalyzerSidechain),
+    "analyzer_range": frozenset(AnalyzerRange),
+    "analyzer_res": frozenset(AnalyzerResolution),
+    "analyzer_speed": frozenset(AnalyzerSpeed),
+    "analyzer_tilt": frozenset(AnalyzerTilt),
+    "show_collisions": _BOOL,
+    "spectrum_grab": _BOOL,
+    "display_range": frozenset(DisplayRange),
+    "midi_disabled": _BOOL,
+}
+
+
+def _build_tables():
+    """Expands the rules into per-parameter arrays over the 334 values."""
+    rules = [BAND_RULES.get(name) for name in BAND_NAMES] * NUM_BANDS
+    rules += [GLOBAL_RULES.get(name) for name in GLOBAL_NAMES]
+    # Values without a rule only have to be finite
+    high = np.full(NUM_PARAMS, np.finfo(np.float32).max, dtype=np.float32)
+    low = -high
+    discrete = [i for i, rule in enumerate(rules) if isinstance(rule, frozenset)]
+    # Discrete values are small integers: each field gets a bit mask of the
+    # values it allows, counted up from the smallest value any field allows
+    smallest = min(min(rules[i]) for i in discrete)
+    allowed = np.zeros(len(discrete), dtype=np.uint32)
+    for column, index in enumerate(discrete):
+        for value in rules[index]:
+            allowed[column] |= 1 << (value - smallest)
+    for index, rule in enumerate(rules):
+        if rule is not None and index not in discrete:
+            low[index], high[index] = rule
+    return rules, low, high, np.array(discrete), np.float32(smallest), allowed
+
+
+_RULES, _LOW, _HIGH, _DISCRETE, _SMALLEST, _ALLOWED = _build_tables()
+_RANGED = np.array([isinstance(rule, tuple) for rule in _RULES])
+_DEFAULTS = np.array(
+    FabFilterPresetManager()._encode_bands(FabFilterPreset().bands)
+    + FabFilterPresetManager._encode_global_params(GlobalParams()),
+    dtype=np.float32,
+)
+
+
+class ValidationError(ValueError):
+    """Raised by the strict policy; ``report`` lists what failed."""
+
+    def __init__(self, report: "ValidationReport"):
+        super().__init__(str(report))
+        self.report = report
+
+
+@dataclass
+class Issue:
+    """One invalid parameter value."""
+
+    preset: int
+    index: int
+    value: float
+
+    @property
+    def name(self) -> str:
+        return param_name(self.index)
+
+    @property
+    def reason(self) -> str:
+        if not np.isfinite(self.value):
+            return "not finite"
+        if isinstance(_RULES[self.index], frozenset):
+            return f"not one of {sorted(int(v) for v in _RULES[self.index])}"
+        low, high = _RULES[self.index]
+        return f"outside [{low:g}, {high:g}]"
+
+    def __str__(self) -> str:
+        return f"{self.name} = {self.value:g} ({self.reason})"
+
+
+class ValidationReport:
+    """The invalid values found in N presets.
+
+    ``bad`` is the (N, 334) mask of invalid values; ``issues`` lists them.
+    """
+
+    def __init__(self, values: np.ndarray, bad: np.ndarray):
+        self._values = values
+        self.bad = bad
+        self.invalid = bad.any(axis=1)
+
+    @property
+    def checked(self) -> int:
+        return len(self.bad)
+
+    @property
+    def ok(self) -> bool:
+        return not self.invalid.any()
+
+    @property
+    def invalid_count(self) -> int:
+        return int(self.invalid.sum())
+
+    @property
+    def issues(self) -> List[Issue]:
+        presets, indices = np.nonzero(self.bad)
+        return [
+            Issue(int(preset), int(index), float(self._values[preset, index]))
+            for preset, index in zip(presets, indices)
+        ]
+
+    def preset_issues(self, preset: int) -> List[Issue]:
+        return [
+            Issue(preset, int(index), float(self._values[preset, index]))
+            for index in np.nonzero(self.bad[preset])[0]
+        ]
+
+    def __str__(self) -> str:
+        if self.ok:
+            return f"{self.checked} presets valid"
+        issues = self.issues
+        lines = [
+            f"{self.invalid_count} of {self.checked} presets invalid, "
+            f"{len(issues)} bad values"
+        ]
+        lines += [f"  preset {issue.preset}: {issue}" for issue in issues[:10]]
+        if len(issues) > 10:
+            lines.append(f"  ... {len(issues) - 10} more")
+        return "\n".join(lines)
+
+
+def _as_values(values) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float32)
+    if values.shape[-1] != NUM_PARAMS:
+        raise ValueError(f"Expected {NUM_PARAMS} values per preset")
+    return values.reshape(-1, NUM_PARAMS)
+
+
+def validate(values) -> ValidationReport:
+    """Checks encoded parameter vectors, (334,) or (N, 334), in one pass."""
+    values = _as_values(values)
+    with np.errstate(invalid="ignore"):
+        bad = ~((values >= _LOW) & (values <= _HIGH))  # also catches NaN
+        # Discrete values must be integers whose bit is set in the field's
+        # mask; anything else (negative, too large, NaN) fails one of the two
+        offsets = values[:, _DISCRETE] - _SMALLEST
+        bits = offsets.astype(np.int32) & 31
+        bad[:, _DISCRETE] = (bits != offsets) | (
+            (_ALLOWED >> bits.astype(np.uint32)) & 1 == 0
+        )
+    return ValidationReport(values, bad)
+
+
+def sanitize(values, policy: str) -> Tuple[np.ndarray, ValidationReport]:
+    """Validates encoded parameter vectors and applies ``policy``.
+
+    ``strict`` raises ValidationError if any preset is invalid; ``repair``
+    clamps ranged values into range and resets other invalid values to
+    their defaults; ``skip`` drops invalid presets (``report.invalid`` tells
+    which). Returns the (M, 334) values and the report.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown validation policy {policy!r}, expected {POLICIES}")
+    values = _as_values(values)
+    report = validate(values)
+    if report.ok:
+        return values, report
+    if policy == "strict":
+        raise ValidationError(report)
+    if policy == "skip":
+        return values[~report.invalid], report
+    return repair(values, report), report
+
+
+def repair(values, report: ValidationReport) -> np.ndarray:
+    """Returns a copy of ``values`` with the invalid values of ``report``
+    clamped into range, or reset to their defaults if they have no range."""
+    values = _as_values(values)
+    repaired = np.where(report.bad, _DEFAULTS, values)
+    ranged = report.bad & np.isfinite(values) & _RANGED
+    repaired[ranged] = np.clip(values, _LOW, _HIGH)[ranged]
+    return repaired
+
+
+def sanitize_bank(bank, policy: str):
+    """sanitize for a PresetBank; returns the new bank and the report."""
+    from .bank import PresetBank
+
+    values = np.concatenate(
+        [bank.bands.reshape(len(bank), -1), bank.global_params], axis=1
+    )
+    sanitized, report = sanitize(values, policy)
+    keep = ~report.invalid if policy == "skip" else np.ones(len(bank), dtype=bool)
+    records = bank.records[keep].copy()
+    split = NUM_BANDS * BAND_PARAMS
+    records["bands"] = sanitized[:, :split].reshape(-1, NUM_BANDS, BAND_PARAMS)
+    records["global_params"] = sanitized[:, split:]
+    names = None
+    if bank.names is not None:
+        names = [name for name, kept in zip(bank.names, keep) if kept]
+    return PresetBank(records, names=names), report
+
+
+def check_preset(data, offset: int, policy: str) -> Optional[Tuple[object, int]]:
+    """Validates one preset file buffer for FabFilterPresetManager.decode.
+
+    Returns the buffer and offset to decode from, which are repaired copies
+    under ``repair``, or None if the preset is skipped.
+    """
+    start = offset + _HEADER.size
+    if len(data) < start + _BODY.size:
+        # Reported like the struct errors of unvalidated decoding
+        raise struct.error(f"unpack requires a buffer of {_BODY.size} bytes")
+    values = np.frombuffer(data, dtype="<f4", count=NUM_PARAMS, offset=start)
+    sanitized, report = sanitize(values, policy)
+    if report.ok:
+        return data, offset
+    if not len(sanitized):
+        return None
+    repaired = bytearray(data[offset : offset + _HEADER.size + _BODY.size])
+    repaired[_HEADER.size :] = sanitized.astype("<f4").tobytes()
+    return repaired, 0
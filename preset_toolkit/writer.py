@@ -0,0 +1,248 @@
+import itertools
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import List, Optional, Tuple
+
+from .proq3_preset import PRESET_SIZE, FabFilterPreset, FabFilterPresetManager
+
+_temp_names = itertools.count()
+
+
+def _temp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{next(_temp_names)}.tmp"
+
+
+def _fsync_directory(directory: str):
+    """Makes renames in ``directory`` durable; not possible on Windows."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_temp(path: str, data) -> Tuple[str, int]:
+    """Writes ``data`` to a temporary file next to ``path``; returns its path
+    and open file descriptor."""
+    temp_path = _temp_path(path)
+    fd = os.open(
+        temp_path,
+        os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0),
+        0o666,
+    )
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    except BaseException:
+        os.close(fd)
+        os.remove(temp_path)
+        raise
+    return temp_path, fd
+
+
+def write_atomic(path: str, data, fsync: bool = False):
+    """Writes a file so readers never see it partially written.
+
+    The data goes to a temporary file that is renamed over ``path``; with
+    ``fsync`` the file and the rename are also flushed to disk.
+    """
+    temp_path, fd = _write_temp(path, data)
+    try:
+        if fsync:
+            os.fsync(fd)
+    except BaseException:
+        os.close(fd)
+        os.remove(temp_path)
+        raise
+    os.close(fd)
+    try:
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    if fsync:
+        _fsync_directory(os.path.dirname(path))
+
+
+@dataclass
+class WriteSummary:
+    """Aggregate results of a PresetWriter."""
+
+    written: int = 0
+    failed: int = 0
+    bytes_written: int = 0
+    fsyncs: int = 0
+    seconds: float = 0.0
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        rate = self.written / self.seconds if self.seconds > 0 else 0.0
+        return (
+            f"Wrote {self.written} presets ({self.bytes_written / 1e6:.1f} MB) "
+            f"in {self.seconds:.2f} s ({rate:.0f} presets/s), {self.failed} failed"
+        )
+
+
+class PresetWriter:
+    """Writes many preset files atomically, as a context manager.
+
+    Each preset is encoded into a preallocated buffer and written to a
+    temporary file. With ``fsync`` the temporary files are synced and renamed
+    ``batch_size`` at a time, followed by one fsync per directory of the
+    batch; without it they are renamed immediately. Either way a crash never
+    leaves a partially written preset behind. ``workers`` threads do the file
+    I/O in the background; with 0 writes happen in the calling thread.
+
+    Failures do not stop the writer: they are collected in ``summary``,
+    which close() returns, instead of being printed per file.
+    """
+
+    def __init__(
+        self,
+        manager: Optional[FabFilterPresetManager] = None,
+        workers: int = 0,
+        fsync: bool = True,
+        batch_size: int = 256,
+    ):
+        self.manager = manager or FabFilterPresetManager()
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self.summary = WriteSummary()
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, str, int, int]] = []
+        self._start = perf_counter()
+        self._closed = False
+        self._executor = None
+        # Free encode buffers; blocking on them bounds the queued writes
+        self._buffers: "queue.Queue[bytearray]" = queue.Queue()
+        self._buffer_count = max(1, 2 * workers)
+        for _ in range(self._buffer_count):
+            self._buffers.put(bytearray(PRESET_SIZE))
+        if workers:
+            self._executor = ThreadPoolExecutor(workers)
+
+    def __enter__(self) -> "PresetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, path: str, preset: FabFilterPreset):
+        """Encodes and queues one preset file."""
+        buffer = self._buffers.get()
+        try:
+            self.manager.encode_into(preset, buffer)
+        except Exception as e:
+            self._buffers.put(buffer)
+            self._failed(path, e)
+            return
+        self._submit(path, buffer, buffer)
+
+    def write_bytes(self, path: str, data: bytes):
+        """Queues an already encoded preset, or any other file contents."""
+        self._submit(path, data, self._buffers.get())
+
+    def _submit(self, path: str, data, buffer: bytearray):
+        if self._closed:
+            self._buffers.put(buffer)
+            raise ValueError("PresetWriter is closed")
+        if self._executor is None:
+            self._write(path, data, buffer)
+        else:
+            self._executor.submit(self._write, path, data, buffer)
+
+    def _write(self, path: str, data, buffer: bytearray):
+        # The buffer is released only once the file is queued, so that
+        # flush() can wait for queued writes by claiming every buffer
+        try:
+            self._write_file(path, data)
+        finally:
+            self._buffers.put(buffer)
+
+    def _write_file(self, path: str, data):
+        try:
+            temp_path, fd = _write_temp(path, data)
+        except Exception as e:
+            self._failed(path, e)
+            return
+        entry = (path, temp_path, fd, len(data))
+        if not self.fsync:
+            os.close(fd)
+            self._commit([entry])
+            return
+        with self._lock:
+            self._pending.append(entry)
+            batch = None
+            if len(self._pending) >= self.batch_size:
+                batch, self._pending = self._pending, []
+        if batch:
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[str, str, int, int]]):
+        """Renames written temporary files into place, syncing them first
+        when ``fsync`` is set."""
+        written = 0
+        size = 0
+        directories = set()
+        for path, temp_path, fd, file_size in batch:
+            try:
+                if self.fsync:
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                os.replace(temp_path, path)
+            except Exception as e:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                self._failed(path, e)
+                continue
+            written += 1
+            size += file_size
+            directories.add(os.path.dirname(path))
+        fsyncs = 0
+        if self.fsync and written:
+            for directory in directories:
+                _fsync_directory(directory)
+            fsyncs = written + len(directories)
+        with self._lock:
+            self.summary.written += written
+            self.summary.bytes_written += size
+            self.summary.fsyncs += fsyncs
+
+    def _failed(self, path: str, error: Exception):
+        with self._lock:
+            self.summary.failed += 1
+            self.summary.errors.append((path, f"{type(error).__name__}: {error}"))
+        instrumentation = self.manager.instrumentation
+        if instrumentation is not None:
+            instrumentation.error("write_error", path, error)
+
+    def flush(self):
+        """Waits for queued writes and syncs and renames the pending batch."""
+        if self._executor is not None:
+            # Wait for the queued writes by claiming every buffer
+            buffers = [self._buffers.get() for _ in range(self._buffer_count)]
+            for buffer in buffers:
+                self._buffers.put(buffer)
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._commit(batch)
+
+    def close(self) -> WriteSummary:
+        """Finishes every write and returns the summary."""
+        if not self._closed:
+            self._closed = True
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+            self.flush()
+            self.summary.seconds = perf_counter() - self._start
+        return self.summary
@@ -0,0 +1,95 @@
+import asyncio
+import shutil
+import pytest
+from preset_toolkit.aio import AsyncPresetIO, aiter_presets, aread_preset, awrite_preset
+from preset_toolkit.proq3_preset import FabFilterPresetManager, FabFilterPreset
+
+SAMPLE = "tests/samples/default_preset.ffp"
+
+
+@pytest.fixture
+def library(tmp_path):
+    paths = []
+    for i in range(300):
+        path = str(tmp_path / f"{i}.ffp")
+        shutil.copy(SAMPLE, path)
+        paths.append(path)
+    return paths
+
+
+def test_aread_and_awrite(tmp_path):
+    preset = FabFilterPreset()
+    preset.bands[0].gain = 4.0
+    path = str(tmp_path / "preset.ffp")
+
+    async def main():
+        await awrite_preset(path, preset)
+        return await aread_preset(path), await aread_preset(str(tmp_path / "missing"))
+
+    read, missing = asyncio.run(main())
+    assert read.bands[0].gain == 4.0
+    assert missing is None
+
+
+def test_iter_presets_bounded(library):
+    io = AsyncPresetIO(max_concurrency=8)
+
+    async def main():
+        return [item async for item in io.iter_presets(library)]
+
+    results = asyncio.run(main())
+    io.close()
+    expected = FabFilterPresetManager().read_preset(SAMPLE)
+    assert sorted(path for path, _ in results) == sorted(library)
+    assert all(preset == expected for _, preset in results)
+
+
+def test_aiter_presets(library):
+    async def main():
+        return [item async for item in aiter_presets(library[:10])]
+
+    assert len(asyncio.run(main())) == 10
+
+
+async def _loop_ticks(load) -> int:
+    """Runs load() and counts the event loop iterations it lets through."""
+    ticks = 0
+    running = True
+
+    async def ticker():
+        nonlocal ticks
+        while running:
+            await asyncio.sleep(0)
+            ticks += 1
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    ticks = 0
+    await load()
+    running = False
+    await task
+    return ticks
+
+
+def test_loop_keeps_running_under_concurrent_load(library):
+    # Counts loop iterations rather than timing them, so the check does not
+    # depend on machine load: blocking reads all run in the same few
+    # iterations, while the async reader hands the loop back at least once
+    # per batch of max_concurrency reads.
+    manager = FabFilterPresetManager()
+    io = AsyncPresetIO(manager=manager, max_concurrency=16)
+
+    async def sync_read(path):
+        return manager.read_preset(path)
+
+    async def sync_load():
+        await asyncio.gather(*(sync_read(path) for path in library))
+
+    async def async_load():
+        await asyncio.gather(*(io.read_preset(path) for path in library))
+
+    sync_ticks = asyncio.run(_loop_ticks(sync_load))
+    async_ticks = asyncio.run(_loop_ticks(async_load))
+    io.close()
+    assert sync_ticks < 10
+    assert async_ticks >= len(library) // 16
@@ -0,0 +1,102 @@
+import os
+import pytest
+from preset_toolkit.archive import PresetArchive, pack_directory
+from preset_toolkit.proq3_preset import FabFilterPresetManager, FabFilterPreset
+
+SAMPLE = "tests/samples/default_preset.ffp"
+
+
+@pytest.fixture
+def preset_manager():
+    return FabFilterPresetManager()
+
+
+def _preset(gain):
+    preset = FabFilterPreset()
+    preset.bands[0].enabled = True
+    preset.bands[0].gain = gain
+    return preset
+
+
+def test_append_and_random_access(tmp_path, preset_manager):
+    path = tmp_path / "presets.ffpa"
+    with PresetArchive.create(path) as archive:
+        for i in range(5):
+            archive.append(f"preset {i}", _preset(float(i)))
+
+    with PresetArchive(path) as archive:
+        assert len(archive) == 5
+        assert archive.names == [f"preset {i}" for i in range(5)]
+        assert archive[3].bands[0].gain == 3.0
+        assert archive["preset 4"].bands[0].gain == 4.0
+        assert archive[-1].bands[0].gain == 4.0
+        assert "preset 2" in archive
+        with pytest.raises(IndexError):
+            archive.get(5)
+        with pytest.raises(IOError):
+            archive.append("x", _preset(0.0))
+
+
+def test_replace_remove_and_compact(tmp_path):
+    path = tmp_path / "presets.ffpa"
+    with PresetArchive.create(path) as archive:
+        for i in range(3):
+            archive.append(f"preset {i}", _preset(float(i)))
+        archive.append("preset 1", _preset(10.0))
+        archive.remove("preset 0")
+        assert archive.names == ["preset 1", "preset 2"]
+        assert archive["preset 1"].bands[0].gain == 10.0
+
+        size = os.path.getsize(path)
+        archive.compact()
+        assert os.path.getsize(path) < size
+        assert archive.names == ["preset 1", "preset 2"]
+        assert archive["preset 1"].bands[0].gain == 10.0
+        assert archive["preset 2"].bands[0].gain == 2.0
+
+        archive.append("preset 3", _preset(3.0))
+        assert len(archive) == 3
+
+
+def test_pack_directory(tmp_path, preset_manager):
+    library = tmp_path / "library"
+    (library / "drums").mkdir(parents=True)
+    with open(SAMPLE, "rb") as file:
+        data = file.read()
+    (library / "default.ffp").write_bytes(data)
+    (library / "drums" / "kick.ffp").write_bytes(data)
+
+    with pack_directory(library, tmp_path / "library.ffpa") as archive:
+        assert archive.names == ["default", "drums/kick"]
+        assert archive.read_raw("drums/kick") == data
+        assert archive["default"] == preset_manager.read_preset(SAMPLE)
+
+
+def test_reject_wrong_size(tmp_path):
+    with PresetArchive.create(tmp_path / "presets.ffpa") as archive:
+        with pytest.raises(ValueError):
+            archive.extend_raw([("short", b"FQ3p")])
+        assert len(archive) == 0
+
+
+def test_to_bank(tmp_path):
+    pytest.importorskip("numpy")
+    with PresetArchive.create(tmp_path / "presets.ffpa") as archive:
+        for i in range(3):
+            archive.append(f"preset {i}", _preset(float(i)))
+        archive.remove("preset 1")
+        bank = archive.to_bank()
+        assert bank.names == ["preset 0", "preset 2"]
+        assert list(bank.gain[:, 0]) == [0.0, 2.0]
+
+
+def test_to_bank_contiguous(tmp_path):
+    pytest.importorskip("numpy")
+    with PresetArchive.create(tmp_path / "presets.ffpa") as archive:
+        for i in range(4):
+            archive.append(f"preset {i}", _preset(float(i)))
+        bank = archive.to_bank()
+        first = archive[0]
+    # The bank owns its records, so it outlives the archive's mmap
+    assert list(bank.gain[:, 0]) == [0.0, 1.0, 2.0, 3.0]
+    assert bank.to_presets()[0] == first
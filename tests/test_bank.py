@@ -0,0 +1,104 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from preset_toolkit.bank import (
+    BAND_COLUMNS,
+    GLOBAL_COLUMNS,
+    PresetBank,
+    freq_convert,
+    q_convert,
+    q_inverse_convert,
+)
+from preset_toolkit.proq3_preset import (
+    FabFilterPresetManager,
+    FabFilterPreset,
+    ProQFilterType,
+)
+from preset_toolkit.raw import BAND_NAMES, GLOBAL_NAMES
+
+SAMPLE = "tests/samples/default_preset.ffp"
+
+
+@pytest.fixture
+def presets():
+    presets = []
+    for i in range(3):
+        preset = FabFilterPreset()
+        preset.bands[i].enabled = True
+        preset.bands[i].frequency = 100.0 * (i + 1)
+        preset.bands[i].gain = -3.0 * i
+        preset.bands[i].q = 0.5 + i
+        preset.bands[i].filter_type = ProQFilterType.LowShelf
+        presets.append(preset)
+    return presets
+
+
+def test_vectorized_conversions_match_scalar():
+    manager = FabFilterPresetManager()
+    values = np.array([20.0, 1000.0, 19500.0])
+    for value, converted in zip(values, freq_convert(values)):
+        assert converted == pytest.approx(manager.freq_convert(value))
+    qs = np.array([0.025, 1.0, 40.0])
+    for value, converted in zip(qs, q_convert(qs)):
+        assert converted == pytest.approx(manager.q_convert(value))
+    for value, converted in zip(qs, q_inverse_convert(qs)):
+        assert converted == pytest.approx(manager.q_inverse_convert(value))
+
+
+def test_from_files_is_on_disk_layout():
+    bank = PresetBank.from_files([SAMPLE, SAMPLE])
+    assert bank.bands.shape == (2, 24, 13)
+    assert bank.global_params.shape == (2, 22)
+    assert bank.bands.dtype == np.float32
+    assert np.shares_memory(bank.bands, bank.records)
+    with open(SAMPLE, "rb") as file:
+        assert bank.records[0].tobytes() == file.read()
+    assert bank.frequency[0, 0] == pytest.approx(1000.0, rel=1e-6)
+
+
+def test_columns_use_stored_names(presets):
+    presets[0].bands[0].bypass = True
+    presets[0].global_params.enable_midi = False
+    bank = PresetBank.from_presets(presets)
+    assert list(BAND_COLUMNS) == list(BAND_NAMES)
+    assert list(GLOBAL_COLUMNS) == list(GLOBAL_NAMES)
+    assert bank.band_column("active")[:, 0].tolist() == [0, 1, 1]
+    assert bank.global_column("midi_disabled").tolist() == [1, 0, 0]
+    with pytest.raises(KeyError):
+        bank.band_column("bypass")
+
+
+def test_presets_round_trip(presets):
+    bank = PresetBank.from_presets(presets)
+    assert bank.to_presets() == PresetBank.from_presets(bank.to_presets()).to_presets()
+    decoded = bank.to_presets()
+    for original, preset in zip(presets, decoded):
+        assert preset.bands[0].filter_type == original.bands[0].filter_type
+        for a, b in zip(original.bands, preset.bands):
+            assert b.frequency == pytest.approx(a.frequency, rel=1e-6)
+            assert b.gain == pytest.approx(a.gain)
+            assert b.q == pytest.approx(a.q, rel=1e-6)
+
+
+def test_bulk_edit_and_export(presets, tmp_path):
+    bank = PresetBank.from_presets(presets)
+    bank.gain = bank.gain * 2
+    bank.frequency = bank.frequency * 2
+    paths = [str(tmp_path / f"{i}.ffp") for i in range(len(bank))]
+    bank.to_files(paths)
+
+    manager = FabFilterPresetManager()
+    for i, path in enumerate(paths):
+        preset = manager.read_preset(path)
+        assert preset.bands[i].frequency == pytest.approx(200.0 * (i + 1), rel=1e-6)
+        assert preset.bands[i].gain == pytest.approx(-6.0 * i)
+    assert (PresetBank.from_files(paths).records == bank.records).all()
+
+
+def test_getitem(presets):
+    bank = PresetBank.from_presets(presets, names=["a", "b", "c"])
+    assert len(bank[1]) == 1
+    assert bank[1].names == ["b"]
+    assert bank[-1].names == ["c"]
+    assert bank[1:].names == ["b", "c"]
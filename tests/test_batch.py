@@ -0,0 +1,62 @@
+import pytest
+from preset_toolkit.batch import read_presets
+from preset_toolkit.proq3_preset import FabFilterPresetManager
+
+SAMPLE = "tests/samples/default_preset.ffp"
+
+
+@pytest.fixture
+def library(tmp_path):
+    with open(SAMPLE, "rb") as file:
+        data = file.read()
+    paths = []
+    for i in range(10):
+        path = tmp_path / f"preset_{i:02}.ffp"
+        path.write_bytes(data)
+        paths.append(str(path))
+    (tmp_path / "preset_10.ffp").write_bytes(data[:100])
+    paths.append(str(tmp_path / "preset_10.ffp"))
+    return paths
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_read_presets_ordered(library, workers):
+    expected = FabFilterPresetManager().read_preset(SAMPLE)
+    calls = []
+
+    results = list(
+        read_presets(
+            library,
+            workers=workers,
+            chunksize=3,
+            ordered=True,
+            progress=lambda done, total: calls.append((done, total)),
+        )
+    )
+
+    assert [result.path for result in results] == library
+    assert all(result.preset == expected for result in results[:10])
+    assert not results[10].ok
+    assert results[10].preset is None
+    assert "expected 1348" in results[10].error
+    assert calls[-1] == (11, 11)
+    assert [done for done, _ in calls] == sorted(done for done, _ in calls)
+
+
+def test_read_presets_glob_unordered(library, tmp_path):
+    results = list(read_presets(str(tmp_path / "*.ffp"), workers=2, chunksize=4))
+    assert sorted(result.path for result in results) == library
+    assert sum(result.ok for result in results) == 10
+
+
+def test_read_presets_raw(library):
+    results = list(read_presets(library[:2], workers=0, decode=False))
+    with open(SAMPLE, "rb") as file:
+        data = file.read()
+    assert [result.data for result in results] == [data, data]
+    assert all(result.preset is None for result in results)
+
+
+def test_read_presets_missing_file(tmp_path):
+    (result,) = read_presets([str(tmp_path / "missing.ffp")], workers=0)
+    assert result.error.startswith("FileNotFoundError")
@@ -0,0 +1,39 @@
+from benchmarks.compare import compare
+from benchmarks.generators import CHANNEL_NAMES, random_presets, write_soundid_export
+from benchmarks.run import generate, run_case
+from preset_toolkit.proq3_preset import PRESET_SIZE, FabFilterPresetManager
+from preset_toolkit.soundid import SoundIdExport
+
+
+def test_random_presets_round_trip():
+    manager = FabFilterPresetManager()
+    presets = list(random_presets(20, seed=1))
+    assert len(set(presets)) == 20
+    for data in presets:
+        assert len(data) == PRESET_SIZE
+        assert manager.encode(manager.decode(data)) == data
+
+
+def test_soundid_export_parses(tmp_path):
+    path = tmp_path / "export.txt"
+    write_soundid_export(str(path), seed=3)
+    export = SoundIdExport(str(path))
+    export.extract_calibration_data()
+    assert list(export.channels) == CHANNEL_NAMES
+    assert all(len(channel.bands) == 31 for channel in export.channels.values())
+
+
+def test_run_case_reports_measurements(tmp_path):
+    generate(str(tmp_path), count=5, exports=2)
+    for name in ("read_preset", "round_trip", "soundid_parse"):
+        result = run_case(name, str(tmp_path))
+        assert result["ops"] in (5, 2)
+        assert result["ops_per_sec"] > 0
+        assert result["traced_peak_bytes_per_op"] > 0
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    old = {"results": {"a": {"ops_per_sec": 100}, "b": {"ops_per_sec": 100}}}
+    new = {"results": {"a": {"ops_per_sec": 85}, "b": {"ops_per_sec": 95}}}
+    assert [row[4] for row in compare(old, new, threshold=0.1)] == [True, False]
+    assert [row[4] for row in compare(old, new, threshold=0.2)] == [False, False]
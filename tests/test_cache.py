@@ -0,0 +1,165 @@
+import os
+import shutil
+import timeit
+import pytest
+from preset_toolkit.cache import PresetCache
+from preset_toolkit.instrumentation import Recorder
+from preset_toolkit.proq3_preset import FabFilterPresetManager, FabFilterPreset
+
+SAMPLE = "tests/samples/default_preset.ffp"
+
+
+@pytest.fixture
+def preset_path(tmp_path):
+    path = tmp_path / "preset.ffp"
+    shutil.copy(SAMPLE, path)
+    return str(path)
+
+
+def _touch(path, delta_ns=10**9):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + delta_ns))
+
+
+def test_memory_hits(preset_path):
+    cache = PresetCache()
+    manager = FabFilterPresetManager(cache=cache)
+
+    first = manager.read_preset(preset_path)
+    second = manager.read_preset(preset_path)
+
+    assert first == second == FabFilterPresetManager().read_preset(SAMPLE)
+    assert (cache.stats.misses, cache.stats.hits) == (1, 1)
+
+
+def test_hits_are_not_shared(preset_path):
+    manager = FabFilterPresetManager(cache=PresetCache())
+    first = manager.read_preset(preset_path)
+    first.bands[0].gain = 99.0
+    first.bands.append(first.bands[0])
+    first.global_params.output_gain = 12.0
+
+    second = manager.read_preset(preset_path)
+    assert second == FabFilterPresetManager().read_preset(SAMPLE)
+    assert len(second.bands) == 24
+
+
+def test_hits_skip_the_parser(preset_path):
+    manager = FabFilterPresetManager(cache=PresetCache())
+    uncached = FabFilterPresetManager()
+    manager.read_preset(preset_path)
+
+    def best(read):
+        return min(timeit.repeat(lambda: read(preset_path), number=50, repeat=5))
+
+    assert best(manager.read_preset) < best(uncached.read_preset) / 2
+
+
+def test_instrumented_cached_reads(preset_path):
+    recorder = Recorder()
+    manager = FabFilterPresetManager(cache=PresetCache(), instrumentation=recorder)
+    manager.read_preset(preset_path)
+    manager.read_preset(preset_path)
+    manager.read_preset(preset_path, lazy=True)
+
+    assert recorder.stages["open"].calls == recorder.stages["read"].calls == 1
+    assert recorder.counters["presets_read"] == 3
+    assert recorder.counters["bytes_read"] == 3 * os.path.getsize(preset_path)
+    assert recorder.counters["cache_misses"] == 1
+    assert recorder.counters["cache_hits"] == 2
+
+
+def test_compact_reads_are_cached(preset_path):
+    cache = PresetCache()
+    manager = FabFilterPresetManager(cache=cache)
+    manager.read_preset(preset_path)
+    preset = manager.read_preset(preset_path, compact=True)
+
+    assert preset == FabFilterPresetManager().read_preset(SAMPLE)
+    assert cache.stats.hits == 1
+
+
+def test_changed_file_is_reparsed(preset_path):
+    cache = PresetCache()
+    manager = FabFilterPresetManager(cache=cache)
+    manager.read_preset(preset_path)
+
+    preset = FabFilterPreset()
+    preset.bands[0].gain = 5.0
+    FabFilterPresetManager().write_preset(preset_path, preset)
+    _touch(preset_path)
+
+    assert manager.read_preset(preset_path).bands[0].gain == 5.0
+    assert cache.stats.misses == 2
+
+
+def test_touched_file_is_revalidated(preset_path):
+    cache = PresetCache()
+    manager = FabFilterPresetManager(cache=cache)
+    first = manager.read_preset(preset_path)
+    _touch(preset_path)
+
+    assert manager.read_preset(preset_path) == first
+    assert (cache.stats.revalidations, cache.stats.misses) == (1, 1)
+    assert manager.read_preset(preset_path) == first
+    assert cache.stats.hits == 1
+
+
+def test_eviction(tmp_path):
+    cache = PresetCache(maxsize=2)
+    manager = FabFilterPresetManager(cache=cache)
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f"{i}.ffp"))
+        shutil.copy(SAMPLE, paths[-1])
+        manager.read_preset(paths[-1])
+
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+    manager.read_preset(paths[0])
+    assert cache.stats.misses == 4
+
+
+def test_disk_tier(preset_path, tmp_path):
+    directory = str(tmp_path / "cache")
+    FabFilterPresetManager(cache=PresetCache(directory=directory)).read_preset(
+        preset_path
+    )
+
+    cache = PresetCache(directory=directory)
+    preset = FabFilterPresetManager(cache=cache).read_preset(preset_path)
+    assert preset == FabFilterPresetManager().read_preset(SAMPLE)
+    assert (cache.stats.disk_hits, cache.stats.misses) == (1, 0)
+
+
+def test_corrupt_disk_entry_is_ignored(preset_path, tmp_path):
+    directory = tmp_path / "cache"
+    FabFilterPresetManager(cache=PresetCache(directory=str(directory))).read_preset(
+        preset_path
+    )
+    (entry,) = directory.iterdir()
+    entry.write_bytes(entry.read_bytes()[:-1])
+
+    cache = PresetCache(directory=str(directory))
+    preset = FabFilterPresetManager(cache=cache).read_preset(preset_path)
+    assert preset == FabFilterPresetManager().read_preset(SAMPLE)
+    assert (cache.stats.disk_hits, cache.stats.misses) == (0, 1)
+
+
+def test_invalidate(preset_path, tmp_path):
+    cache = PresetCache(directory=str(tmp_path / "cache"))
+    manager = FabFilterPresetManager(cache=cache)
+    manager.read_preset(preset_path)
+
+    cache.invalidate(preset_path)
+    manager.read_preset(preset_path)
+    assert cache.stats.misses == 2
+
+    cache.invalidate()
+    assert len(cache) == 0
+    assert os.listdir(tmp_path / "cache") == []
+
+
+def test_missing_file():
+    manager = FabFilterPresetManager(cache=PresetCache())
+    assert manager.read_preset("nonexistent_file.ffp") is None
@@ -0,0 +1,81 @@
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from benchmarks.generators import write_soundid_export
+from preset_toolkit.cli import main
+from preset_toolkit.proq3_preset import FabFilterPresetManager
+
+SAMPLE = "tests/samples/soundid.txt"
+
+
+@pytest.fixture
+def exports(tmp_path):
+    source = tmp_path / "exports"
+    (source / "studio_b").mkdir(parents=True)
+    shutil.copy(SAMPLE, source / "studio_a.txt")
+    write_soundid_export(str(source / "studio_b" / "room.txt"), ["L", "R", "C"], seed=4)
+    (source / "broken.txt").write_text("not an export\n")
+    return source
+
+
+def test_convert_directory(exports, tmp_path, capsys):
+    output = tmp_path / "presets"
+    assert main(["convert", str(exports), "-o", str(output), "-j", "2"]) == 1
+
+    written = sorted(
+        os.path.relpath(os.path.join(root, name), output)
+        for root, _, names in os.walk(output)
+        for name in names
+        if name.endswith(".ffp")
+    )
+    assert written == [
+        "studio_a_L.ffp",
+        "studio_a_R.ffp",
+        os.path.join("studio_b", "room_C.ffp"),
+        os.path.join("studio_b", "room_L.ffp"),
+        os.path.join("studio_b", "room_R.ffp"),
+    ]
+    preset = FabFilterPresetManager().read_preset(str(output / "studio_a_L.ffp"))
+    assert any(band.enabled for band in preset.bands)
+
+    captured = capsys.readouterr()
+    assert "Converted 2 exports into 5 presets" in captured.out
+    assert "1 failed" in captured.out
+    assert "broken.txt" in captured.err
+    assert not [name for name in os.listdir(output) if name.endswith(".tmp")]
+
+
+@pytest.mark.parametrize("check", ["mtime", "hash"])
+def test_up_to_date_exports_are_skipped(exports, tmp_path, capsys, check):
+    (exports / "broken.txt").unlink()
+    output = str(tmp_path / "presets")
+    args = ["convert", str(exports), "-o", output, "-j", "0", "--check", check]
+    assert main(args) == 0
+    assert main(args) == 0
+    assert (
+        "Converted 0 exports into 0 presets" in capsys.readouterr().out.splitlines()[-1]
+    )
+
+    # A changed export is converted again, as is everything with --force
+    with open(exports / "studio_a.txt", "a") as file:
+        file.write("\n")
+    main(args)
+    summary = capsys.readouterr().out
+    assert "Converted 1 exports into 2 presets" in summary
+    assert "1 up to date" in summary
+    main(args + ["--force"])
+    assert "Converted 2 exports into 5 presets" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("max_bands", ["0", "25", "many"])
+def test_max_bands_out_of_range(exports, tmp_path, capsys, max_bands):
+    argv = ["convert", str(exports), "-o", str(tmp_path / "out")]
+    with pytest.raises(SystemExit) as exit_info:
+        main(argv + ["--max-bands", max_bands])
+    assert exit_info.value.code == 2
+    assert "--max-bands" in capsys.readouterr().err
+    assert not (tmp_path / "out").exists()
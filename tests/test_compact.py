@@ -0,0 +1,96 @@
+import gc
+import struct
+import tracemalloc
+import pytest
+from preset_toolkit.compact import CompactEQBand, CompactGlobalParams
+from preset_toolkit.proq3_preset import (
+    AnalyzerSidechain,
+    FabFilterPresetManager,
+    EQBand,
+    ProcessMode,
+    ProQFilterType,
+)
+from preset_toolkit.raw import band_index, global_index
+
+SAMPLE = "tests/samples/default_preset.ffp"
+
+
+@pytest.fixture
+def preset_manager():
+    return FabFilterPresetManager()
+
+
+def test_compact_matches_regular(preset_manager):
+    regular = preset_manager.read_preset(SAMPLE)
+    compact = preset_manager.read_preset(SAMPLE, compact=True)
+
+    assert isinstance(compact.bands[0], CompactEQBand)
+    assert isinstance(compact.global_params, CompactGlobalParams)
+    assert compact == regular
+    assert compact.bands[0].to_dataclass() == regular.bands[0]
+    assert type(compact.global_params.process_mode) is ProcessMode
+
+
+def test_compact_uses_schema_conversions(preset_manager):
+    with open(SAMPLE, "rb") as file:
+        data = bytearray(file.read())
+    # Non-integral flag values must convert like the regular codec
+    struct.pack_into("<f", data, 12 + 4 * band_index(0, "active"), 0.5)
+    struct.pack_into("<f", data, 12 + 4 * global_index("midi_disabled"), 0.5)
+    regular = preset_manager.decode(data)
+    compact = preset_manager.decode(data, compact=True)
+
+    assert compact.bands[0].bypass is regular.bands[0].bypass is False
+    assert compact.global_params.enable_midi is regular.global_params.enable_midi
+    assert regular.global_params.enable_midi is True
+    assert type(compact.global_params.analyzer_sidechain) is AnalyzerSidechain
+    assert compact == regular
+
+
+def test_compact_attribute_api(preset_manager, tmp_path):
+    preset = preset_manager.read_preset(SAMPLE, compact=True)
+    preset.bands[0].enabled = True
+    preset.bands[0].gain = 6
+    preset.bands[0].frequency = 4000.0
+    preset.bands[0].q = 2
+    preset.bands[0].filter_type = ProQFilterType.HighShelf
+    preset.bands[1] = EQBand(enabled=True, gain=-3.0)
+    preset.global_params.process_mode = ProcessMode.LinearPhase
+
+    path = str(tmp_path / "compact.ffp")
+    preset_manager.write_preset(path, preset)
+    read = preset_manager.read_preset(path)
+
+    assert read.bands[0].enabled
+    assert read.bands[0].gain == 6
+    assert read.bands[0].frequency == pytest.approx(4000.0)
+    assert read.bands[0].q == pytest.approx(2)
+    assert read.bands[0].filter_type == ProQFilterType.HighShelf
+    assert read.bands[1].gain == -3.0
+    assert read.global_params.process_mode == ProcessMode.LinearPhase
+    assert len(preset.bands[-2:]) == 2
+
+
+def test_compact_write_is_lossless(preset_manager, tmp_path):
+    path = str(tmp_path / "compact.ffp")
+    preset_manager.write_preset(path, preset_manager.read_preset(SAMPLE, compact=True))
+    with open(path, "rb") as written, open(SAMPLE, "rb") as original:
+        assert written.read() == original.read()
+
+
+def _footprint(preset_manager, compact, count=200):
+    gc.collect()
+    tracemalloc.start()
+    presets = [
+        preset_manager.read_preset(SAMPLE, compact=compact) for _ in range(count)
+    ]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del presets
+    return size / count
+
+
+def test_compact_footprint(preset_manager):
+    regular = _footprint(preset_manager, compact=False)
+    compact = _footprint(preset_manager, compact=True)
+    assert compact < regular / 3
@@ -0,0 +1,97 @@
+import math
+import struct
+
+import pytest
+
+from preset_toolkit import conversions
+from preset_toolkit.conversions import frequency_table, q_table, significant_steps
+from preset_toolkit.proq3_preset import FabFilterPresetManager
+
+
+def _f32(value):
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+# The original formulas of FabFilterPresetManager
+def _legacy_freq_convert(value):
+    return math.log10(value) / math.log10(2)
+
+
+def _legacy_q_convert(value):
+    return math.log10(value) * 0.312098175 + 0.5
+
+
+def _legacy_q_inverse_convert(value):
+    return 10 ** ((value - 0.5) / 0.312098175)
+
+
+FREQUENCIES = [10.0, 20.0, 31.7, 440.0, 1000.0, 1234.5, 19999.0, 30000.0]
+QS = [0.025, 0.1, 0.7071, 1.0, 2.5, 10.0, 40.0]
+
+
+@pytest.mark.parametrize("value", FREQUENCIES)
+def test_freq_convert_matches_original(value):
+    assert _f32(conversions.freq_convert(value)) == _f32(_legacy_freq_convert(value))
+    assert FabFilterPresetManager.freq_convert(value) == conversions.freq_convert(value)
+    raw = _f32(_legacy_freq_convert(value))
+    assert _f32(conversions.freq_inverse_convert(raw)) == _f32(2**raw)
+
+
+@pytest.mark.parametrize("value", QS)
+def test_q_convert_matches_original(value):
+    assert _f32(conversions.q_convert(value)) == _f32(_legacy_q_convert(value))
+    raw = _f32(_legacy_q_convert(value))
+    assert _f32(conversions.q_inverse_convert(raw)) == _f32(
+        _legacy_q_inverse_convert(raw)
+    )
+
+
+def test_array_versions_match_scalar():
+    np = pytest.importorskip("numpy")
+    freqs = np.array(FREQUENCIES)
+    qs = np.array(QS)
+    for array_function, scalar_function, values in [
+        (conversions.freq_convert_array, _legacy_freq_convert, freqs),
+        (conversions.q_convert_array, _legacy_q_convert, qs),
+        (
+            conversions.q_inverse_convert_array,
+            _legacy_q_inverse_convert,
+            conversions.q_convert_array(qs),
+        ),
+        (conversions.freq_inverse_convert_array, lambda v: 2**v, np.log2(freqs)),
+    ]:
+        expected = np.array([scalar_function(v) for v in values], dtype=np.float32)
+        assert np.array_equal(array_function(values).astype(np.float32), expected)
+
+
+def test_significant_steps():
+    steps = significant_steps(10, 30000, 4)
+    assert steps[:3] == [10.0, 10.01, 10.02]
+    assert 1234.0 in steps and 12350.0 in steps and 12345.0 not in steps
+    assert steps[-1] == 30000.0
+    assert steps == sorted(set(steps))
+
+
+def test_quantized_tables_round_trip():
+    table = frequency_table()
+    assert table.quantize(1234.4) == 1234.0
+    assert table.quantize(1000.0) == 1000.0
+    raw = table.to_raw(440.04)
+    assert raw == _f32(math.log2(440.0))
+    assert table.from_raw(raw) == 440.0
+    assert table.from_raw(_f32(math.log2(440.01))) == 440.0
+    assert table.quantize(5.0) == 10.0 and table.quantize(1e6) == 30000.0
+
+    qs = q_table()
+    for value in (0.025, 0.707, 1.0, 12.3, 40.0):
+        assert qs.from_raw(qs.to_raw(value)) == value
+
+
+def test_quantized_tables_arrays():
+    np = pytest.importorskip("numpy")
+    table = frequency_table()
+    values = np.array([10.0, 440.04, 1234.4, 29999.9, 50000.0])
+    raws = table.to_raw_array(values)
+    assert raws.dtype == np.float32
+    assert list(table.from_raw_array(raws)) == [table.quantize(v) for v in values]
+    assert list(raws) == [table.to_raw(v) for v in values]
@@ -0,0 +1,86 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from preset_toolkit.dedup import PresetIndex, preset_digest
+from preset_toolkit.proq3_preset import (
+    FabFilterPreset,
+    FabFilterPresetManager,
+    ProQFilterType,
+)
+
+
+def _preset(*bands, slots=None):
+    preset = FabFilterPreset()
+    slots = slots or range(len(bands))
+    for slot, (filter_type, frequency, gain, q) in zip(slots, bands):
+        band = preset.bands[slot]
+        band.enabled = True
+        band.filter_type = filter_type
+        band.frequency = frequency
+        band.gain = gain
+        band.q = q
+    return preset
+
+
+BELL = (ProQFilterType.Bell, 1000.0, 3.0, 1.0)
+SHELF = (ProQFilterType.LowShelf, 100.0, -2.0, 0.7)
+
+
+def test_digest_ignores_band_order_silent_bands_and_noise():
+    preset = _preset(BELL, SHELF)
+    reordered = _preset(SHELF, BELL, slots=[5, 2])
+    reordered.bands[0].gain = 12.0  # disabled
+    bypassed = _preset(BELL, SHELF, (ProQFilterType.HighShelf, 8000.0, 6.0, 0.7))
+    bypassed.bands[2].bypass = True
+    noisy = _preset(BELL, SHELF)
+    noisy.bands[0].gain += 1e-6
+    noisy.global_params.analyzer_pre = False
+
+    assert preset_digest(preset) == preset_digest(reordered)
+    assert preset_digest(preset) == preset_digest(bypassed)
+    assert preset_digest(preset) == preset_digest(noisy)
+    assert preset_digest(preset) != preset_digest(_preset(BELL))
+
+
+def test_exact_duplicates():
+    index = PresetIndex()
+    index.add("a", _preset(BELL, SHELF))
+    index.add("b", _preset(SHELF, BELL))
+    index.add("c", _preset(BELL))
+    index.add_many([("d", None), ("e", _preset(BELL))])
+
+    assert index.duplicates(_preset(BELL, SHELF)) == ["a", "b"]
+    assert sorted(index.duplicate_groups()) == [["a", "b"], ["c", "e"]]
+    assert len(index) == 4
+
+
+def test_nearest():
+    index = PresetIndex()
+    for i in range(50):
+        index.add(
+            f"bell {i}", _preset((ProQFilterType.Bell, 100.0 * (i + 1), 3.0, 1.0))
+        )
+    index.add("shelf", _preset(SHELF))
+
+    query = _preset((ProQFilterType.Bell, 1010.0, 3.2, 1.0))
+    name, distance = index.nearest(query, k=1)[0]
+    assert name == "bell 9"
+    assert distance < 0.1
+    assert all(d <= 0.5 for _, d in index.nearest(query, k=10, max_distance=0.5))
+
+
+def test_save_and_load(tmp_path):
+    index = PresetIndex(seed=3)
+    manager = FabFilterPresetManager()
+    index.add("default", manager.read_preset("tests/samples/default_preset.ffp"))
+    index.add("bell", _preset(BELL))
+    path = str(tmp_path / "index")
+    index.save(path)
+    assert (tmp_path / "index").exists()
+
+    loaded = PresetIndex.load(path)
+    assert loaded.names == ["default", "bell"]
+    assert loaded.seed == 3
+    assert loaded.duplicates(FabFilterPreset()) == ["default"]
+    assert loaded.nearest(_preset(BELL), k=1)[0][0] == "bell"
@@ -0,0 +1,98 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from preset_toolkit.diff import (
+    PresetDelta,
+    apply_patch,
+    diff,
+    param_index,
+    param_name,
+    replay,
+)
+from preset_toolkit.proq3_preset import (
+    FabFilterPreset,
+    FabFilterPresetManager,
+    ProQFilterType,
+)
+
+
+@pytest.fixture
+def base():
+    with open("tests/samples/default_preset.ffp", "rb") as file:
+        return FabFilterPresetManager().decode(file.read())
+
+
+def _variant(preset, gain):
+    manager = FabFilterPresetManager()
+    variant = manager.decode(manager.encode(preset))
+    variant.bands[3].gain = gain
+    variant.bands[3].filter_type = ProQFilterType.HighShelf
+    variant.global_params.output_gain = 0.5
+    return variant
+
+
+def test_param_names():
+    assert param_name(0) == "bands[0].enabled"
+    assert param_name(3 * 13 + 3) == "bands[3].gain"
+    assert param_name(24 * 13) == "global_params.process_mode"
+    # Inverted flags are named as stored
+    assert param_name(13 + 1) == "bands[1].active"
+    assert param_name(24 * 13 + 20) == "global_params.midi_disabled"
+    for index in (0, 42, 311, 312, 333):
+        assert param_index(param_name(index)) == index
+    with pytest.raises(IndexError):
+        param_name(334)
+
+
+def test_diff_lists_changed_fields(base):
+    delta = diff(base, _variant(base, 4.0))
+    assert [change.name for change in delta.changes()] == [
+        "bands[3].gain",
+        "bands[3].filter_type",
+        "global_params.output_gain",
+    ]
+    assert delta.changes()[0].new == 4.0
+    assert not diff(base, base)
+
+
+def test_bypass_change_reads_as_stored(base):
+    target = FabFilterPresetManager().decode(FabFilterPresetManager().encode(base))
+    target.bands[2].bypass = not base.bands[2].bypass
+    (change,) = diff(base, target).changes()
+    assert change.name == "bands[2].active"
+    assert change.new == float(not target.bands[2].bypass)
+
+
+def test_apply_patch_and_reverse(base):
+    manager = FabFilterPresetManager()
+    target = _variant(base, 4.0)
+    delta = diff(base, target)
+
+    patched = apply_patch(base, delta)
+    assert manager.encode(patched) == manager.encode(target)
+    assert manager.encode(apply_patch(patched, delta.reversed())) == manager.encode(
+        base
+    )
+    with pytest.raises(ValueError, match="bands\\[3\\].gain"):
+        apply_patch(target, delta)
+
+
+def test_binary_delta_round_trip(base):
+    delta = diff(base, _variant(base, -2.5))
+    data = delta.to_bytes()
+    assert len(data) == delta.nbytes == 2 + 3 * 10
+    assert PresetDelta.from_bytes(data) == delta
+    assert PresetDelta.from_bytes(b"xx" + data, offset=2) == delta
+
+
+def test_replay_revision_chain(base):
+    manager = FabFilterPresetManager()
+    revisions = [base] + [_variant(base, gain) for gain in (1.0, 2.0, 6.0)]
+    revisions.append(FabFilterPreset())
+    deltas = [
+        PresetDelta.from_bytes(diff(a, b).to_bytes())
+        for a, b in zip(revisions, revisions[1:])
+    ]
+    assert manager.encode(replay(base, deltas)) == manager.encode(revisions[-1])
+    assert manager.encode(replay(base, deltas[:2])) == manager.encode(revisions[2])
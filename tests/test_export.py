@@ -0,0 +1,142 @@
+import io
+import random
+
+import pytest
+
+from benchmarks.generators import random_preset, soundid_export
+from preset_toolkit.export import (
+    export_apo,
+    export_calibrations_apo,
+    export_calibrations_csv,
+    export_calibrations_ndjson,
+    export_csv,
+    export_ndjson,
+    import_apo,
+    import_calibrations_apo,
+    import_calibrations_csv,
+    import_calibrations_ndjson,
+    import_csv,
+    import_ndjson,
+)
+from preset_toolkit.proq3_preset import (
+    FabFilterPreset,
+    FabFilterPresetManager,
+    ProQFilterType,
+    ProQLPHPSlope,
+    ProQStereoPlacement,
+)
+from preset_toolkit.soundid import iter_calibrations
+
+
+@pytest.fixture
+def presets():
+    # Decoded from the binary format, so every value is exactly representable
+    manager = FabFilterPresetManager()
+    rng = random.Random(5)
+    return [
+        (f"preset {i}", manager.decode(manager.encode(random_preset(rng))))
+        for i in range(12)
+    ]
+
+
+@pytest.mark.parametrize(
+    "export,load", [(export_csv, import_csv), (export_ndjson, import_ndjson)]
+)
+def test_round_trip(presets, export, load, tmp_path):
+    path = tmp_path / "presets.txt"
+    assert export(iter(presets), str(path), chunk_size=5) == len(presets)
+    assert list(load(str(path))) == presets
+
+
+def test_presets_without_names(presets):
+    buffer = io.StringIO()
+    export_ndjson((preset for _, preset in presets), buffer)
+    buffer.seek(0)
+    assert [name for name, _ in import_ndjson(buffer)] == [None] * len(presets)
+
+
+def test_compact_and_lazy_presets_export_like_eager(presets):
+    manager = FabFilterPresetManager()
+    data = manager.encode(presets[0][1])
+    outputs = []
+    for preset in (
+        presets[0][1],
+        manager.decode(data, compact=True),
+        manager.decode(data, lazy=True),
+    ):
+        buffer = io.StringIO()
+        export_csv([preset], buffer)
+        outputs.append(buffer.getvalue())
+    assert outputs[0] == outputs[1] == outputs[2]
+
+
+def test_apo_round_trip():
+    preset = FabFilterPreset()
+    for slot, (filter_type, freq, gain, q) in enumerate(
+        [
+            (ProQFilterType.Bell, 1000.0, 3.5, 1.5),
+            (ProQFilterType.LowShelf, 100.0, -2.0, 0.75),
+            (ProQFilterType.LowCut, 30.0, 0.0, 0.5),
+            (ProQFilterType.Notch, 60.0, 0.0, 8.0),
+        ]
+    ):
+        band = preset.bands[slot * 2]
+        band.enabled = True
+        band.filter_type = filter_type
+        band.frequency = freq
+        band.gain = gain
+        band.q = q
+    preset.bands[2].lp_hp_slope = ProQLPHPSlope.Slope12dB_oct
+    preset.bands[6].bypass = True
+    preset.bands[0].stereo_placement = ProQStereoPlacement.Left
+    preset.bands[9].enabled = True
+    preset.bands[9].filter_type = ProQFilterType.TiltShelf
+
+    buffer = io.StringIO()
+    export_apo([("Room", preset), ("Flat", FabFilterPreset())], buffer)
+    text = buffer.getvalue()
+    assert "Channel: L\nFilter 1: ON PK Fc 1000 Hz Gain 3.5 dB Q 1.5\n" in text
+    assert "Filter 3: ON HPQ Fc 30 Hz Q 0.5" in text
+    assert "Filter 4: OFF NO Fc 60 Hz Q 8" in text
+    assert "# Filter 5: unsupported TiltShelf" in text
+
+    buffer.seek(0)
+    (name, imported), (flat_name, flat) = import_apo(buffer)
+    assert (name, flat_name) == ("Room", "Flat")
+    assert flat == FabFilterPreset()
+    expected = [band for band in preset.bands if band.enabled][:4]
+    for band, original in zip(imported.bands, expected):
+        for field in ("bypass", "filter_type", "frequency", "gain", "q"):
+            assert getattr(band, field) == getattr(original, field)
+        assert band.stereo_placement == original.stereo_placement
+    assert not any(band.enabled for band in imported.bands[4:])
+
+
+def test_import_rew_filter_file():
+    text = (
+        "Filter Settings file\n"
+        "Filter  1: ON  PK       Fc   63.5 Hz  Gain  -6.2 dB  Q  4.11\n"
+        "Filter  2: ON  HP       Fc   20.0 Hz\n"
+        "Filter  3: ON  None\n"
+    )
+    ((name, preset),) = import_apo(io.StringIO(text))
+    assert name is None
+    assert preset.bands[0].frequency == 63.5 and preset.bands[0].gain == -6.2
+    assert preset.bands[1].filter_type == ProQFilterType.LowCut
+    assert not preset.bands[2].enabled
+
+
+@pytest.mark.parametrize(
+    "export,load",
+    [
+        (export_calibrations_csv, import_calibrations_csv),
+        (export_calibrations_ndjson, import_calibrations_ndjson),
+        (export_calibrations_apo, import_calibrations_apo),
+    ],
+)
+def test_calibration_round_trip(export, load):
+    channels = list(iter_calibrations(soundid_export(seed=2).splitlines()))
+    buffer = io.StringIO()
+    assert export(iter(channels), buffer, chunk_size=3) == len(channels)
+    buffer.seek(0)
+    assert list(load(buffer)) == channels
@@ -0,0 +1,70 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from preset_toolkit.fitting import fit_curve, fit_export
+from preset_toolkit.proq3_preset import ProQFilterType
+from preset_toolkit.response import biquad_coefficients, biquad_response, magnitude_db
+from preset_toolkit.soundid import SoundIdExport
+
+
+def _db(filter_type, frequency, gain, q, freqs):
+    coefficients = biquad_coefficients(filter_type, frequency, gain, q)
+    return magnitude_db(biquad_response(coefficients, freqs))
+
+
+def test_bell_and_shelf_responses():
+    assert _db(ProQFilterType.Bell, 1000, 6, 1, [1000]) == pytest.approx([6])
+    assert _db(ProQFilterType.Bell, 1000, 6, 1, [20]) == pytest.approx([0], abs=0.05)
+    low_shelf = _db(ProQFilterType.LowShelf, 1000, -6, 0.7, [20, 1000, 20000])
+    assert low_shelf == pytest.approx([-6, -3, 0], abs=0.1)
+    high_shelf = _db(ProQFilterType.HighShelf, 1000, 6, 0.7, [20, 1000, 20000])
+    assert high_shelf == pytest.approx([0, 3, 6], abs=0.1)
+
+
+def test_fit_single_bell():
+    freqs = np.geomspace(40, 16000, 27)
+    gains = _db(ProQFilterType.Bell, 1000, -4, 2, freqs)
+
+    result = fit_curve(freqs, gains)
+
+    enabled = [band for band in result.preset.bands if band.enabled]
+    assert 1 <= len(enabled) <= 3
+    assert result.max_error <= 0.25
+    assert result.preset.bands[0].filter_type == ProQFilterType.Bell
+    assert result.preset.bands[0].frequency == pytest.approx(1000, rel=0.1)
+
+
+def test_fit_flat_curve_uses_no_bands():
+    result = fit_curve([40, 1000, 16000], [0, 0, 0])
+    assert not any(band.enabled for band in result.preset.bands)
+    assert result.max_error == 0
+
+
+def test_fit_max_bands():
+    freqs = np.geomspace(40, 16000, 27)
+    gains = 6 * np.sin(np.arange(27))
+    result = fit_curve(freqs, gains, max_bands=4)
+    assert sum(band.enabled for band in result.preset.bands) == 4
+
+
+@pytest.mark.parametrize("max_bands", [0, 25])
+def test_fit_max_bands_out_of_range(max_bands):
+    with pytest.raises(ValueError, match="max_bands"):
+        fit_curve([40, 1000, 16000], [0, 3, 0], max_bands=max_bands)
+
+
+def test_fit_export():
+    results = fit_export(SoundIdExport("tests/samples/soundid.txt"))
+
+    assert list(results) == ["L", "R"]
+    for result in results.values():
+        assert result.rms_error < 0.5
+        assert result.max_error < 1.5
+        for band in result.preset.bands:
+            assert band.filter_type in (
+                ProQFilterType.Bell,
+                ProQFilterType.LowShelf,
+                ProQFilterType.HighShelf,
+            )
+            assert 40 <= band.frequency <= 16000
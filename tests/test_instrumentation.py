@@ -0,0 +1,75 @@
+import logging
+
+from preset_toolkit.instrumentation import (
+    STAGES,
+    LoggingInstrumentation,
+    PrometheusInstrumentation,
+    Recorder,
+)
+from preset_toolkit.proq3_preset import FabFilterPresetManager
+
+SAMPLE = "tests/samples/default_preset.ffp"
+
+
+def test_recorder_times_every_stage(tmp_path, capsys):
+    recorder = Recorder()
+    manager = FabFilterPresetManager(instrumentation=recorder)
+    preset = manager.read_preset(SAMPLE)
+    manager.write_preset(str(tmp_path / "out.ffp"), preset)
+
+    assert set(recorder.stages) == set(STAGES)
+    assert recorder.stages["open"].calls == 2
+    assert recorder.stages["decode_bands"].seconds > 0
+    assert recorder.counters == {
+        "presets_read": 1,
+        "bytes_read": 1348,
+        "presets_written": 1,
+        "bytes_written": 1348,
+    }
+    assert (tmp_path / "out.ffp").read_bytes() == open(SAMPLE, "rb").read()
+    assert capsys.readouterr().out == ""
+
+
+def test_errors_become_events(tmp_path, capsys):
+    recorder = Recorder()
+    manager = FabFilterPresetManager(instrumentation=recorder)
+    assert manager.read_preset(str(tmp_path / "missing.ffp")) is None
+    (tmp_path / "short.ffp").write_bytes(b"FQ3p")
+    assert manager.read_preset(str(tmp_path / "short.ffp")) is None
+
+    assert recorder.error_counts == {"read_error": 2}
+    assert [event.error_type for event in recorder.errors] == [
+        "FileNotFoundError",
+        "error",
+    ]
+    assert recorder.errors[0].path.endswith("missing.ffp")
+    assert capsys.readouterr().out == ""
+
+
+def test_errors_are_printed_without_instrumentation(capsys):
+    FabFilterPresetManager().read_preset("missing.ffp")
+    assert "Error reading preset file missing.ffp" in capsys.readouterr().out
+
+
+def test_logging_adapter(caplog):
+    manager = FabFilterPresetManager(instrumentation=LoggingInstrumentation())
+    with caplog.at_level(logging.DEBUG, logger="preset_toolkit"):
+        manager.read_preset(SAMPLE)
+        manager.read_preset("missing.ffp")
+    stages = {record.preset_stage for record in caplog.records if record.levelno == 10}
+    assert stages >= {"open", "read", "decode_bands", "construct"}
+    (error,) = [record for record in caplog.records if record.levelno == 40]
+    assert error.preset_event == "read_error"
+    assert error.preset_path == "missing.ffp"
+
+
+def test_prometheus_exposition():
+    metrics = PrometheusInstrumentation()
+    manager = FabFilterPresetManager(instrumentation=metrics)
+    manager.read_preset(SAMPLE)
+    manager.read_preset("missing.ffp")
+    text = metrics.exposition()
+    assert 'preset_toolkit_stage_calls_total{stage="decode_bands"} 1' in text
+    assert "preset_toolkit_presets_read_total 1" in text
+    assert 'preset_toolkit_errors_total{event="read_error"} 1' in text
+    assert "# TYPE preset_toolkit_stage_seconds_total counter" in text
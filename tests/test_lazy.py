@@ -0,0 +1,75 @@
+import pytest
+
+from preset_toolkit.lazy import LazyPreset
+from preset_toolkit.proq3_preset import (
+    FabFilterPresetManager,
+    ProcessMode,
+    ProQFilterType,
+)
+
+SAMPLE = "tests/samples/default_preset.ffp"
+
+
+@pytest.fixture
+def data():
+    with open(SAMPLE, "rb") as file:
+        return file.read()
+
+
+def test_lazy_read_matches_eager_read():
+    manager = FabFilterPresetManager()
+    lazy = manager.read_preset(SAMPLE, lazy=True)
+    assert isinstance(lazy, LazyPreset)
+    assert lazy.bands.decoded() == []
+    assert lazy.global_params.process_mode == ProcessMode.ZeroLatency
+    assert lazy.bands.decoded() == []
+
+    eager = manager.read_preset(SAMPLE)
+    assert lazy.bands[5] == eager.bands[5]
+    assert lazy.bands.decoded() == [5]
+    assert lazy == eager and eager == lazy
+    assert manager.decode(memoryview(b"xx" + bytes(lazy._data)), 2, lazy=True) == eager
+
+
+def test_bands_are_memoized(data):
+    lazy = FabFilterPresetManager().decode(data, lazy=True)
+    assert lazy.bands[3] is lazy.bands[3]
+    assert lazy.bands[-1] is lazy.bands[23]
+    assert len(lazy.bands[2:4]) == 2
+    with pytest.raises(IndexError):
+        lazy.bands[24]
+
+
+def test_untouched_lazy_preset_encodes_original_bytes(data):
+    manager = FabFilterPresetManager()
+    lazy = manager.decode(data, lazy=True)
+    lazy.bands[0]
+    lazy.global_params
+    assert manager.encode(lazy) == data
+
+
+def test_lazy_edits_are_written_back(data, tmp_path):
+    manager = FabFilterPresetManager()
+    lazy = manager.decode(data, lazy=True)
+    lazy.bands[7].gain = 4.5
+    lazy.bands[7].filter_type = ProQFilterType.Notch
+    lazy.global_params.auto_gain = True
+
+    eager = manager.decode(data)
+    eager.bands[7].gain = 4.5
+    eager.bands[7].filter_type = ProQFilterType.Notch
+    eager.global_params.auto_gain = True
+    assert manager.encode(lazy) == manager.encode(eager)
+
+    path = str(tmp_path / "edited.ffp")
+    manager.write_preset(path, lazy)
+    assert manager.read_preset(path) == eager
+
+    lazy.bands = eager.bands
+    assert manager.encode(lazy) == manager.encode(eager)
+
+
+def test_lazy_read_truncated_file(tmp_path):
+    path = tmp_path / "truncated.ffp"
+    path.write_bytes(b"FQ3p" + bytes(100))
+    assert FabFilterPresetManager().read_preset(str(path), lazy=True) is None
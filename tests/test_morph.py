@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from preset_toolkit.bank import PresetBank
+from preset_toolkit.morph import blend, interpolate, write_interpolations
+from preset_toolkit.proq3_preset import (
+    FabFilterPreset,
+    FabFilterPresetManager,
+    ProcessMode,
+    ProQFilterType,
+)
+
+
+@pytest.fixture
+def start():
+    preset = FabFilterPreset()
+    band = preset.bands[0]
+    band.enabled = True
+    band.frequency = 100.0
+    band.gain = 6.0
+    band.q = 0.5
+    return PresetBank.from_presets([preset])
+
+
+@pytest.fixture
+def end():
+    preset = FabFilterPreset()
+    band = preset.bands[0]
+    band.enabled = True
+    band.frequency = 1000.0
+    band.gain = -6.0
+    band.q = 2.0
+    band.filter_type = ProQFilterType.LowShelf
+    preset.bands[1].enabled = True
+    preset.bands[1].frequency = 5000.0
+    preset.bands[1].gain = 4.0
+    preset.global_params.process_mode = ProcessMode.LinearPhase
+    preset.global_params.output_gain = 2.0
+    return PresetBank.from_presets([preset])
+
+
+def test_interpolate_in_perceptual_domains(start, end):
+    variants = interpolate(start, end, [0.0, 0.25, 0.5, 1.0]).to_presets()
+    assert len(variants) == 4
+    first, quarter, half, last = variants
+
+    # Geometric means in frequency and Q, linear in dB
+    assert half.bands[0].frequency == pytest.approx(np.sqrt(100 * 1000), rel=1e-5)
+    assert half.bands[0].q == pytest.approx(1.0, rel=1e-5)
+    assert quarter.bands[0].gain == pytest.approx(3.0)
+    assert half.global_params.output_gain == pytest.approx(1.0)
+
+    # Enums switch at the threshold
+    assert quarter.bands[0].filter_type == ProQFilterType.Bell
+    assert half.bands[0].filter_type == ProQFilterType.LowShelf
+    assert quarter.global_params.process_mode == ProcessMode.ZeroLatency
+    assert half.global_params.process_mode == ProcessMode.LinearPhase
+
+    # A band only enabled in the end preset keeps its frequency and fades in
+    assert quarter.bands[1].frequency == pytest.approx(5000.0, rel=1e-5)
+    assert quarter.bands[1].gain == pytest.approx(1.0)
+    assert not quarter.bands[1].enabled and half.bands[1].enabled
+
+    manager = FabFilterPresetManager()
+    assert manager.encode(first) == start.records[0].tobytes()
+    assert manager.encode(last) == end.records[0].tobytes()
+
+
+def test_bands_disabled_everywhere_keep_their_levels(start, end):
+    start.bands[0, 5, 3] = 3.0  # bands[5].gain, disabled in both presets
+    end.bands[0, 5, 3] = -2.0
+    variants = interpolate(start, end, [0.0, 0.5, 1.0])
+    assert np.array_equal(variants.records[0], start.records[0])
+    assert np.array_equal(variants.records[2], end.records[0])
+    assert variants.gain[1, 5] == pytest.approx(0.5)
+
+
+def test_extrapolated_bands_keep_their_frequency(start, end):
+    # Band 1 is only enabled in the end preset, and band 0 stays in the
+    # frequency range of the sources where it is enabled
+    for position in (-0.5, 1.5):
+        variant = interpolate(start, end, [position]).to_presets()[0]
+        assert variant.bands[1].frequency == pytest.approx(5000.0, rel=1e-5)
+    assert interpolate(start, end, [1.5]).frequency[0, 0] == pytest.approx(
+        1000 * np.sqrt(10), rel=1e-5
+    )
+
+
+def test_interpolate_thresholds(start, end):
+    variants = interpolate(
+        start, end, [0.25, 0.75], thresholds={"filter_type": 0.8}
+    ).to_presets()
+    assert [v.bands[0].filter_type for v in variants] == [ProQFilterType.Bell] * 2
+    assert variants[1].global_params.process_mode == ProcessMode.LinearPhase
+    with pytest.raises(ValueError, match="filtertype"):
+        interpolate(start, end, [0.5], thresholds={"filtertype": 0.8})
+
+
+def test_interpolate_pairs(start, end):
+    starts = PresetBank(np.concatenate([start.records, end.records]))
+    variants = interpolate(starts, end, np.linspace(0, 1, 5))
+    assert len(variants) == 10
+    assert np.array_equal(variants.records[5:], np.repeat(end.records, 5))
+    with pytest.raises(ValueError):
+        interpolate(starts, PresetBank(np.repeat(end.records, 3)), [0.5])
+
+
+def test_blend(start, end):
+    sources = PresetBank(np.concatenate([start.records, end.records, end.records]))
+    blended = blend(sources, [[1, 0, 0], [2, 1, 1]]).to_presets()
+    assert FabFilterPresetManager().encode(blended[0]) == start.records[0].tobytes()
+    assert blended[1].bands[0].frequency == pytest.approx(np.sqrt(100 * 1000), rel=1e-5)
+    assert blended[1].bands[0].filter_type == ProQFilterType.Bell
+    assert blended[1].bands[1].gain == pytest.approx(2.0)
+    with pytest.raises(ValueError):
+        blend(sources, [[1, 1]])
+
+
+def test_write_interpolations(tmp_path, start, end):
+    starts = PresetBank(np.repeat(start.records, 5))
+    positions = np.linspace(0, 1, 3)
+    paths = write_interpolations(starts, end, positions, str(tmp_path), chunk_size=2)
+    assert len(paths) == 15
+    assert os.path.basename(paths[4]) == "0001_001.ffp"
+    expected = interpolate(starts, end, positions)
+    assert np.array_equal(PresetBank.from_files(paths).records, expected.records)
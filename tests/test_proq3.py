@@ -1,7 +1,10 @@
+import io
 import pytest
+import struct
 import tempfile
 import os
 from preset_toolkit.proq3_preset import (
+    PRESET_SIZE,
     FabFilterPresetManager,
     FabFilterPreset,
     EQBand,
@@ -220,7 +223,7 @@ def sample_preset():
         unknown3=0,
     )
     return FabFilterPreset(
-        fxID="PQ3 ", version=1, num_params=330, bands=bands, global_params=global_params
+        fxID="PQ3 ", version=1, num_params=334, bands=bands, global_params=global_params
     )
 
 
@@ -281,4 +284,89 @@ def test_read_nonexistent_file(preset_manager):
     assert preset_manager.read_preset("nonexistent_file.ffp") is None
 
 
+def _read_preset_per_field(manager, file):
+    fxID = file.read(4).decode("ascii")
+    version = struct.unpack("<i", file.read(4))[0]
+    num_params = struct.unpack("<i", file.read(4))[0]
+    return FabFilterPreset(
+        fxID=fxID,
+        version=version,
+        num_params=num_params,
+        bands=manager._read_bands(file),
+        global_params=manager._read_global_params(file),
+    )
+
+
+def _write_preset_per_field(manager, file, preset):
+    file.write(preset.fxID.encode("ascii"))
+    file.write(struct.pack("<i", preset.version))
+    file.write(struct.pack("<i", preset.num_params))
+    manager._write_bands(file, preset.bands)
+    manager._write_global_params(file, preset.global_params)
+
+
+def test_codec_decode_matches_per_field_read(preset_manager):
+    with open("tests/samples/default_preset.ffp", "rb") as file:
+        data = file.read()
+
+    expected = _read_preset_per_field(preset_manager, io.BytesIO(data))
+    assert preset_manager.decode(data) == expected
+
+
+def test_codec_encode_matches_per_field_write(preset_manager, sample_preset):
+    expected = io.BytesIO()
+    _write_preset_per_field(preset_manager, expected, sample_preset)
+
+    buffer = bytearray(PRESET_SIZE)
+    preset_manager.encode_into(sample_preset, buffer)
+    assert bytes(buffer) == expected.getvalue()
+
+    decoded = preset_manager.decode(buffer)
+    assert decoded == _read_preset_per_field(preset_manager, io.BytesIO(buffer))
+
+
+def test_codec_round_trip_sample_file(preset_manager):
+    with open("tests/samples/default_preset.ffp", "rb") as file:
+        data = file.read()
+
+    buffer = bytearray(PRESET_SIZE)
+    preset_manager.encode_into(preset_manager.decode(data), buffer)
+    assert bytes(buffer) == data
+
+
+def test_read_truncated_file(preset_manager, tmp_path):
+    path = tmp_path / "truncated.ffp"
+    path.write_bytes(b"FQ3p" + bytes(100))
+    assert preset_manager.read_preset(str(path)) is None
+
+
+def test_encode_decode_buffers(preset_manager, sample_preset):
+    data = preset_manager.encode(sample_preset)
+    assert isinstance(data, bytes) and len(data) == PRESET_SIZE
+    decoded = preset_manager.decode(data)
+    assert preset_manager.encode(decoded) == data
+    assert preset_manager.decode(memoryview(data)) == decoded
+
+    # Several presets packed back to back, decoded in place by offset
+    packed = bytearray(3 * PRESET_SIZE)
+    preset_manager.encode_into(sample_preset, packed, PRESET_SIZE)
+    assert bytes(packed[PRESET_SIZE : 2 * PRESET_SIZE]) == data
+    assert preset_manager.decode(memoryview(packed), PRESET_SIZE) == decoded
+    assert not any(packed[:PRESET_SIZE]) and not any(packed[2 * PRESET_SIZE :])
+
+
+def test_decode_mmap(preset_manager, sample_preset, tmp_path):
+    import mmap
+
+    data = preset_manager.encode(sample_preset)
+    path = tmp_path / "packed.bin"
+    path.write_bytes(bytes(7) + data)
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            decoded = preset_manager.decode(mapped, 7)
+            compact = preset_manager.decode(mapped, 7, compact=True)
+    assert preset_manager.encode(decoded) == data
+    assert compact.bands == decoded.bands
+
+
 # Add more tests as needed for other methods and edge cases
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from benchmarks.generators import random_preset
+from preset_toolkit.bank import PresetBank
+from preset_toolkit.proq3_preset import ProcessMode, ProQFilterType
+from preset_toolkit.query import (
+    PresetQuery,
+    all_bands,
+    any_band,
+    band,
+    band_count,
+    global_params,
+)
+
+
+@pytest.fixture(scope="module")
+def library():
+    rng = random.Random(7)
+    presets = [random_preset(rng) for _ in range(300)]
+    bank = PresetBank.from_presets(presets)
+    # Compare against the presets as stored, i.e. with float32 values
+    return bank, bank.to_presets()
+
+
+def _expected(presets, condition):
+    return np.array([condition(preset) for preset in presets])
+
+
+QUERIES = [
+    (
+        (global_params.process_mode == ProcessMode.LinearPhase)
+        & any_band(
+            band.enabled
+            & (band.filter_type == ProQFilterType.HighCut)
+            & (band.frequency < 200)
+        ),
+        lambda p: p.global_params.process_mode == ProcessMode.LinearPhase
+        and any(
+            b.enabled and b.filter_type == ProQFilterType.HighCut and b.frequency < 200
+            for b in p.bands
+        ),
+    ),
+    (
+        any_band(band.enabled & band.frequency.between(1000, 2000) & ~band.bypass),
+        lambda p: any(
+            b.enabled and 1000 <= b.frequency <= 2000 and not b.bypass for b in p.bands
+        ),
+    ),
+    (
+        any_band(band.enabled & (band.frequency > 5000) & (band.q >= 2)),
+        lambda p: any(b.enabled and b.frequency > 5000 and b.q >= 2 for b in p.bands),
+    ),
+    (
+        ~global_params.enable_midi | global_params.auto_gain,
+        lambda p: not p.global_params.enable_midi or p.global_params.auto_gain,
+    ),
+    (
+        band_count(band.enabled) >= 15,
+        lambda p: sum(b.enabled for b in p.bands) >= 15,
+    ),
+    (
+        all_bands(band.gain > -25),
+        lambda p: all(b.gain > -25 for b in p.bands),
+    ),
+]
+
+
+@pytest.mark.parametrize("query,condition", QUERIES)
+def test_query_matches_python_scan(library, query, condition):
+    bank, presets = library
+    expected = _expected(presets, condition)
+    assert expected.any() and not expected.all()
+    assert np.array_equal(query.mask(bank), expected)
+
+
+@pytest.mark.parametrize("query,condition", QUERIES)
+def test_indexed_query_matches_python_scan(library, query, condition):
+    bank, presets = library
+    engine = PresetQuery(bank)
+    engine.create_index("frequency")
+    engine.create_index("q", enabled_only=False)
+    assert np.array_equal(engine.mask(query), _expected(presets, condition))
+
+
+def test_index_range_and_select(library):
+    bank, presets = library
+    engine = PresetQuery(bank)
+    index = engine.create_index("frequency")
+    rows, slots = index.range(np.log2(100), np.log2(200))
+    frequencies = bank.frequency[rows, slots]
+    assert np.all((frequencies >= 99.99) & (frequencies <= 200.01))
+    assert np.all(bank.band_column("enabled")[rows, slots] == 1)
+
+    enabled = next(b for b in presets[5].bands if b.enabled)
+    assert 5 in engine.indices(
+        any_band(band.enabled & (band.frequency == enabled.frequency))
+    )
+    selected = engine.select(global_params.auto_gain)
+    assert len(selected) == engine.count(global_params.auto_gain)
+    assert np.all(selected.global_column("auto_gain") == 1)
+
+
+def test_unknown_field():
+    with pytest.raises(AttributeError):
+        band.frequencyy
@@ -0,0 +1,225 @@
+import cmath
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from preset_toolkit.bank import PresetBank
+from preset_toolkit.proq3_preset import (
+    FabFilterPreset,
+    FabFilterPresetManager,
+    ProQFilterType,
+    ProQLPHPSlope,
+)
+from preset_toolkit.response import ResponseCache, batch_response, magnitude_db
+
+FREQS = np.array([20.0, 100.0, 1000.0, 5000.0, 16000.0])
+
+
+def _preset(*bands):
+    preset = FabFilterPreset()
+    for band, (filter_type, frequency, gain, q) in zip(preset.bands, bands):
+        band.enabled = True
+        band.filter_type = filter_type
+        band.frequency = frequency
+        band.gain = gain
+        band.q = q
+    return preset
+
+
+def test_default_preset_is_flat():
+    response = FabFilterPreset().response(FREQS)
+    assert np.allclose(response, 1)
+
+
+def test_bands_multiply():
+    bell = _preset((ProQFilterType.Bell, 1000, 6, 1))
+    both = _preset(
+        (ProQFilterType.Bell, 1000, 6, 1), (ProQFilterType.HighShelf, 5000, -3, 0.7)
+    )
+    shelf = _preset((ProQFilterType.HighShelf, 5000, -3, 0.7))
+
+    assert magnitude_db(bell.response(FREQS))[2] == pytest.approx(6, abs=0.01)
+    assert np.allclose(
+        both.response(FREQS), bell.response(FREQS) * shelf.response(FREQS)
+    )
+
+
+def test_bypassed_and_disabled_bands_are_ignored():
+    preset = _preset(
+        (ProQFilterType.Bell, 1000, 6, 1), (ProQFilterType.Bell, 100, 6, 1)
+    )
+    preset.bands[0].bypass = True
+    preset.bands[1].enabled = False
+    assert np.allclose(preset.response(FREQS), 1)
+    bank = PresetBank.from_presets([preset])
+    assert np.allclose(batch_response(bank, FREQS, cache=None), 1)
+
+
+@pytest.mark.parametrize(
+    "slope, attenuation",
+    [
+        (ProQLPHPSlope.Slope6dB_oct, 6),
+        (ProQLPHPSlope.Slope12dB_oct, 12),
+        (ProQLPHPSlope.Slope24dB_oct, 24),
+        (ProQLPHPSlope.Slope48dB_oct, 48),
+    ],
+)
+def test_cut_slopes(slope, attenuation):
+    low_cut = _preset((ProQFilterType.LowCut, 1000, 0, 0.7071))
+    low_cut.bands[0].lp_hp_slope = slope
+    high_cut = _preset((ProQFilterType.HighCut, 250, 0, 0.7071))
+    high_cut.bands[0].lp_hp_slope = slope
+
+    low_db = magnitude_db(low_cut.response([125, 250, 16000]))
+    high_db = magnitude_db(high_cut.response([1000, 2000, 20]))
+
+    assert low_db[1] - low_db[0] == pytest.approx(attenuation, abs=1)
+    assert high_db[0] - high_db[1] == pytest.approx(attenuation, abs=1)
+    assert low_db[2] == pytest.approx(0, abs=0.1)
+    assert high_db[2] == pytest.approx(0, abs=0.1)
+
+
+def _cookbook_db(filter_type, frequency, gain, q, freqs, sample_rate=48000):
+    """Magnitude of a single RBJ Audio EQ Cookbook biquad, in dB."""
+    if filter_type == ProQFilterType.FlatTilt:
+        # A tilt shelf with a fixed, very wide Q
+        return _cookbook_db(ProQFilterType.TiltShelf, frequency, gain, 0.25, freqs)
+    if filter_type == ProQFilterType.TiltShelf:
+        # Modelled as opposite half-gain shelves
+        return _cookbook_db(
+            ProQFilterType.LowShelf, frequency, -gain / 2, q, freqs
+        ) + _cookbook_db(ProQFilterType.HighShelf, frequency, gain / 2, q, freqs)
+    a = 10 ** (gain / 40)
+    w0 = 2 * math.pi * frequency / sample_rate
+    c = math.cos(w0)
+    alpha = math.sin(w0) / (2 * q)
+    root = 2 * math.sqrt(a) * alpha
+    b, den = {
+        ProQFilterType.Bell: (
+            (1 + alpha * a, -2 * c, 1 - alpha * a),
+            (1 + alpha / a, -2 * c, 1 - alpha / a),
+        ),
+        ProQFilterType.LowShelf: (
+            (
+                a * ((a + 1) - (a - 1) * c + root),
+                2 * a * ((a - 1) - (a + 1) * c),
+                a * ((a + 1) - (a - 1) * c - root),
+            ),
+            (
+                (a + 1) + (a - 1) * c + root,
+                -2 * ((a - 1) + (a + 1) * c),
+                (a + 1) + (a - 1) * c - root,
+            ),
+        ),
+        ProQFilterType.HighShelf: (
+            (
+                a * ((a + 1) + (a - 1) * c + root),
+                -2 * a * ((a - 1) + (a + 1) * c),
+                a * ((a + 1) + (a - 1) * c - root),
+            ),
+            (
+                (a + 1) - (a - 1) * c + root,
+                2 * ((a - 1) - (a + 1) * c),
+                (a + 1) - (a - 1) * c - root,
+            ),
+        ),
+        ProQFilterType.Notch: ((1, -2 * c, 1), (1 + alpha, -2 * c, 1 - alpha)),
+        ProQFilterType.BandPass: ((alpha, 0, -alpha), (1 + alpha, -2 * c, 1 - alpha)),
+    }[filter_type]
+    db = []
+    for f in freqs:
+        z = cmath.exp(-2j * math.pi * f / sample_rate)
+        h = (b[0] + b[1] * z + b[2] * z * z) / (den[0] + den[1] * z + den[2] * z * z)
+        db.append(20 * math.log10(abs(h)))
+    return np.array(db)
+
+
+@pytest.mark.parametrize(
+    "filter_type",
+    [
+        ProQFilterType.Bell,
+        ProQFilterType.LowShelf,
+        ProQFilterType.HighShelf,
+        ProQFilterType.Notch,
+        ProQFilterType.BandPass,
+        ProQFilterType.TiltShelf,
+        ProQFilterType.FlatTilt,
+    ],
+)
+def test_matches_cookbook(filter_type):
+    freqs = [50, 300, 700, 2500, 9000]
+    preset = _preset((filter_type, 1000, 6, 1.5))
+    expected = _cookbook_db(filter_type, 1000, 6, 1.5, freqs)
+    assert magnitude_db(preset.response(freqs)) == pytest.approx(expected, abs=0.01)
+
+
+@pytest.mark.parametrize(
+    "filter_type, expected",
+    [
+        # dB at DC, the band frequency and Nyquist, where they are exact
+        (ProQFilterType.Bell, [0, 6, 0]),
+        (ProQFilterType.LowShelf, [6, 3, 0]),
+        (ProQFilterType.HighShelf, [0, 3, 6]),
+        (ProQFilterType.TiltShelf, [-3, 0, 3]),
+        (ProQFilterType.FlatTilt, [-3, 0, 3]),
+        (ProQFilterType.Notch, [0, None, 0]),
+        (ProQFilterType.BandPass, [None, 0, None]),
+    ],
+)
+def test_exact_points(filter_type, expected):
+    preset = _preset((filter_type, 1000, 6, 1))
+    db = magnitude_db(preset.response([0, 1000, 24000]))
+    for value, target in zip(db, expected):
+        if target is None:
+            assert value < -100  # a zero of the filter
+        else:
+            assert value == pytest.approx(target, abs=0.01)
+
+
+def test_batch_matches_single_and_bank():
+    presets = [
+        _preset((ProQFilterType.Bell, 200 * (i + 1), i - 2, 1.5)) for i in range(5)
+    ]
+    batch = batch_response(presets, FREQS, cache=None)
+    bank = batch_response(PresetBank.from_presets(presets), FREQS, cache=None)
+
+    assert batch.shape == (5, len(FREQS))
+    for preset, response in zip(presets, batch):
+        assert np.allclose(preset.response(FREQS), response)
+    assert np.allclose(bank, batch, atol=1e-5)
+
+
+def test_cache():
+    cache = ResponseCache()
+    presets = [_preset((ProQFilterType.Bell, 1000, gain, 1)) for gain in (1, 2)]
+
+    first = batch_response(presets, FREQS, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+    again = batch_response(presets, FREQS, cache=cache)
+    assert np.array_equal(first, again)
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    # Disabled bands do not change the key, enabled ones do
+    presets[0].bands[5].gain = 12
+    batch_response(presets[:1], FREQS, cache=cache)
+    assert (cache.hits, cache.misses) == (3, 2)
+    presets[0].bands[0].gain = 4
+    changed = batch_response(presets[:1], FREQS, cache=cache)
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert not np.allclose(changed[0], first[0])
+
+
+def test_cache_eviction():
+    cache = ResponseCache(maxsize=2)
+    presets = [_preset((ProQFilterType.Bell, 1000, gain, 1)) for gain in (1, 2, 3)]
+    batch_response(presets, FREQS, cache=cache)
+    assert len(cache) == 2
+    batch_response(presets[:1], FREQS, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 4)
+
+
+def test_response_of_read_preset():
+    preset = FabFilterPresetManager().read_preset("tests/samples/default_preset.ffp")
+    assert np.allclose(preset.response(FREQS), 1)
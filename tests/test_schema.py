@@ -0,0 +1,148 @@
+import struct
+
+import pytest
+
+from preset_toolkit import schema
+from preset_toolkit.proq3_preset import (
+    BAND_FIELDS,
+    PRESET_SIZE,
+    SCHEMA,
+    EQBand,
+    FabFilterPreset,
+    FabFilterPresetManager,
+    GlobalParams,
+    ProQFilterType,
+)
+from preset_toolkit.raw import band_index, global_index
+from preset_toolkit.schema import Field, Schema, SchemaError, schema_for
+
+SAMPLE = "tests/samples/default_preset.ffp"
+
+
+@pytest.fixture
+def sample():
+    with open(SAMPLE, "rb") as file:
+        return file.read()
+
+
+def _with_header(data, version, num_params):
+    return data[:4] + struct.pack("<ii", version, num_params) + data[12:]
+
+
+def test_generated_codec_follows_table(sample):
+    values = struct.unpack_from("<334f", sample, 12)
+    preset = SCHEMA.decode(sample)
+    band = preset.bands[1]
+    assert band.frequency == 2 ** values[13 + 2]
+    assert band.bypass is not bool(values[13 + 1])
+    assert band.filter_type == ProQFilterType(int(values[13 + 8]))
+    assert preset.global_params.enable_midi is not bool(values[312 + 20])
+
+    buffer = bytearray(PRESET_SIZE)
+    SCHEMA.encode_into(preset, buffer)
+    assert bytes(buffer) == sample
+    assert "def decode_bands" in SCHEMA.source
+
+
+def test_field_codec():
+    decode, encode = schema.field_codec(BAND_FIELDS[8])
+    assert decode(3.0) is ProQFilterType.HighShelf
+    assert encode(ProQFilterType.HighShelf) == 3.0
+    decode, encode = schema.field_codec(Field("bypass", 1, "not"))
+    assert decode(0.5) is True and encode(True) == 0.0
+    decode, encode = schema.field_codec(Field("bypass", 1, "inverted"))
+    assert decode(0.5) is False and encode(True) == 0.0
+
+
+def test_non_integral_flags_decode_like_the_original_reader(sample):
+    # A band counts as active for any nonzero flag, while the MIDI flag is
+    # truncated first
+    data = bytearray(sample)
+    struct.pack_into("<f", data, 12 + 4 * band_index(0, "active"), 0.5)
+    struct.pack_into("<f", data, 12 + 4 * global_index("midi_disabled"), 0.5)
+    preset = SCHEMA.decode(bytes(data))
+    assert preset.bands[0].bypass is False
+    assert preset.global_params.enable_midi is True
+    with pytest.raises(ValueError):
+        schema.field_codec(BAND_FIELDS[8])[0](99.0)
+
+
+def test_num_params_mismatch_detected_up_front(tmp_path, sample):
+    manager = FabFilterPresetManager()
+    mismatched = _with_header(sample, 4, 330)
+    with pytest.raises(SchemaError, match="declares 330 parameters"):
+        manager.decode(mismatched)
+    with pytest.raises(SchemaError):
+        manager.decode(mismatched, lazy=True)
+
+    path = tmp_path / "newer.ffp"
+    path.write_bytes(mismatched)
+    assert manager.read_preset(str(path)) is None
+
+    with pytest.raises(SchemaError):
+        manager.encode(FabFilterPreset(num_params=340))
+
+
+def test_unknown_versions_use_default_layout(sample):
+    preset = FabFilterPresetManager().decode(_with_header(sample, 7, 334))
+    assert preset.version == 7
+    assert schema_for(7, 334) is SCHEMA
+
+
+def test_custom_schema(monkeypatch):
+    # Two bands with a reserved slot, and fewer global parameters
+    custom = Schema(
+        5,
+        2,
+        4,
+        [
+            Field("enabled", 0, "bool"),
+            Field("frequency", 1, "log2"),
+            Field("q", 3, "q"),
+        ],
+        [Field("gain_scale", 0), Field("bypass", 2, "bool")],
+        FabFilterPreset,
+        EQBand,
+        GlobalParams,
+    )
+    assert custom.num_params == 11
+    monkeypatch.setitem(schema._schemas, 5, custom)
+
+    bands = [EQBand(enabled=True, frequency=440.0, q=2.0, gain=6.0), EQBand()]
+    preset = FabFilterPreset(version=5, num_params=11, bands=bands)
+    preset.global_params.bypass = True
+    manager = FabFilterPresetManager()
+    data = manager.encode(preset)
+
+    assert len(data) == custom.size
+    assert struct.unpack_from("<11f", data, 12)[2] == 0.0
+    decoded = manager.decode(data)
+    assert decoded.bands[0].frequency == pytest.approx(440.0)
+    assert decoded.bands[0].gain == 0.0  # not stored in this layout
+    assert decoded.global_params.bypass
+    with pytest.raises(SchemaError):
+        manager.decode(data, lazy=True)
+
+
+@pytest.mark.parametrize(
+    "table",
+    [
+        BAND_FIELDS + [Field("volume", 3)],
+        BAND_FIELDS[:-1] + [Field("unknown2", 3)],
+        BAND_FIELDS[:-1] + [Field("unknown2", 13)],
+        BAND_FIELDS[:-1] + [Field("unknown2", 12, "cubic")],
+        BAND_FIELDS[:-1] + [Field("unknown2", 12, "enum")],
+    ],
+)
+def test_schema_table_checks(table):
+    with pytest.raises(SchemaError):
+        Schema(
+            9,
+            24,
+            13,
+            table,
+            [Field("gain_scale", 0)],
+            FabFilterPreset,
+            EQBand,
+            GlobalParams,
+        )
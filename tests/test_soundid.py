@@ -1,5 +1,25 @@
 import pytest
-from preset_toolkit.soundid import SoundIdExport, EqBand
+from preset_toolkit.soundid import (
+    SoundIdExport,
+    EqBand,
+    ChannelCalibration,
+    iter_calibrations,
+)
+
+ATMOS_CHANNELS = [
+    "L",
+    "R",
+    "C",
+    "LFE",
+    "Ls",
+    "Rs",
+    "Lrs",
+    "Rrs",
+    "Ltf",
+    "Rtf",
+    "Ltr",
+    "Rtr",
+]
 
 
 @pytest.fixture
@@ -133,3 +153,78 @@ def test_verify_all_values(sound_id_export):
         assert (
             abs(actual.gain - expected.gain) < 1e-6
         )  # Use small epsilon for float comparison
+
+
+def _channel_block(name, delay, gain, bands):
+    lines = [
+        f"{name} channel calibration:",
+        f"Delay: {delay} ms",
+        f"Gain: {gain} dB",
+        "",
+        "|Freq      |Gain      |",
+        "|:---------|:---------|",
+    ]
+    lines += [f"|{freq:<8}Hz|{band_gain:<8}dB|" for freq, band_gain in bands]
+    return "\n".join(lines) + "\n\n"
+
+
+@pytest.fixture
+def atmos_export(tmp_path):
+    content = "Preset name: 7.1.4 Test\nAudio setup: 7.1.4\n\n"
+    for i, name in enumerate(ATMOS_CHANNELS):
+        content += _channel_block(name, i * 0.5, -i, [(40, i), (16000, -i)])
+    path = tmp_path / "atmos.txt"
+    path.write_text(content)
+    return str(path)
+
+
+def test_iter_calibrations_streams_channels():
+    lines = (
+        _channel_block("L", 1.5, -0.25, [(40, 1), (50, -2.5)]).splitlines()
+        + _channel_block("R", 0, 0, [(40, 3)]).splitlines()
+    )
+    consumed = []
+
+    def read_lines():
+        for line in lines:
+            consumed.append(line)
+            yield line
+
+    channels = iter_calibrations(read_lines())
+
+    assert next(channels) == ChannelCalibration(
+        "L", 1.5, -0.25, [EqBand(40, 1), EqBand(50, -2.5)]
+    )
+    # The first channel is yielded before the second one is read
+    assert "R channel calibration:" not in consumed
+    assert next(channels).name == "R"
+
+
+def test_iter_channels_multichannel(atmos_export):
+    channels = list(SoundIdExport(atmos_export).iter_channels())
+
+    assert [channel.name for channel in channels] == ATMOS_CHANNELS
+    assert channels[3].delay == 1.5
+    assert channels[3].gain == -3
+    assert channels[3].bands == [EqBand(40, 3), EqBand(16000, -3)]
+
+
+def test_extract_calibration_data_multichannel(atmos_export):
+    export = SoundIdExport(atmos_export)
+    l_bands, r_bands = export.get_eq_bands()
+
+    assert l_bands == [EqBand(40, 0), EqBand(16000, 0)]
+    assert r_bands == [EqBand(40, 1), EqBand(16000, -1)]
+    assert list(export.channels) == ATMOS_CHANNELS
+
+
+def test_extract_calibration_data_sample_gain(sound_id_export):
+    sound_id_export.extract_calibration_data()
+    assert sound_id_export.channels["R"].gain == -0.218614
+    assert sound_id_export.channels["L"].delay == 0
+
+
+def test_get_eq_bands_missing_channel(tmp_path):
+    path = tmp_path / "mono.txt"
+    path.write_text(_channel_block("C", 0, 0, [(40, 1)]))
+    assert SoundIdExport(str(path)).get_eq_bands() == (None, None)
@@ -0,0 +1,75 @@
+import subprocess
+import sys
+
+from benchmarks.importtime import import_times
+from preset_toolkit import raw
+from preset_toolkit.proq3_preset import FabFilterPreset, FabFilterPresetManager
+
+
+def _loaded_after(statement: str) -> set:
+    """Returns the modules loaded by ``statement`` in a fresh interpreter."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; before = set(sys.modules); {statement}; "
+            "print('\\n'.join(set(sys.modules) - before))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_package_import_loads_no_submodules():
+    loaded = _loaded_after("import preset_toolkit")
+    assert {m for m in loaded if m.startswith("preset_toolkit.")} == set()
+
+
+def test_raw_import_is_minimal():
+    loaded = _loaded_after("import preset_toolkit.raw")
+    assert not loaded & {
+        "preset_toolkit.proq3_preset",
+        "dataclasses",
+        "enum",
+        "typing",
+        "numpy",
+    }
+
+
+def test_numpy_is_loaded_on_first_use_only():
+    loaded = _loaded_after("import preset_toolkit.proq3_preset, preset_toolkit.cli")
+    assert "numpy" not in loaded
+    assert "preset_toolkit.writer" not in loaded
+
+
+def test_lazy_attributes():
+    import preset_toolkit
+
+    assert preset_toolkit.FabFilterPresetManager is FabFilterPresetManager
+    assert preset_toolkit.raw is raw
+    assert "FabFilterPreset" in dir(preset_toolkit)
+
+
+def test_raw_round_trip(tmp_path):
+    data = FabFilterPresetManager().encode(FabFilterPreset())
+    fxID, version, num_params, values = raw.unpack(data)
+    assert (fxID, num_params) == (b"FQ3p", raw.NUM_PARAMS)
+    assert values[raw.band_index(0, "active")] == 1.0
+    assert values[raw.global_index("midi_disabled")] == 0.0
+    path = str(tmp_path / "preset.ffp")
+    raw.write(path, fxID, version, num_params, values)
+    assert raw.read(path) == (fxID, version, num_params, values)
+    with open(path, "rb") as file:
+        assert file.read() == data
+
+
+def test_importtime_raw_below_full_codec():
+    raw_times = import_times("preset_toolkit.raw")
+    full_times = import_times("preset_toolkit.proq3_preset")
+    assert "preset_toolkit.raw" in full_times
+    assert (
+        raw_times["preset_toolkit.raw"][1]
+        < full_times["preset_toolkit.proq3_preset"][1]
+    )
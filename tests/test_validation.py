@@ -0,0 +1,201 @@
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from preset_toolkit.batch import read_presets
+from preset_toolkit.bank import PresetBank
+from preset_toolkit.instrumentation import Recorder
+from preset_toolkit.proq3_preset import FabFilterPresetManager, ProQFilterType
+from preset_toolkit.raw import BAND_NAMES, GLOBAL_NAMES
+from preset_toolkit.schema import SchemaError
+from preset_toolkit.validation import (
+    BAND_RULES,
+    GLOBAL_RULES,
+    ValidationError,
+    sanitize,
+    sanitize_bank,
+    validate,
+)
+
+SAMPLE = "tests/samples/default_preset.ffp"
+GAIN = 3  # bands[0].gain
+FREQUENCY = 2  # bands[0].frequency, stored as log2
+Q = 7  # bands[0].q
+FILTER_TYPE = 8  # bands[0].filter_type
+SIDECHAIN = 312 + 11  # global_params.analyzer_sidechain
+
+
+@pytest.fixture
+def sample():
+    with open(SAMPLE, "rb") as file:
+        return file.read()
+
+
+def _corrupt(data, index, value):
+    data = bytearray(data)
+    struct.pack_into("<f", data, 12 + 4 * index, value)
+    return bytes(data)
+
+
+@pytest.fixture
+def corrupt(sample):
+    data = _corrupt(sample, GAIN, 50.0)
+    data = _corrupt(data, FILTER_TYPE, 12.0)
+    return _corrupt(data, SIDECHAIN, float("nan"))
+
+
+def _values(*files):
+    return np.stack([np.frombuffer(f, "<f4", 334, 12) for f in files])
+
+
+def test_validate_report(sample, corrupt):
+    report = validate(_values(sample, corrupt, sample))
+    assert list(report.invalid) == [False, True, False]
+    assert [(i.preset, i.name) for i in report.issues] == [
+        (1, "bands[0].gain"),
+        (1, "bands[0].filter_type"),
+        (1, "global_params.analyzer_sidechain"),
+    ]
+    reasons = [issue.reason for issue in report.issues]
+    assert reasons == [
+        "outside [-30, 30]",
+        "not one of [0, 1, 2, 3, 4, 5, 6, 7, 8]",
+        "not finite",
+    ]
+    assert "1 of 3 presets invalid" in str(report)
+    assert validate(_values(sample)).ok
+
+
+def test_validate_enum_domains(sample):
+    values = _values(sample).repeat(4, axis=0)
+    values[0, FILTER_TYPE] = 1.5
+    values[1, SIDECHAIN] = -2
+    values[2, SIDECHAIN] = 0
+    values[3, 0] = 2  # enabled is a bool
+    values = np.concatenate([values, values[1:2]])
+    values[4, 12] = np.inf  # bands[0].unknown2 has no range
+    assert list(validate(values).invalid) == [True, False, True, True, True]
+
+
+def test_sanitize_policies(sample, corrupt):
+    values = _values(sample, corrupt)
+    with pytest.raises(ValidationError) as error:
+        sanitize(values, "strict")
+    assert error.value.report.invalid_count == 1
+
+    kept, report = sanitize(values, "skip")
+    assert len(kept) == 1 and report.invalid_count == 1
+
+    repaired, _ = sanitize(values, "repair")
+    assert repaired[1, GAIN] == 30.0
+    assert repaired[1, FILTER_TYPE] == float(ProQFilterType.Bell)
+    assert repaired[1, SIDECHAIN] == -1.0
+    assert validate(repaired).ok
+    assert np.array_equal(repaired[0], values[0])
+
+    with pytest.raises(ValueError):
+        sanitize(values, "ignore")
+
+
+def test_sanitize_bank(tmp_path, sample, corrupt):
+    paths = []
+    for i, data in enumerate([sample, corrupt, sample]):
+        path = tmp_path / f"{i}.ffp"
+        path.write_bytes(data)
+        paths.append(str(path))
+    bank, report = sanitize_bank(PresetBank.from_files(paths), "skip")
+    assert len(bank) == 2 and bank.names == [paths[0], paths[2]]
+    bank, _ = sanitize_bank(PresetBank.from_files(paths), "repair")
+    assert bank.gain[1, 0] == 30.0
+
+
+def test_manager_policies(sample, corrupt):
+    with pytest.raises(ValueError):
+        FabFilterPresetManager().decode(corrupt)
+    with pytest.raises(ValidationError):
+        FabFilterPresetManager(validation="strict").decode(corrupt)
+
+    recorder = Recorder()
+    skipping = FabFilterPresetManager(instrumentation=recorder, validation="skip")
+    assert skipping.decode(corrupt) is None
+    assert skipping.decode(sample) == FabFilterPresetManager().decode(sample)
+
+    repairing = FabFilterPresetManager(instrumentation=recorder, validation="repair")
+    preset = repairing.decode(b"\0" * 8 + corrupt, offset=8)
+    assert preset.bands[0].gain == 30.0
+    assert repairing.decode(corrupt, lazy=True).bands[0].filter_type == 0
+    assert recorder.counters["presets_skipped"] == 1
+    assert recorder.counters["presets_repaired"] == 2
+
+
+def test_invalid_enum_without_policy(tmp_path, sample):
+    path = tmp_path / "bad.ffp"
+    path.write_bytes(_corrupt(sample, FILTER_TYPE, 99.0))
+    recorder = Recorder()
+    manager = FabFilterPresetManager(instrumentation=recorder)
+
+    with pytest.raises(SchemaError, match="not a valid ProQFilterType"):
+        manager.decode(path.read_bytes())
+    assert manager.read_preset(str(path)) is None
+    assert recorder.errors[-1].event == "read_error"
+
+
+@pytest.mark.parametrize(
+    "index, value",
+    [
+        (FILTER_TYPE, float("inf")),
+        (FILTER_TYPE, float("nan")),
+        (FREQUENCY, 1e30),
+        (Q, 1e30),
+        (SIDECHAIN, float("-inf")),
+    ],
+)
+def test_unconvertible_values_without_policy(tmp_path, sample, index, value):
+    path = tmp_path / "bad.ffp"
+    path.write_bytes(_corrupt(sample, index, value))
+    manager = FabFilterPresetManager(instrumentation=Recorder())
+
+    with pytest.raises(SchemaError):
+        manager.decode(path.read_bytes())
+    assert manager.read_preset(str(path)) is None
+    (result,) = read_presets([str(path)], workers=0)
+    assert not result.ok
+
+
+@pytest.mark.parametrize("policy", [None, "strict", "repair", "skip"])
+def test_truncated_file_is_a_read_error(tmp_path, sample, policy):
+    path = tmp_path / "truncated.ffp"
+    path.write_bytes(sample[:100])
+    recorder = Recorder()
+    manager = FabFilterPresetManager(instrumentation=recorder, validation=policy)
+
+    assert manager.read_preset(str(path)) is None
+    assert recorder.errors[-1].event == "read_error"
+    (result,) = read_presets([str(path)], workers=0, validation=policy)
+    assert not result.ok
+
+
+def test_rules_use_stored_names():
+    assert set(BAND_RULES) <= set(BAND_NAMES)
+    assert set(GLOBAL_RULES) <= set(GLOBAL_NAMES)
+
+
+@pytest.mark.parametrize("policy", ["strict", "repair", "skip"])
+def test_read_presets_policies(tmp_path, sample, corrupt, policy):
+    paths = []
+    for i, data in enumerate([sample, corrupt, sample]):
+        path = tmp_path / f"{i}.ffp"
+        path.write_bytes(data)
+        paths.append(str(path))
+    results = list(read_presets(paths, workers=0, validation=policy))
+
+    if policy == "skip":
+        assert [r.path for r in results] == [paths[0], paths[2]]
+    elif policy == "strict":
+        assert [r.ok for r in results] == [True, False, True]
+        assert "bands[0].gain = 50" in results[1].error
+    else:
+        assert all(r.ok for r in results)
+        assert results[1].preset.bands[0].gain == 30.0
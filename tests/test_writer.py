@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from preset_toolkit.proq3_preset import FabFilterPreset, FabFilterPresetManager
+from preset_toolkit.instrumentation import Recorder
+from preset_toolkit.writer import PresetWriter, write_atomic
+
+
+def _presets(count):
+    presets = []
+    for i in range(count):
+        preset = FabFilterPreset()
+        preset.bands[0].enabled = True
+        preset.bands[0].gain = float(i)
+        presets.append(preset)
+    return presets
+
+
+@pytest.mark.parametrize("workers", [0, 4])
+@pytest.mark.parametrize("fsync", [True, False])
+def test_writer_writes_every_preset(tmp_path, capsys, workers, fsync):
+    manager = FabFilterPresetManager()
+    presets = _presets(50)
+    paths = [str(tmp_path / f"{i:03d}.ffp") for i in range(len(presets))]
+    with PresetWriter(workers=workers, fsync=fsync, batch_size=16) as writer:
+        for path, preset in zip(paths, presets):
+            writer.write(path, preset)
+    summary = writer.summary
+
+    assert summary.written == 50 and summary.failed == 0
+    assert summary.bytes_written == 50 * len(manager.encode(presets[0]))
+    # One fsync per file and one per directory batch (4 batches of <= 16)
+    assert summary.fsyncs == (50 + 4 if fsync else 0)
+    assert capsys.readouterr().out == ""
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(p) for p in paths]
+    for path, preset in zip(paths, presets):
+        with open(path, "rb") as file:
+            assert file.read() == manager.encode(preset)
+    assert "Wrote 50 presets" in str(summary)
+
+
+def test_writer_flush_renames_pending(tmp_path):
+    path = str(tmp_path / "a.ffp")
+    writer = PresetWriter(workers=2, batch_size=100)
+    writer.write(path, FabFilterPreset())
+    writer.flush()
+    assert os.path.exists(path)
+    assert writer.close().written == 1
+    with pytest.raises(ValueError):
+        writer.write(path, FabFilterPreset())
+
+
+def test_writer_collects_errors(tmp_path):
+    recorder = Recorder()
+    bad = FabFilterPreset()
+    bad.bands = bad.bands[:3]
+    missing = str(tmp_path / "missing" / "b.ffp")
+    with PresetWriter(FabFilterPresetManager(instrumentation=recorder)) as writer:
+        writer.write(str(tmp_path / "a.ffp"), bad)
+        writer.write(missing, FabFilterPreset())
+        writer.write(str(tmp_path / "c.ffp"), FabFilterPreset())
+
+    assert writer.summary.written == 1
+    assert writer.summary.failed == 2
+    assert [path for path, _ in writer.summary.errors][1] == missing
+    assert recorder.error_counts["write_error"] == 2
+    assert os.listdir(tmp_path) == ["c.ffp"]
+
+
+def test_write_atomic_replaces(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    write_atomic(path, b"old")
+    write_atomic(path, b"new", fsync=True)
+    with open(path, "rb") as file:
+        assert file.read() == b"new"
+    assert os.listdir(tmp_path) == ["manifest.json"]